@@ -0,0 +1,419 @@
+"""
+Banc d'essai des performances de crypto_utils
+Mesure le débit, la latence et la mémoire de pointe du chiffrement/déchiffrement
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_SIZES = "1K,64K,1M,16M,128M"
+DEFAULT_KINDS = "random,compressible"
+DEFAULT_CIPHERS = "aes-gcm,chacha20-poly1305,fernet"
+DEFAULT_THRESHOLD = 0.10
+
+# En dessous de cette taille, on mesure surtout la latence : répéter davantage
+SMALL_FILE_SIZE = 64 * 1024
+SMALL_FILE_REPEAT = 50
+
+# Mesures du service (--daemon)
+DEFAULT_DAEMON_SIZES = "1K,64K"
+DEFAULT_DAEMON_REQUESTS = 200
+DAEMON_CLI_REPEAT = 5
+DAEMON_START_TIMEOUT = 30
+
+_UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+_WRITE_BLOCK = 1024 * 1024
+
+def parse_size(text):
+    """
+    Convertit une taille du type "64K", "16M" ou "2G" en octets
+    
+    Raises:
+        ValueError: Si la taille est invalide
+    """
+    text = text.strip().upper()
+    if text and text[-1] in _UNITS:
+        return int(float(text[:-1]) * _UNITS[text[-1]])
+    return int(text)
+
+def generate_input(path, size, kind):
+    """
+    Génère un fichier synthétique de la taille demandée
+    
+    Args:
+        path (str): Chemin du fichier à créer
+        size (int): Taille en octets
+        kind (str): "random" (incompressible) ou "compressible" (texte de type CSV)
+    """
+    if kind == "compressible":
+        lines = [f"{i},2024-01-{i % 28 + 1:02d},capteur-{i % 17},{i * 0.37:.2f},OK\n" for i in range(4096)]
+        pattern = "".join(lines).encode("ascii")
+    elif kind != "random":
+        raise ValueError(f"Type de données inconnu: {kind}")
+    
+    with open(path, "wb") as file:
+        remaining = size
+        while remaining > 0:
+            count = min(remaining, _WRITE_BLOCK)
+            if kind == "random":
+                file.write(os.urandom(count))
+            else:
+                repeated = pattern * (count // len(pattern) + 1)
+                file.write(repeated[:count])
+            remaining -= count
+
+def _peak_rss_kb():
+    """Mémoire résidente de pointe du processus courant, en Ko (None si indisponible)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en octets sous macOS, en Ko ailleurs
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+def run_child(spec):
+    """
+    Exécute une mesure dans le processus courant (lancé par run_measurement)
+    
+    Returns:
+        dict: Durées des répétitions et mémoire de pointe
+    """
+    from crypto_utils import encrypt_file, decrypt_file
+    
+    os.chdir(spec["workdir"])
+    key = spec["key"].encode("ascii")
+    baseline_rss = _peak_rss_kb()
+    
+    durations = []
+    for _ in range(spec["repeat"]):
+        started = time.perf_counter()
+        if spec["operation"] == "encrypt":
+            encrypt_file(spec["path"], key, cipher=spec["cipher"], overwrite=True)
+        else:
+            decrypt_file(spec["path"], key, overwrite=True)
+        durations.append(time.perf_counter() - started)
+    
+    return {
+        "durations": durations,
+        "baseline_rss_kb": baseline_rss,
+        "peak_rss_kb": _peak_rss_kb(),
+    }
+
+def run_measurement(spec):
+    """
+    Lance une mesure dans un sous-processus dédié
+    
+    Un processus par mesure permet d'attribuer la mémoire de pointe à une
+    seule opération.
+    """
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", json.dumps(spec)],
+        capture_output=True, text=True, check=False
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Échec de la mesure {spec['operation']}: {completed.stderr.strip()}")
+    return json.loads(completed.stdout)
+
+def run_suite(sizes, kinds, ciphers, repeat, workdir):
+    """
+    Exécute toutes les mesures et renvoie la liste des résultats
+    
+    Pour chaque fichier synthétique et chaque algorithme, le chiffrement est
+    mesuré puis le fichier produit est déchiffré et mesuré à son tour.
+    """
+    from crypto_utils import generate_key, key_to_string
+    
+    key = key_to_string(generate_key())
+    results = []
+    for kind in kinds:
+        for size in sizes:
+            input_name = f"{kind}_{size}.bin"
+            input_path = os.path.join(workdir, input_name)
+            generate_input(input_path, size, kind)
+            file_repeat = max(repeat, SMALL_FILE_REPEAT) if size <= SMALL_FILE_SIZE else repeat
+            
+            for cipher in ciphers:
+                encrypted_path = os.path.join("outputs", f"{input_name}.enc")
+                for operation, path in (("encrypt", input_name), ("decrypt", encrypted_path)):
+                    measurement = run_measurement({
+                        "operation": operation, "cipher": cipher, "path": path,
+                        "key": key, "repeat": file_repeat, "workdir": workdir,
+                    })
+                    best = min(measurement["durations"])
+                    results.append({
+                        "operation": operation,
+                        "cipher": cipher,
+                        "kind": kind,
+                        "size": size,
+                        "mb_per_s": size / (1024 * 1024) / best if best > 0 else None,
+                        "latency_ms": statistics.median(measurement["durations"]) * 1000,
+                        "peak_rss_kb": measurement["peak_rss_kb"],
+                        "baseline_rss_kb": measurement["baseline_rss_kb"],
+                    })
+                    print(_format_result(results[-1]), file=sys.stderr)
+            
+            os.remove(input_path)
+    return results
+
+def _start_daemon(socket_path, workers):
+    """
+    Lance le service (daemon.py) dans un sous-processus et attend qu'il réponde
+    
+    Returns:
+        subprocess.Popen: Processus du service
+    """
+    from daemon import DaemonClient
+    
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "daemon.py"),
+         "--socket", socket_path, "serve", "--workers", str(workers)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    deadline = time.monotonic() + DAEMON_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Échec du lancement du service: {process.stderr.read().strip()}")
+        try:
+            with DaemonClient(socket_path) as client:
+                client.ping()
+            return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("Le service ne répond pas")
+
+def _time_requests(send, paths, concurrency):
+    """
+    Envoie une requête par chemin, avec concurrency clients simultanés
+    
+    Returns:
+        tuple: (durée de chaque requête, durée totale)
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    
+    def timed(path):
+        started = time.perf_counter()
+        send(path)
+        return time.perf_counter() - started
+    
+    started = time.perf_counter()
+    if concurrency == 1:
+        durations = [timed(path) for path in paths]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            durations = list(executor.map(timed, paths))
+    return durations, time.perf_counter() - started
+
+def _cli_latency(path, key, cipher, workdir, repeat):
+    """Durées d'un chiffrement par un nouveau processus cli.py, pour comparaison"""
+    cli = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cli.py")
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, cli, "encrypt", path, "--key", key, "--cipher", cipher,
+                        "--output-dir", os.path.join(workdir, "cli"), "--overwrite"],
+                       check=True, capture_output=True)
+        durations.append(time.perf_counter() - started)
+    return durations
+
+def run_daemon_suite(sizes, ciphers, requests, concurrency, workdir):
+    """
+    Mesure la latence et le débit des requêtes adressées au service
+    
+    Un service est lancé sur un socket temporaire. Pour chaque taille et
+    chaque algorithme, requests fichiers sont chiffrés, vérifiés puis
+    déchiffrés : une requête à la fois pour la latence, puis par concurrency
+    clients simultanés pour le débit. Le lancement de cli.py pour un seul
+    fichier est mesuré en comparaison (opération "cli-encrypt").
+    """
+    import threading
+    from crypto_utils import generate_key, key_to_string
+    from daemon import DaemonClient
+    
+    key = key_to_string(generate_key())
+    socket_path = os.path.join(workdir, "encryptor.sock")
+    process = _start_daemon(socket_path, concurrency)
+    clients = threading.local()
+    
+    def client():
+        if not hasattr(clients, 'client'):
+            clients.client = DaemonClient(socket_path)
+        return clients.client
+    
+    results = []
+    try:
+        key_id = client().load_key(key)
+        for size in sizes:
+            paths = []
+            for index in range(requests):
+                path = os.path.join(workdir, f"daemon_{size}_{index}.bin")
+                generate_input(path, size, "random")
+                paths.append(path)
+            output_dir = os.path.join(workdir, "daemon")
+            
+            for cipher in ciphers:
+                encrypted = {}
+                
+                def encrypt(path):
+                    encrypted[path] = client().encrypt(path, key_id=key_id, cipher=cipher,
+                                                       output_dir=output_dir, overwrite=True)
+                
+                def verify(path):
+                    if not client().verify(encrypted[path], key_id=key_id)['valid']:
+                        raise RuntimeError(f"Vérification échouée: {encrypted[path]}")
+                
+                def decrypt(path):
+                    client().decrypt(encrypted[path], key_id=key_id,
+                                     output_dir=os.path.join(output_dir, "clair"), overwrite=True)
+                
+                for operation, send in (("encrypt", encrypt), ("verify", verify), ("decrypt", decrypt)):
+                    latencies, _ = _time_requests(send, paths, 1)
+                    _, elapsed = _time_requests(send, paths, concurrency)
+                    results.append(_daemon_result(f"daemon-{operation}", cipher, size,
+                                                  latencies, requests, elapsed))
+                    print(_format_result(results[-1]), file=sys.stderr)
+                
+                cli_latencies = _cli_latency(paths[0], key, cipher, workdir, DAEMON_CLI_REPEAT)
+                results.append(_daemon_result("cli-encrypt", cipher, size, cli_latencies,
+                                              len(cli_latencies), sum(cli_latencies)))
+                print(_format_result(results[-1]), file=sys.stderr)
+            
+            for path in paths:
+                os.remove(path)
+    finally:
+        try:
+            with DaemonClient(socket_path) as stopper:
+                stopper.shutdown()
+        except OSError:
+            process.kill()
+        process.wait(timeout=DAEMON_START_TIMEOUT)
+    return results
+
+def _daemon_result(operation, cipher, size, latencies, count, elapsed):
+    """Résultat d'une série de requêtes, au format de run_suite"""
+    return {
+        "operation": operation,
+        "cipher": cipher,
+        "kind": "random",
+        "size": size,
+        "mb_per_s": size * count / (1024 * 1024) / elapsed if elapsed > 0 else None,
+        "requests_per_s": count / elapsed if elapsed > 0 else None,
+        "latency_ms": statistics.median(latencies) * 1000,
+        "peak_rss_kb": None,
+        "baseline_rss_kb": None,
+    }
+
+def _result_key(result):
+    """Clé identifiant une mesure pour la comparaison avec une référence"""
+    return (result["operation"], result["cipher"], result["kind"], result["size"])
+
+def _format_result(result):
+    """Ligne lisible décrivant un résultat"""
+    throughput = f"{result['mb_per_s']:.1f} Mo/s" if result["mb_per_s"] else "-"
+    return (f"{result['operation']:<14} {result['cipher']:<18} {result['kind']:<12} "
+            f"{result['size']:>12} o  {throughput:>12}  {result['latency_ms']:9.2f} ms  "
+            f"{result['peak_rss_kb'] or '-':>8} Ko")
+
+def compare(results, baseline, threshold):
+    """
+    Compare des résultats à une référence
+    
+    Une régression est un débit inférieur, ou une mémoire de pointe
+    supérieure, de plus de threshold (fraction) à la référence.
+    
+    Returns:
+        list: Descriptions des régressions détectées
+    """
+    reference = {_result_key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        previous = reference.get(_result_key(result))
+        if previous is None:
+            continue
+        name = "/".join(str(part) for part in _result_key(result))
+        if previous["mb_per_s"] and result["mb_per_s"] is not None \
+                and result["mb_per_s"] < previous["mb_per_s"] * (1 - threshold):
+            regressions.append(f"{name}: débit {result['mb_per_s']:.1f} Mo/s "
+                               f"(référence {previous['mb_per_s']:.1f} Mo/s)")
+        if previous["peak_rss_kb"] and result["peak_rss_kb"] \
+                and result["peak_rss_kb"] > previous["peak_rss_kb"] * (1 + threshold):
+            regressions.append(f"{name}: mémoire {result['peak_rss_kb']} Ko "
+                               f"(référence {previous['peak_rss_kb']} Ko)")
+    return regressions
+
+def build_parser():
+    """Construit l'analyseur d'arguments"""
+    parser = argparse.ArgumentParser(description="Banc d'essai de crypto_utils")
+    parser.add_argument("--sizes",
+                        help=f"Tailles des fichiers, ex. 1K,1M,2G (défaut: {DEFAULT_SIZES})")
+    parser.add_argument("--kinds", default=DEFAULT_KINDS,
+                        help=f"Types de données (défaut: {DEFAULT_KINDS})")
+    parser.add_argument("--ciphers", default=DEFAULT_CIPHERS,
+                        help=f"Algorithmes mesurés (défaut: {DEFAULT_CIPHERS})")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Nombre de répétitions par mesure")
+    parser.add_argument("--output", help="Fichier JSON où écrire les résultats")
+    parser.add_argument("--baseline", help="Fichier JSON de référence à comparer")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Écart toléré par rapport à la référence (défaut: 0.10)")
+    parser.add_argument("--workdir", help="Dossier des fichiers temporaires")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Mesurer les requêtes adressées au service (daemon.py) "
+                             f"plutôt que les appels directs (tailles par défaut: {DEFAULT_DAEMON_SIZES})")
+    parser.add_argument("--requests", type=int, default=DEFAULT_DAEMON_REQUESTS,
+                        help="Nombre de requêtes par mesure du service")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Clients simultanés (et workers du service) pour la mesure du débit")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    return parser
+
+def main(argv=None):
+    """Point d'entrée du banc d'essai"""
+    args = build_parser().parse_args(argv)
+    
+    if args.child:
+        print(json.dumps(run_child(json.loads(args.child))))
+        return 0
+    
+    default_sizes = DEFAULT_DAEMON_SIZES if args.daemon else DEFAULT_SIZES
+    sizes = [parse_size(size) for size in (args.sizes or default_sizes).split(",")]
+    kinds = args.kinds.split(",")
+    ciphers = args.ciphers.split(",")
+    
+    with tempfile.TemporaryDirectory(dir=args.workdir) as workdir:
+        if args.daemon:
+            results = run_daemon_suite(sizes, ciphers, args.requests, args.concurrency, workdir)
+        else:
+            results = run_suite(sizes, kinds, ciphers, args.repeat, workdir)
+    
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+    
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"RÉGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
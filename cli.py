@@ -0,0 +1,319 @@
+"""
+Interface en ligne de commande de l'application de chiffrement
+N'importe jamais PyQt5, sauf avec l'option --gui
+"""
+
+import argparse
+import getpass
+import sys
+
+# Valeurs reprises de crypto_utils, qui n'est importé qu'à l'exécution
+# d'une commande pour garder un démarrage rapide
+AEAD_CIPHERS = ["aes-gcm", "chacha20-poly1305", "auto"]
+CIPHERS = AEAD_CIPHERS + ["fernet"]
+DEFAULT_CIPHER = "aes-gcm"
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+COMPRESSIONS = ["zlib", "lzma"]
+
+def _read_passphrase(confirm=False, prompt="Phrase secrète: "):
+    """Demande une phrase secrète sur le terminal, éventuellement deux fois"""
+    from crypto_utils import Passphrase
+    
+    passphrase = getpass.getpass(prompt)
+    if confirm and getpass.getpass("Confirmation: ") != passphrase:
+        raise ValueError("Les phrases secrètes ne correspondent pas")
+    return Passphrase(passphrase)
+
+def _load_key(args, required=True, confirm=False):
+    """
+    Récupère la clé passée par --key ou --key-file, ou la phrase secrète demandée par --passphrase
+    
+    Returns:
+        bytes | Passphrase: Clé validée, ou None si absente et non obligatoire
+    """
+    from crypto_utils import validate_key
+    
+    if args.passphrase:
+        return _read_passphrase(confirm)
+    if args.key_file:
+        with open(args.key_file, 'r', encoding='utf-8') as key_file:
+            key_string = key_file.read().strip()
+    elif args.key:
+        key_string = args.key
+    elif required:
+        raise ValueError("Clé manquante (--key ou --key-file)")
+    else:
+        return None
+    return validate_key(key_string)
+
+def cmd_keygen(args):
+    """Génère et affiche une nouvelle clé"""
+    from crypto_utils import generate_key, key_to_string
+    
+    print(key_to_string(generate_key()))
+    return 0
+
+def _check_pipe(files):
+    """Vérifie que "-" (entrée/sortie standard) n'est pas mêlé à des fichiers"""
+    if "-" in files and len(files) > 1:
+        raise ValueError("\"-\" (entrée standard) doit être le seul fichier")
+    return files == ["-"]
+
+def _output_options(args):
+    """Options de placement des fichiers produits, communes à encrypt et decrypt"""
+    return {'output_dir': args.output_dir, 'overwrite': args.overwrite, 'fsync': args.fsync}
+
+def cmd_encrypt(args):
+    """Chiffre un ou plusieurs fichiers, ou l'entrée standard vers la sortie standard"""
+    from crypto_utils import generate_key, encrypt_file, encrypt_stream, key_to_string
+    
+    pipe = _check_pipe(args.files)
+    key = _load_key(args, required=False, confirm=True)
+    if key is None:
+        key = generate_key()
+        print(f"CLÉ GÉNÉRÉE: {key_to_string(key)}", file=sys.stderr)
+        print("SAUVEGARDEZ CETTE CLÉ IMMÉDIATEMENT!", file=sys.stderr)
+    
+    if pipe:
+        encrypt_stream(sys.stdin.buffer, sys.stdout.buffer, key, name=args.name,
+                       chunk_size=args.chunk_size, workers=args.workers, cipher=args.cipher,
+                       compression=args.compression)
+        sys.stdout.buffer.flush()
+        return 0
+    
+    for file_path in args.files:
+        encrypted_path = encrypt_file(file_path, key, chunk_size=args.chunk_size,
+                                      workers=args.workers, cipher=args.cipher,
+                                      compression=args.compression, resume=args.resume,
+                                      incremental=args.incremental, previous=args.previous,
+                                      **_output_options(args))
+        print(encrypted_path)
+    return 0
+
+def cmd_decrypt(args):
+    """Déchiffre un ou plusieurs fichiers, ou l'entrée standard vers la sortie standard"""
+    from crypto_utils import decrypt_file, decrypt_stream
+    
+    pipe = _check_pipe(args.files)
+    key = _load_key(args)
+    if pipe:
+        decrypt_stream(sys.stdin.buffer, sys.stdout.buffer, key, workers=args.workers)
+        sys.stdout.buffer.flush()
+        return 0
+    
+    for file_path in args.files:
+        print(decrypt_file(file_path, key, workers=args.workers, **_output_options(args)))
+    return 0
+
+def cmd_verify(args):
+    """Vérifie l'intégrité de fichiers chiffrés sans écrire de texte clair"""
+    from crypto_utils import verify_files
+    
+    report = verify_files(args.files, _load_key(args), workers=args.workers)
+    for entry in report['files']:
+        if entry['valid']:
+            print(f"OK {entry['path']}")
+            continue
+        location = []
+        if entry['member'] is not None:
+            location.append(f"membre {entry['member']}")
+        if entry['chunk'] is not None:
+            location.append(f"bloc {entry['chunk']}")
+        if entry['offset'] is not None:
+            location.append(f"octet {entry['offset']}")
+        where = f" ({', '.join(location)})" if location else ""
+        print(f"INVALIDE {entry['path']}{where}: {entry['error']}")
+    return 1 if report['invalid'] else 0
+
+def cmd_rewrap(args):
+    """Change la clé maître de fichiers chiffrés sans rechiffrer leur contenu"""
+    from crypto_utils import rewrap, validate_key
+    
+    old_key = _load_key(args)
+    if args.new_passphrase:
+        new_key = _read_passphrase(confirm=True, prompt="Nouvelle phrase secrète: ")
+    elif args.new_key:
+        new_key = validate_key(args.new_key)
+    else:
+        raise ValueError("Nouvelle clé manquante (--new-key ou --new-passphrase)")
+    for file_path in args.files:
+        rewrap(file_path, old_key, new_key, fsync=True)
+        print(file_path)
+    return 0
+
+def cmd_pack(args):
+    """Regroupe un dossier dans une archive chiffrée"""
+    from crypto_utils import create_bundle, generate_key, key_to_string
+    
+    key = _load_key(args, required=False, confirm=True)
+    if key is None:
+        key = generate_key()
+        print(f"CLÉ GÉNÉRÉE: {key_to_string(key)}", file=sys.stderr)
+        print("SAUVEGARDEZ CETTE CLÉ IMMÉDIATEMENT!", file=sys.stderr)
+    print(create_bundle(args.directory, args.archive, key, chunk_size=args.chunk_size,
+                        cipher=args.cipher, compression=args.compression,
+                        fsync=args.fsync, overwrite=args.overwrite))
+    return 0
+
+def cmd_list(args):
+    """Liste les membres d'une archive chiffrée"""
+    from crypto_utils import list_bundle
+    
+    for entry in list_bundle(args.archive, _load_key(args)):
+        print(f"{entry['size']:>12}  {entry['name']}")
+    return 0
+
+def cmd_unpack(args):
+    """Extrait tout ou partie d'une archive chiffrée"""
+    from crypto_utils import extract_bundle
+    
+    for path in extract_bundle(args.archive, _load_key(args), args.output_dir or "outputs",
+                               members=args.members or None, overwrite=args.overwrite,
+                               fsync=args.fsync):
+        print(path)
+    return 0
+
+def cmd_ciphers(args):
+    """Mesure les algorithmes AEAD et indique celui retenu par --cipher auto"""
+    from crypto_utils import benchmark_ciphers, select_cipher
+    
+    selected = select_cipher()
+    for name, rate in benchmark_ciphers().items():
+        marker = "*" if name == selected else " "
+        print(f"{marker} {name:<20} {f'{rate:.0f} Mo/s' if rate else 'non supporté'}")
+    return 0
+
+def cmd_gui(args):
+    """Lance l'interface graphique (import différé de PyQt5)"""
+    from main import main as run_gui
+    
+    run_gui()
+    return 0
+
+def _add_key_arguments(parser):
+    """Ajoute les options de clé communes aux sous-commandes"""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--key", help="Clé de chiffrement")
+    group.add_argument("--key-file", help="Fichier contenant la clé")
+    group.add_argument("--passphrase", action="store_true",
+                       help="Utiliser une phrase secrète (demandée au clavier)")
+
+def _add_output_arguments(parser):
+    """Ajoute les options de placement des fichiers produits"""
+    parser.add_argument("--output-dir", help="Dossier de sortie (défaut: outputs)")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="Remplacer les fichiers existants au lieu d'ajouter \" (1)\" au nom")
+    parser.add_argument("--fsync", action="store_true",
+                        help="Forcer l'écriture des fichiers produits sur le disque")
+
+def build_parser():
+    """Construit l'analyseur d'arguments"""
+    parser = argparse.ArgumentParser(
+        prog="encryptor",
+        description="Chiffrement et déchiffrement de fichiers"
+    )
+    parser.add_argument("--gui", action="store_true", help="Lancer l'interface graphique")
+    subparsers = parser.add_subparsers(dest="command")
+    
+    keygen = subparsers.add_parser("keygen", help="Générer une clé")
+    keygen.set_defaults(handler=cmd_keygen)
+    
+    encrypt = subparsers.add_parser("encrypt", help="Chiffrer des fichiers")
+    encrypt.add_argument("files", nargs="+",
+                         help="Fichiers à chiffrer (\"-\" : entrée standard vers sortie standard)")
+    _add_key_arguments(encrypt)
+    encrypt.add_argument("--cipher", default=DEFAULT_CIPHER, choices=CIPHERS,
+                         help=f"Algorithme de chiffrement (défaut: {DEFAULT_CIPHER})")
+    encrypt.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                         help="Taille des blocs en octets")
+    encrypt.add_argument("--workers", type=int, default=1,
+                         help="Nombre de processus de chiffrement")
+    encrypt.add_argument("--compression", choices=COMPRESSIONS,
+                         help="Compresser avant chiffrement (ignoré si les données sont déjà compressées)")
+    encrypt.add_argument("--name", help="Nom d'origine à enregistrer en mode flux (\"-\")")
+    encrypt.add_argument("--resume", action="store_true",
+                         help="Reprendre un chiffrement interrompu (journal conservé en cas d'arrêt)")
+    encrypt.add_argument("--incremental", action="store_true",
+                         help="Ne rechiffrer que les blocs modifiés depuis la version précédente")
+    encrypt.add_argument("--previous",
+                         help="Version chiffrée précédente (défaut: le fichier de sortie)")
+    _add_output_arguments(encrypt)
+    encrypt.set_defaults(handler=cmd_encrypt)
+    
+    decrypt = subparsers.add_parser("decrypt", help="Déchiffrer des fichiers")
+    decrypt.add_argument("files", nargs="+",
+                         help="Fichiers à déchiffrer (\"-\" : entrée standard vers sortie standard)")
+    _add_key_arguments(decrypt)
+    decrypt.add_argument("--workers", type=int, default=1,
+                         help="Nombre de processus de déchiffrement")
+    _add_output_arguments(decrypt)
+    decrypt.set_defaults(handler=cmd_decrypt)
+    
+    verify = subparsers.add_parser("verify", help="Vérifier des fichiers chiffrés")
+    verify.add_argument("files", nargs="+", help="Fichiers à vérifier")
+    _add_key_arguments(verify)
+    verify.add_argument("--workers", type=int, default=4,
+                        help="Nombre de fichiers vérifiés simultanément")
+    verify.set_defaults(handler=cmd_verify)
+    
+    rewrap = subparsers.add_parser("rewrap", help="Changer la clé de fichiers chiffrés")
+    rewrap.add_argument("files", nargs="+", help="Fichiers chiffrés")
+    _add_key_arguments(rewrap)
+    new_key = rewrap.add_mutually_exclusive_group()
+    new_key.add_argument("--new-key", help="Nouvelle clé")
+    new_key.add_argument("--new-passphrase", action="store_true",
+                         help="Nouvelle phrase secrète (demandée au clavier)")
+    rewrap.set_defaults(handler=cmd_rewrap)
+    
+    ciphers = subparsers.add_parser("ciphers", help="Comparer les algorithmes (choix de --cipher auto)")
+    ciphers.set_defaults(handler=cmd_ciphers)
+    
+    pack = subparsers.add_parser("pack", help="Regrouper un dossier dans une archive chiffrée")
+    pack.add_argument("directory", help="Dossier à archiver")
+    pack.add_argument("archive", help="Archive à créer")
+    _add_key_arguments(pack)
+    pack.add_argument("--cipher", default=DEFAULT_CIPHER, choices=AEAD_CIPHERS,
+                      help=f"Algorithme de chiffrement (défaut: {DEFAULT_CIPHER})")
+    pack.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                      help="Taille des blocs en octets")
+    pack.add_argument("--compression", choices=COMPRESSIONS,
+                      help="Compresser avant chiffrement (sauf formats déjà compressés)")
+    pack.add_argument("--overwrite", action="store_true",
+                      help="Remplacer l'archive si elle existe")
+    pack.add_argument("--fsync", action="store_true",
+                      help="Forcer l'écriture de l'archive sur le disque")
+    pack.set_defaults(handler=cmd_pack)
+    
+    list_parser = subparsers.add_parser("list", help="Lister le contenu d'une archive")
+    list_parser.add_argument("archive", help="Archive chiffrée")
+    _add_key_arguments(list_parser)
+    list_parser.set_defaults(handler=cmd_list)
+    
+    unpack = subparsers.add_parser("unpack", help="Extraire une archive chiffrée")
+    unpack.add_argument("archive", help="Archive chiffrée")
+    unpack.add_argument("members", nargs="*", help="Membres à extraire (défaut: tous)")
+    _add_key_arguments(unpack)
+    _add_output_arguments(unpack)
+    unpack.set_defaults(handler=cmd_unpack)
+    
+    return parser
+
+def main(argv=None):
+    """Point d'entrée de la ligne de commande"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    
+    if args.gui:
+        return cmd_gui(args)
+    if args.command is None:
+        parser.print_help()
+        return 2
+    
+    try:
+        return args.handler(args)
+    except Exception as e:
+        print(f"ERREUR: {e}", file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,143 +1,3658 @@
 """
 Utilitaires de chiffrement/déchiffrement
-Utilise la bibliothèque cryptography avec Fernet
+Utilise la bibliothèque cryptography (AES-GCM, ChaCha20-Poly1305 ou Fernet)
 """
 
+import base64
+import copy
+import functools
+import hashlib
+import hmac
+import io
 import os
 import json
-from pathlib import Path
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from pathlib import Path, PureWindowsPath
 from cryptography.fernet import Fernet
 from cryptography.fernet import InvalidToken
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
+class OperationCancelled(Exception):
+    """Levée lorsqu'une opération est annulée via son événement d'annulation"""
+
+# Libellés des phases mesurées par OperationStats
+PHASE_LABELS = {
+    'open': "ouverture",
+    'read': "lecture",
+    'encrypt': "chiffrement",
+    'decrypt': "déchiffrement",
+    'write': "écriture",
+    'copy': "copie",
+    'fsync': "fsync",
+}
+
+class OperationStats:
+    """
+    Statistiques d'une opération de chiffrement ou de déchiffrement
+    
+    Pour chaque phase (open, read, encrypt, decrypt, write, copy, fsync), cumule la
+    durée en secondes et le nombre d'octets traités. En mode parallèle, la
+    phase encrypt/decrypt mesure l'attente des résultats des workers et non
+    leur temps CPU.
+    """
+    
+    def __init__(self, operation=None, file_path=None):
+        self.operation = operation
+        self.file_path = file_path
+        self.output_path = None
+        self.phases = {}
+        self.peak_buffer = 0
+        self.seconds = 0.0
+        self.error = None
+        self._started = time.perf_counter()
+    
+    def add(self, phase, seconds, size=0):
+        """Ajoute une durée et un nombre d'octets à une phase"""
+        entry = self.phases.setdefault(phase, {'seconds': 0.0, 'bytes': 0})
+        entry['seconds'] += seconds
+        entry['bytes'] += size
+    
+    def phase_seconds(self, phase):
+        """Durée cumulée d'une phase"""
+        return self.phases.get(phase, {}).get('seconds', 0.0)
+    
+    @contextmanager
+    def measure(self, phase, size=0):
+        """Mesure la durée du bloc with et l'ajoute à une phase"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - started, size)
+    
+    def note_buffer(self, size):
+        """Enregistre la taille d'un tampon manipulé"""
+        if size > self.peak_buffer:
+            self.peak_buffer = size
+    
+    def finish(self, error=None):
+        """Clôt la mesure de l'opération"""
+        self.seconds = time.perf_counter() - self._started
+        self.error = None if error is None else f"{type(error).__name__}: {error}"
+    
+    @property
+    def plaintext_bytes(self):
+        """Octets en clair traités (lus au chiffrement, écrits au déchiffrement)"""
+        phase = 'read' if self.operation == 'encrypt' else 'write'
+        return self.phases.get(phase, {}).get('bytes', 0)
+    
+    def to_dict(self):
+        """Représentation sérialisable en JSON"""
+        return {
+            'operation': self.operation,
+            'file_path': None if self.file_path is None else str(self.file_path),
+            'output_path': None if self.output_path is None else str(self.output_path),
+            'seconds': self.seconds,
+            'bytes': self.plaintext_bytes,
+            'peak_buffer': self.peak_buffer,
+            'phases': self.phases,
+            'error': self.error,
+        }
+    
+    def summary(self):
+        """Ligne de synthèse lisible"""
+        megabytes = self.plaintext_bytes / (1024 * 1024)
+        rate = megabytes / self.seconds if self.seconds > 0 else 0.0
+        phases = ", ".join(
+            f"{label} {self.phases[phase]['seconds']:.3f} s"
+            for phase, label in PHASE_LABELS.items() if phase in self.phases
+        )
+        label = PHASE_LABELS.get(self.operation, self.operation).capitalize()
+        return (f"{label}: {megabytes:.2f} Mo en {self.seconds:.3f} s ({rate:.1f} Mo/s) - "
+                f"{phases} - tampon max {self.peak_buffer / 1024:.0f} Ko")
+
+class LoggingStatsSink:
+    """Publie les statistiques de chaque opération dans un logger (niveau INFO par défaut)"""
+    
+    def __init__(self, logger=None, level=None):
+        # Import différé : logging n'est utile qu'avec ce collecteur
+        import logging
+        
+        self.logger = logger or logging.getLogger(__name__)
+        self.level = logging.INFO if level is None else level
+    
+    def __call__(self, stats):
+        self.logger.log(self.level, stats.summary())
+
+class JsonLinesStatsSink:
+    """Ajoute les statistiques de chaque opération à un fichier JSON lines"""
+    
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+    
+    def __call__(self, stats):
+        line = json.dumps(stats.to_dict())
+        with self._lock, open(self.path, 'a', encoding='utf-8') as output:
+            output.write(line + "\n")
+
+class _TimedStream:
+    """Enveloppe un fichier binaire pour mesurer ses lectures et écritures"""
+    
+    def __init__(self, stream, stats):
+        self._stream = stream
+        self._stats = stats
+    
+    def read(self, size=-1):
+        started = time.perf_counter()
+        data = self._stream.read(size)
+        self._stats.add('read', time.perf_counter() - started, len(data))
+        self._stats.note_buffer(len(data))
+        return data
+    
+    def write(self, data):
+        started = time.perf_counter()
+        written = self._stream.write(data)
+        self._stats.add('write', time.perf_counter() - started, len(data))
+        self._stats.note_buffer(len(data))
+        return written
+    
+    def writelines(self, parts):
+        """Écrit plusieurs tampons à la suite, sans les concaténer"""
+        started = time.perf_counter()
+        size = 0
+        for part in parts:
+            self._stream.write(part)
+            size += len(part)
+        self._stats.add('write', time.perf_counter() - started, size)
+        self._stats.note_buffer(size)
+    
+    def fsync(self):
+        """Force l'écriture du fichier sur le disque"""
+        with self._stats.measure('fsync'):
+            self._stream.flush()
+            os.fsync(self._stream.fileno())
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stream.close()
+    
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+class _ReusedBufferFile:
+    """
+    Fichier dont read() remplit des tampons réutilisés et renvoie des vues sans copie
+    
+    Les lectures utilisent à tour de rôle quelques tampons alloués une fois
+    pour toutes (readinto) : une vue reste valide pendant les lectures
+    suivantes, ce qui couvre la lecture anticipée d'un bloc. Un fichier
+    tronqué ou agrandi pendant la lecture se comporte comme avec read() :
+    lecture courte ou position au-delà de la taille attendue.
+    """
+    
+    _BUFFERS = 4
+    
+    def __init__(self, file):
+        self._file = file
+        self._buffers = [bytearray() for _ in range(self._BUFFERS)]
+        self._next = 0
+    
+    def read(self, size=-1):
+        if size is None or size < 0:
+            # Lecture complète (ancien format) : une copie est de toute façon nécessaire
+            return self._file.read()
+        
+        buffer = self._buffers[self._next]
+        if len(buffer) < size:
+            # Les vues sur l'ancien tampon le gardent en vie tant qu'elles sont utilisées
+            buffer = self._buffers[self._next] = bytearray(size)
+        self._next = (self._next + 1) % self._BUFFERS
+        view = memoryview(buffer)[:size]
+        count = self._file.readinto(view)
+        return view[:count]
+    
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._file.seek(offset, whence)
+    
+    def tell(self):
+        return self._file.tell()
+    
+    def fileno(self):
+        return self._file.fileno()
+    
+    def close(self):
+        self._file.close()
+
+def _open_input(path, stats, reuse_buffers):
+    """
+    Ouvre un fichier à lire en entier, dans des tampons réutilisés si reuse_buffers est vrai
+    
+    Les vues renvoyées sur des tampons réutilisés ne peuvent pas être
+    transmises à un processus de travail : elles sont réservées au
+    traitement dans le processus courant.
+    """
+    with stats.measure('open'):
+        stream = open(path, 'rb')
+        if reuse_buffers:
+            stream = _ReusedBufferFile(stream)
+    return _TimedStream(stream, stats)
+
+def _timed_iter(iterable, stats, phase):
+    """
+    Mesure le temps passé à produire chaque élément d'un itérable
+    
+    Les lectures faites pendant la production (comptées dans la phase read)
+    sont retranchées.
+    """
+    iterator = iter(iterable)
+    while True:
+        started = time.perf_counter()
+        read_before = stats.phase_seconds('read')
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        read_time = stats.phase_seconds('read') - read_before
+        size = sum(map(len, item)) if isinstance(item, tuple) else len(item)
+        stats.add(phase, time.perf_counter() - started - read_time, size)
+        yield item
+
+def _publish_stats(stats, stats_sink, error):
+    """Clôt les statistiques et les transmet au collecteur éventuel"""
+    stats.finish(error)
+    if stats_sink is not None:
+        stats_sink(stats)
 
 def generate_key():
     """
-    Génère une clé de chiffrement Fernet
+    Génère une clé de chiffrement Fernet
+    
+    Returns:
+        bytes: Clé de chiffrement encodée en base64
+    """
+    return Fernet.generate_key()
+
+# Format de conteneur par blocs : [MAGIC][version][en-tête] puis les enregistrements.
+# Le premier enregistrement contient les métadonnées, les suivants les blocs de données.
+#
+# Version 1 (Fernet) : en-tête [taille_bloc], enregistrements [longueur][jeton Fernet].
+#   Chaque jeton chiffre [index][drapeau_dernier][données].
+# Version 2 (binaire) : en-tête [algorithme][taille_bloc][sel], enregistrements
+#   [nonce][données chiffrées][tag] de taille fixe (sauf le dernier). L'en-tête,
+#   l'index et le drapeau du dernier bloc sont authentifiés comme données associées.
+# Version 3 (enveloppe) : comme la version 2, mais les blocs sont chiffrés avec
+#   une clé de données aléatoire propre au fichier. L'en-tête est suivi de cette
+#   clé chiffrée par la clé maître [nonce][clé][tag], de taille fixe et exclue
+#   des données associées : rewrap() change la clé maître en réécrivant ce seul
+#   champ, sans toucher aux blocs.
+# Version 4 (phrase secrète) : comme la version 3, avec [sel][log2 N][r][p] de
+#   scrypt avant la clé enveloppée ; la clé maître est dérivée de la phrase.
+# Versions 5 et 6 (incrémental) : comme les versions 3 et 4, avec après la clé
+#   enveloppée une table [nombre de blocs][nonce][empreintes chiffrées][tag].
+#   Chaque empreinte est un BLAKE2b à clé de 16 octets sur [index][drapeau_dernier]
+#   [données en clair], avec une clé dérivée de la clé de données. La table est
+#   chiffrée avec la clé de données ; l'en-tête authentifié, le contexte "digests"
+#   et le nombre de blocs forment ses données associées. Sa place est réservée à
+#   l'écriture de l'en-tête et elle est remplie une fois tous les blocs écrits.
+#
+# Dans tous les cas, la réorganisation ou la troncature des blocs est détectée.
+#
+# Si les métadonnées indiquent une compression, chaque bloc est compressé avant
+# chiffrement et précédé d'un octet indiquant s'il l'a été ; les enregistrements
+# binaires, devenus de taille variable, sont alors préfixés par leur longueur.
+MAGIC = b"ENCS"
+FORMAT_FERNET = 1
+FORMAT_BINARY = 2
+FORMAT_ENVELOPE = 3
+FORMAT_PASSPHRASE = 4
+FORMAT_INDEXED = 5
+FORMAT_INDEXED_PASSPHRASE = 6
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+ENCRYPTED_SUFFIX = ".enc"
+OUTPUT_DIR = "outputs"
+_MAX_CHUNK_SIZE = 1024 * 1024 * 1024
+_MAX_METADATA_SIZE = 64 * 1024
+
+CIPHER_FERNET = "fernet"
+CIPHER_AES_GCM = "aes-gcm"
+CIPHER_CHACHA20 = "chacha20-poly1305"
+CIPHER_AUTO = "auto"
+DEFAULT_CIPHER = CIPHER_AES_GCM
+
+# Identifiants des algorithmes AEAD stockés dans l'en-tête binaire
+_AEAD_CIPHERS = {}
+_AEAD_IDS = {}
+
+def register_cipher(cipher_id, name, aead_class):
+    """
+    Enregistre un algorithme AEAD utilisable par encrypt_file
+    
+    L'identifiant est écrit dans l'en-tête de chaque fichier : il ne doit
+    jamais être réattribué à un autre algorithme. Pour un traitement en
+    parallèle par processus, l'enregistrement doit avoir lieu à l'import
+    d'un module, afin d'être refait dans chaque processus de travail.
+    
+    Args:
+        cipher_id (int): Identifiant stocké dans l'en-tête (1 à 255)
+        name (str): Nom de l'algorithme, à passer en cipher=
+        aead_class: Classe construite avec une clé de 32 octets et exposant
+            encrypt(nonce, données, données associées) et decrypt(...), avec
+            un nonce de 12 octets et un tag de 16 octets (API de cryptography)
+        
+    Raises:
+        ValueError: Si l'identifiant ou le nom est invalide ou déjà pris
+    """
+    if not 0 < cipher_id < 256:
+        raise ValueError(f"Identifiant d'algorithme invalide: {cipher_id}")
+    if name in (CIPHER_FERNET, CIPHER_AUTO):
+        raise ValueError(f"Nom d'algorithme réservé: {name}")
+    if _AEAD_CIPHERS.get(cipher_id, (name,))[0] != name or _AEAD_IDS.get(name, cipher_id) != cipher_id:
+        raise ValueError(f"Algorithme déjà enregistré: {cipher_id} ({name})")
+    _AEAD_CIPHERS[cipher_id] = (name, aead_class)
+    _AEAD_IDS[name] = cipher_id
+    with _SELECTION_LOCK:
+        _SELECTION.clear()
+
+_SELECTION_LOCK = threading.Lock()
+# Résultat de la mesure des algorithmes AEAD, fait une fois par processus
+_SELECTION = {}
+_SELF_BENCHMARK_SIZE = 256 * 1024
+_SELF_BENCHMARK_ROUNDS = 4
+
+register_cipher(1, CIPHER_AES_GCM, AESGCM)
+register_cipher(2, CIPHER_CHACHA20, ChaCha20Poly1305)
+
+def benchmark_ciphers():
+    """
+    Mesure rapidement le débit de chaque algorithme AEAD enregistré
+    
+    Chaque algorithme chiffre quelques blocs de _SELF_BENCHMARK_SIZE octets
+    et le meilleur temps est retenu : la mesure prend quelques
+    millisecondes. Le résultat est gardé pour la durée du processus.
+    
+    Returns:
+        dict: Débit en Mo/s par nom d'algorithme (None s'il n'est pas
+        supporté par la version d'OpenSSL utilisée)
+    """
+    with _SELECTION_LOCK:
+        if not _SELECTION:
+            data = os.urandom(_SELF_BENCHMARK_SIZE)
+            nonce = bytes(_NONCE_SIZE)
+            for name, aead_class in _AEAD_CIPHERS.values():
+                try:
+                    aead = aead_class(os.urandom(32))
+                    best = None
+                    for _ in range(_SELF_BENCHMARK_ROUNDS):
+                        started = time.perf_counter()
+                        aead.encrypt(nonce, data, None)
+                        elapsed = time.perf_counter() - started
+                        best = elapsed if best is None else min(best, elapsed)
+                    _SELECTION[name] = len(data) / (1024 * 1024) / max(best, 1e-9)
+                except Exception:
+                    # Algorithme absent de cette version d'OpenSSL
+                    _SELECTION[name] = None
+        return dict(_SELECTION)
+
+def select_cipher():
+    """
+    Algorithme AEAD à utiliser pour cipher="auto"
+    
+    La variable d'environnement ENCRYPTOR_CIPHER impose un algorithme ;
+    sinon le plus rapide d'après benchmark_ciphers() est retenu.
+    
+    Returns:
+        str: Nom de l'algorithme
+        
+    Raises:
+        ValueError: Si ENCRYPTOR_CIPHER ne désigne pas un algorithme AEAD
+            enregistré, ou si aucun n'est supporté
+    """
+    override = os.environ.get("ENCRYPTOR_CIPHER")
+    if override:
+        if override not in _AEAD_IDS:
+            raise ValueError(f"ENCRYPTOR_CIPHER désigne un algorithme inconnu: {override}")
+        return override
+    rates = {name: rate for name, rate in benchmark_ciphers().items() if rate is not None}
+    if not rates:
+        raise ValueError("Aucun algorithme AEAD n'est supporté")
+    return max(rates, key=rates.get)
+
+def _resolve_cipher(cipher):
+    """Remplace "auto" par l'algorithme retenu par select_cipher()"""
+    return select_cipher() if cipher == CIPHER_AUTO else cipher
+
+_PREAMBLE = struct.Struct(">4sB")
+_FERNET_HEADER = struct.Struct(">I")
+_BINARY_HEADER = struct.Struct(">BI16s")
+_RECORD_LENGTH = struct.Struct(">I")
+_CHUNK_PREFIX = struct.Struct(">QB")
+_NONCE_SIZE = 12
+_TAG_SIZE = 16
+_METADATA_CONTEXT = b"metadata"
+_DATA_KEY_SIZE = 32
+_WRAPPED_KEY_SIZE = _NONCE_SIZE + _DATA_KEY_SIZE + _TAG_SIZE
+_KDF_HEADER = struct.Struct(">16sBBB")
+_DIGEST_COUNT = struct.Struct(">I")
+_DIGEST_SIZE = 16
+_DIGESTS_CONTEXT = b"digests"
+
+# Paramètres scrypt par défaut (N = 2**15, environ 32 Mo de mémoire) et bornes
+# acceptées à la lecture, pour qu'un en-tête forgé ne puisse épuiser la mémoire
+SCRYPT_LOG_N = 15
+SCRYPT_R = 8
+SCRYPT_P = 1
+_MAX_SCRYPT_LOG_N = 20
+_MAX_SCRYPT_R = 32
+_MAX_SCRYPT_P = 16
+
+# Cache des clés dérivées des phrases secrètes
+KEY_CACHE_SIZE = 32
+KEY_CACHE_TTL = 300
+
+class _DerivedKeyCache:
+    """
+    Cache LRU borné des clés dérivées des phrases secrètes
+    
+    Les entrées sont indexées par l'empreinte de la phrase (jamais la phrase
+    elle-même) et les paramètres de dérivation, et expirent après ttl secondes.
+    """
+    
+    def __init__(self, max_entries=KEY_CACHE_SIZE, ttl=KEY_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_or_derive(self, cache_key, derive):
+        """
+        Renvoie la clé en cache, ou la dérive et la met en cache
+        
+        Le verrou est gardé pendant la dérivation : des fichiers traités en
+        parallèle avec la même phrase ne lancent scrypt qu'une fois, et la
+        mémoire consommée par scrypt reste bornée.
+        """
+        with self._lock:
+            now = time.monotonic()
+            for expired in [k for k, (_, expires) in self._entries.items() if expires <= now]:
+                del self._entries[expired]
+            
+            if cache_key in self._entries:
+                self._entries.move_to_end(cache_key)
+                return self._entries[cache_key][0]
+            
+            key = derive()
+            if self.max_entries > 0:
+                self._entries[cache_key] = (key, now + self.ttl)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return key
+    
+    def clear(self):
+        """Oublie toutes les clés dérivées"""
+        with self._lock:
+            self._entries.clear()
+
+_KEY_CACHE = _DerivedKeyCache()
+
+# Clé propre au processus servant à calculer l'empreinte des phrases secrètes
+_FINGERPRINT_KEY = os.urandom(32)
+
+def clear_key_cache():
+    """Oublie les clés dérivées des phrases secrètes gardées en mémoire"""
+    _KEY_CACHE.clear()
+
+class Passphrase:
+    """
+    Phrase secrète utilisable partout à la place d'une clé
+    
+    Les fichiers sont alors chiffrés au format enveloppe, la clé maître étant
+    dérivée de la phrase par scrypt. Le sel de scrypt est tiré une fois par
+    objet : chiffrer plusieurs fichiers avec la même phrase ne coûte qu'une
+    dérivation, chaque fichier gardant sa propre clé de données.
+    
+    Args:
+        passphrase (str): Phrase secrète
+        log_n (int): Logarithme en base 2 du paramètre N de scrypt
+        r (int): Paramètre r de scrypt
+        p (int): Paramètre p de scrypt
+    """
+    
+    def __init__(self, passphrase, log_n=SCRYPT_LOG_N, r=SCRYPT_R, p=SCRYPT_P):
+        if not passphrase:
+            raise ValueError("La phrase secrète est vide")
+        if not (1 <= log_n <= _MAX_SCRYPT_LOG_N and 1 <= r <= _MAX_SCRYPT_R and 1 <= p <= _MAX_SCRYPT_P):
+            raise ValueError(f"Paramètres scrypt invalides: log_n={log_n}, r={r}, p={p}")
+        if isinstance(passphrase, str):
+            passphrase = passphrase.encode('utf-8')
+        self._secret = passphrase
+        self.fingerprint = hmac.new(_FINGERPRINT_KEY, passphrase, hashlib.sha256).digest()
+        self.kdf_salt = os.urandom(16)
+        self.log_n, self.r, self.p = log_n, r, p
+    
+    def master_key(self, kdf_salt, log_n, r, p):
+        """Clé maître dérivée pour ce sel et ces paramètres (via le cache)"""
+        def derive():
+            kdf = Scrypt(salt=kdf_salt, length=32, n=2 ** log_n, r=r, p=p)
+            return base64.urlsafe_b64encode(kdf.derive(self._secret))
+        
+        return _KEY_CACHE.get_or_derive((self.fingerprint, kdf_salt, log_n, r, p), derive)
+    
+    def __repr__(self):
+        return "Passphrase(***)"
+
+def _check_key(key):
+    """
+    Vérifie qu'une clé Fernet ou une phrase secrète est utilisable
+    
+    Raises:
+        ValueError: Si la clé est invalide
+    """
+    if not isinstance(key, Passphrase):
+        Fernet(key)
+
+def _iter_chunks(stream, chunk_size):
+    """
+    Lit un flux bloc par bloc en signalant le dernier bloc
+    
+    Un fichier vide produit un unique bloc vide marqué comme dernier.
+    
+    Yields:
+        tuple: (données du bloc, est_le_dernier)
+    """
+    current = stream.read(chunk_size)
+    while True:
+        following = stream.read(chunk_size) if len(current) == chunk_size else b""
+        is_last = not following
+        yield current, is_last
+        if is_last:
+            return
+        current = following
+
+def _check_chunk_size(chunk_size):
+    """
+    Vérifie qu'une taille de bloc est utilisable
+    
+    Raises:
+        ValueError: Si la taille de bloc est invalide
+    """
+    if not 0 < chunk_size <= _MAX_CHUNK_SIZE:
+        raise ValueError(f"Taille de bloc invalide: {chunk_size}")
+    return chunk_size
+
+def _length_prefixed(record):
+    """Préfixe un enregistrement par sa longueur"""
+    return _RECORD_LENGTH.pack(len(record)) + record
+
+def _read_record(stream, max_length):
+    """
+    Lit un enregistrement [longueur][données] depuis le flux
+    
+    Returns:
+        bytes: Enregistrement lu, ou None en fin de flux
+        
+    Raises:
+        InvalidToken: Si l'enregistrement est tronqué ou incohérent
+    """
+    length_bytes = stream.read(_RECORD_LENGTH.size)
+    if not length_bytes:
+        return None
+    if len(length_bytes) != _RECORD_LENGTH.size:
+        raise InvalidToken("Fichier tronqué")
+    (length,) = _RECORD_LENGTH.unpack(length_bytes)
+    if length > max_length:
+        raise InvalidToken("Enregistrement de taille invalide")
+    record = stream.read(length)
+    if len(record) != length:
+        raise InvalidToken("Fichier tronqué")
+    return record
+
+def _unwrap_length_prefixed(raw):
+    """Retire le préfixe de longueur d'un enregistrement lu à une position donnée"""
+    if len(raw) < _RECORD_LENGTH.size:
+        raise InvalidToken("Fichier tronqué")
+    (length,) = _RECORD_LENGTH.unpack_from(raw)
+    if length != len(raw) - _RECORD_LENGTH.size:
+        raise InvalidToken("Enregistrement de taille invalide")
+    return raw[_RECORD_LENGTH.size:]
+
+def _iter_length_prefixed(stream, max_length):
+    """
+    Lit des enregistrements préfixés par leur longueur jusqu'à la fin du flux
+    
+    Yields:
+        tuple: (index, enregistrement, est_le_dernier)
+    """
+    record = _read_record(stream, max_length)
+    index = 0
+    while record is not None:
+        following = _read_record(stream, max_length)
+        yield index, record, following is None
+        record = following
+        index += 1
+
+class ZlibCompressor:
+    """Compression zlib"""
+    
+    name = "zlib"
+    
+    def __init__(self, level=6):
+        self.level = level
+    
+    def compress(self, data):
+        return zlib.compress(data, self.level)
+    
+    def decompress(self, data, max_size):
+        decompressor = zlib.decompressobj()
+        output = decompressor.decompress(data, max_size)
+        if decompressor.unconsumed_tail or not decompressor.eof:
+            raise InvalidToken("Bloc compressé invalide")
+        return output
+
+class LzmaCompressor:
+    """Compression LZMA (plus lente que zlib, meilleur taux)"""
+    
+    name = "lzma"
+    
+    def __init__(self, preset=6):
+        self.preset = preset
+    
+    def compress(self, data):
+        import lzma
+        return lzma.compress(data, preset=self.preset)
+    
+    def decompress(self, data, max_size):
+        import lzma
+        decompressor = lzma.LZMADecompressor()
+        output = decompressor.decompress(data, max_size)
+        if not decompressor.eof:
+            raise InvalidToken("Bloc compressé invalide")
+        return output
+
+_COMPRESSORS = {}
+
+def register_compressor(compressor):
+    """
+    Enregistre un algorithme de compression utilisable par encrypt_file
+    
+    Args:
+        compressor: Objet exposant name, compress(data) et
+            decompress(data, max_size) ; il doit pouvoir être transmis à un
+            processus de travail (pickle)
+    """
+    _COMPRESSORS[compressor.name] = compressor
+
+register_compressor(ZlibCompressor())
+register_compressor(LzmaCompressor())
+
+def _get_compressor(name):
+    """
+    Renvoie l'algorithme de compression enregistré sous ce nom
+    
+    Raises:
+        ValueError: Si l'algorithme est inconnu
+    """
+    if name is None:
+        return None
+    if name not in _COMPRESSORS:
+        raise ValueError(f"Algorithme de compression inconnu: {name}")
+    return _COMPRESSORS[name]
+
+# Extensions de formats déjà compressés, pour lesquels la compression est inutile
+INCOMPRESSIBLE_EXTENSIONS = {
+    '.7z', '.avi', '.br', '.bz2', '.docx', '.enc', '.flac', '.gif', '.gz', '.heic',
+    '.jpeg', '.jpg', '.mkv', '.mov', '.mp3', '.mp4', '.ogg', '.png', '.pptx', '.rar',
+    '.tgz', '.webm', '.webp', '.xlsx', '.xz', '.zip', '.zst',
+}
+_SAMPLE_SIZE = 64 * 1024
+_MIN_COMPRESSION_GAIN = 0.1
+
+def _is_compressible(file_path):
+    """
+    Estime si un fichier gagne à être compressé
+    
+    Les extensions de formats déjà compressés sont écartées d'emblée ; sinon
+    des échantillons pris au début, au milieu et à la fin du fichier sont
+    compressés rapidement et le gain doit dépasser _MIN_COMPRESSION_GAIN.
+    """
+    if Path(file_path).suffix.lower() in INCOMPRESSIBLE_EXTENSIONS:
+        return False
+    
+    with open(file_path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        sample = b""
+        for position in sorted({0, max(size // 2 - _SAMPLE_SIZE // 2, 0), max(size - _SAMPLE_SIZE, 0)}):
+            file.seek(position)
+            sample += file.read(_SAMPLE_SIZE)
+    if not sample:
+        return False
+    return len(zlib.compress(sample, 1)) < len(sample) * (1 - _MIN_COMPRESSION_GAIN)
+
+_RAW_CHUNK = b"\x00"
+_COMPRESSED_CHUNK = b"\x01"
+
+def _pack_chunk(compressor, chunk):
+    """Compresse un bloc si cela réduit sa taille, en le précédant d'un indicateur"""
+    if compressor is None:
+        return chunk
+    compressed = compressor.compress(chunk)
+    if len(compressed) < len(chunk):
+        return _COMPRESSED_CHUNK + compressed
+    return _RAW_CHUNK + chunk
+
+def _unpack_chunk(compressor, payload, chunk_size):
+    """Décompresse un bloc produit par _pack_chunk"""
+    if compressor is None:
+        return payload
+    payload = memoryview(payload)
+    flag, data = payload[:1], payload[1:]
+    if flag == _RAW_CHUNK:
+        return data
+    if flag == _COMPRESSED_CHUNK:
+        return compressor.decompress(data, chunk_size)
+    raise InvalidToken("Bloc compressé invalide")
+
+def _fernet_token_length(plaintext_length):
+    """Taille d'un jeton Fernet pour un texte clair de taille donnée"""
+    # Jeton = base64(version + horodatage + IV + données chiffrées + HMAC)
+    raw_length = 1 + 8 + 16 + (plaintext_length // 16 + 1) * 16 + 32
+    return (raw_length + 2) // 3 * 4
+
+class _FernetCodec:
+    """Blocs du format version 1 : jetons Fernet encodés en base64"""
+    
+    version = FORMAT_FERNET
+    cipher_name = CIPHER_FERNET
+    
+    def __init__(self, key, chunk_size):
+        self.key = key
+        self.chunk_size = chunk_size
+        self.compressor = None
+    
+    @classmethod
+    def read_header(cls, stream, key):
+        """Lit la suite de l'en-tête et construit le codec correspondant"""
+        header = bytes(stream.read(_FERNET_HEADER.size))
+        if len(header) != _FERNET_HEADER.size:
+            raise InvalidToken("Fichier tronqué")
+        (chunk_size,) = _FERNET_HEADER.unpack(header)
+        return cls(key, _check_chunk_size(chunk_size))
+    
+    def header(self):
+        """En-tête complet du conteneur"""
+        return _PREAMBLE.pack(MAGIC, self.version) + _FERNET_HEADER.pack(self.chunk_size)
+    
+    def seal_metadata(self, metadata):
+        """Chiffre l'enregistrement de métadonnées"""
+        return _length_prefixed(Fernet(self.key).encrypt(metadata))
+    
+    def open_metadata(self, stream):
+        """Lit et déchiffre l'enregistrement de métadonnées"""
+        token = _read_record(stream, _fernet_token_length(_MAX_METADATA_SIZE))
+        if token is None:
+            raise InvalidToken("Fichier tronqué")
+        try:
+            return Fernet(self.key).decrypt(bytes(token))
+        except InvalidToken:
+            raise InvalidToken("Clé de déchiffrement incorrecte ou fichier corrompu")
+    
+    @property
+    def fixed_records(self):
+        """Les enregistrements ont une taille fixe, sauf avec compression"""
+        return self.compressor is None
+    
+    @property
+    def length_prefix_size(self):
+        """Taille du préfixe de longueur retiré des enregistrements par iter_records"""
+        return _RECORD_LENGTH.size
+    
+    @property
+    def record_size(self):
+        """Taille d'un enregistrement de bloc complet, préfixe de longueur compris"""
+        return _RECORD_LENGTH.size + _fernet_token_length(_CHUNK_PREFIX.size + self.chunk_size)
+    
+    def unwrap_record(self, raw):
+        """Retire le préfixe de longueur d'un enregistrement lu à une position donnée"""
+        return _unwrap_length_prefixed(raw)
+    
+    def seal_chunk(self, index, chunk, is_last):
+        """
+        Chiffre un bloc (exécutable dans un processus de travail)
+        
+        Returns:
+            tuple: Parties de l'enregistrement, à écrire à la suite sans les concaténer
+        """
+        payload = _pack_chunk(self.compressor, chunk)
+        token = Fernet(self.key).encrypt(_CHUNK_PREFIX.pack(index, is_last) + payload)
+        return _RECORD_LENGTH.pack(len(token)), token
+    
+    def iter_records(self, stream):
+        """
+        Lit les enregistrements de blocs restants
+        
+        Le drapeau du dernier bloc est chiffré : il n'est connu qu'après
+        déchiffrement.
+        
+        Yields:
+            tuple: (index, enregistrement, None)
+        """
+        max_length = _fernet_token_length(_CHUNK_PREFIX.size + 1 + self.chunk_size)
+        index = 0
+        while True:
+            token = _read_record(stream, max_length)
+            if token is None:
+                return
+            yield index, token, None
+            index += 1
+    
+    def open_chunk(self, index, token, is_last):
+        """
+        Déchiffre un bloc (exécutable dans un processus de travail)
+        
+        Returns:
+            tuple: (est_le_dernier, données en clair)
+        """
+        try:
+            plaintext = Fernet(self.key).decrypt(bytes(token))
+        except InvalidToken:
+            raise InvalidToken("Clé de déchiffrement incorrecte ou fichier corrompu")
+        chunk_index, chunk_is_last = _CHUNK_PREFIX.unpack_from(plaintext)
+        if chunk_index != index:
+            raise InvalidToken("Blocs réordonnés ou manquants")
+        payload = memoryview(plaintext)[_CHUNK_PREFIX.size:]
+        chunk = _unpack_chunk(self.compressor, payload, self.chunk_size)
+        return bool(chunk_is_last), chunk
+
+class _BinaryCodec:
+    """Blocs du format version 2 : AEAD binaire sans encodage base64"""
+    
+    version = FORMAT_BINARY
+    
+    def __init__(self, key, chunk_size, cipher_id, salt):
+        self.chunk_size = chunk_size
+        self.cipher_id = cipher_id
+        self.salt = salt
+        self.aead_key = _derive_aead_key(key, cipher_id, salt)
+        self.associated_data = self.authenticated_header()
+        self.compressor = None
+    
+    @classmethod
+    def create(cls, key, chunk_size, cipher):
+        """Construit un codec avec un sel aléatoire pour un nouveau fichier"""
+        return cls(key, chunk_size, _AEAD_IDS[cipher], os.urandom(16))
+    
+    @classmethod
+    def read_header(cls, stream, key):
+        """Lit la suite de l'en-tête et construit le codec correspondant"""
+        header = bytes(stream.read(_BINARY_HEADER.size))
+        if len(header) != _BINARY_HEADER.size:
+            raise InvalidToken("Fichier tronqué")
+        cipher_id, chunk_size, salt = _BINARY_HEADER.unpack(header)
+        if cipher_id not in _AEAD_CIPHERS:
+            raise ValueError(f"Algorithme de chiffrement inconnu: {cipher_id}")
+        return cls(key, _check_chunk_size(chunk_size), cipher_id, salt)
+    
+    def authenticated_header(self):
+        """Partie de l'en-tête authentifiée avec chaque enregistrement"""
+        return (_PREAMBLE.pack(MAGIC, self.version)
+                + _BINARY_HEADER.pack(self.cipher_id, self.chunk_size, self.salt))
+    
+    def header(self):
+        """En-tête complet du conteneur"""
+        return self.authenticated_header()
+    
+    @property
+    def cipher_name(self):
+        """Nom de l'algorithme AEAD utilisé"""
+        return _AEAD_CIPHERS[self.cipher_id][0]
+    
+    @property
+    def fixed_records(self):
+        """Les enregistrements ont une taille fixe, sauf avec compression"""
+        return self.compressor is None
+    
+    @property
+    def length_prefix_size(self):
+        """Taille du préfixe de longueur retiré des enregistrements par iter_records"""
+        return 0 if self.fixed_records else _RECORD_LENGTH.size
+    
+    @property
+    def record_size(self):
+        """Taille d'un enregistrement de bloc complet (sans compression)"""
+        return _NONCE_SIZE + self.chunk_size + _TAG_SIZE
+    
+    def unwrap_record(self, raw):
+        """Retire l'éventuel préfixe de longueur d'un enregistrement"""
+        return raw if self.fixed_records else _unwrap_length_prefixed(raw)
+    
+    def _seal(self, plaintext, associated_data):
+        """Chiffre des données et renvoie (nonce, données chiffrées et tag)"""
+        nonce = os.urandom(_NONCE_SIZE)
+        aead = _AEAD_CIPHERS[self.cipher_id][1](self.aead_key)
+        return nonce, aead.encrypt(nonce, plaintext, associated_data)
+    
+    def _open(self, record, associated_data):
+        if len(record) < _NONCE_SIZE + _TAG_SIZE:
+            raise InvalidToken("Fichier tronqué")
+        aead = _AEAD_CIPHERS[self.cipher_id][1](self.aead_key)
+        # Découper une vue évite de recopier l'enregistrement
+        record = memoryview(record)
+        try:
+            return aead.decrypt(record[:_NONCE_SIZE], record[_NONCE_SIZE:], associated_data)
+        except InvalidTag:
+            raise InvalidToken("Clé de déchiffrement incorrecte ou fichier corrompu")
+    
+    def seal_metadata(self, metadata):
+        """Chiffre l'enregistrement de métadonnées"""
+        return _length_prefixed(b"".join(self._seal(metadata, self.associated_data + _METADATA_CONTEXT)))
+    
+    def open_metadata(self, stream):
+        """Lit et déchiffre l'enregistrement de métadonnées"""
+        record = _read_record(stream, _NONCE_SIZE + _MAX_METADATA_SIZE + _TAG_SIZE)
+        if record is None:
+            raise InvalidToken("Fichier tronqué")
+        return self._open(record, self.associated_data + _METADATA_CONTEXT)
+    
+    def seal_chunk(self, index, chunk, is_last):
+        """
+        Chiffre un bloc (exécutable dans un processus de travail)
+        
+        Returns:
+            tuple: Parties de l'enregistrement, à écrire à la suite sans les concaténer
+        """
+        payload = _pack_chunk(self.compressor, chunk)
+        nonce, ciphertext = self._seal(payload, self.associated_data + _CHUNK_PREFIX.pack(index, is_last))
+        if self.fixed_records:
+            return nonce, ciphertext
+        return _RECORD_LENGTH.pack(len(nonce) + len(ciphertext)), nonce, ciphertext
+    
+    def iter_records(self, stream):
+        """
+        Lit les enregistrements de blocs restants
+        
+        Le dernier bloc est celui qui précède la fin du fichier ; une lecture
+        anticipée d'un enregistrement permet de le reconnaître.
+        
+        Yields:
+            tuple: (index, enregistrement, est_le_dernier)
+        """
+        if not self.fixed_records:
+            yield from _iter_length_prefixed(stream, self.record_size + 1)
+            return
+        record = stream.read(self.record_size)
+        index = 0
+        while record:
+            following = stream.read(self.record_size) if len(record) == self.record_size else b""
+            yield index, record, not following
+            record = following
+            index += 1
+    
+    def open_chunk(self, index, record, is_last):
+        """
+        Déchiffre un bloc (exécutable dans un processus de travail)
+        
+        Returns:
+            tuple: (est_le_dernier, données en clair)
+        """
+        payload = self._open(record, self.associated_data + _CHUNK_PREFIX.pack(index, is_last))
+        return is_last, _unpack_chunk(self.compressor, payload, self.chunk_size)
+
+class _EnvelopeCodec(_BinaryCodec):
+    """Blocs du format version 3 : format binaire avec clé de données enveloppée"""
+    
+    version = FORMAT_ENVELOPE
+    
+    def __init__(self, data_key, chunk_size, cipher_id, salt, wrapped_key):
+        super().__init__(data_key, chunk_size, cipher_id, salt)
+        self.data_key = data_key
+        self.key_header = b""
+        self.wrapped_key = wrapped_key
+    
+    @classmethod
+    def create(cls, key, chunk_size, cipher):
+        """Construit un codec avec une clé de données et un sel aléatoires"""
+        data_key = base64.urlsafe_b64encode(os.urandom(_DATA_KEY_SIZE))
+        codec = cls(data_key, chunk_size, _AEAD_IDS[cipher], os.urandom(16), None)
+        codec.wrap(key)
+        return codec
+    
+    @classmethod
+    def read_header(cls, stream, key):
+        """Lit la suite de l'en-tête et déchiffre la clé de données"""
+        header = bytes(stream.read(_BINARY_HEADER.size))
+        if len(header) != _BINARY_HEADER.size:
+            raise InvalidToken("Fichier tronqué")
+        cipher_id, chunk_size, salt = _BINARY_HEADER.unpack(header)
+        if cipher_id not in _AEAD_CIPHERS:
+            raise ValueError(f"Algorithme de chiffrement inconnu: {cipher_id}")
+        key_header, master_key = cls._read_key_header(stream, key)
+        wrapped_key = bytes(stream.read(_WRAPPED_KEY_SIZE))
+        if len(wrapped_key) != _WRAPPED_KEY_SIZE:
+            raise InvalidToken("Fichier tronqué")
+        authenticated = _PREAMBLE.pack(MAGIC, cls.version) + header
+        
+        aead = AESGCM(_derive_wrapping_key(master_key, salt))
+        try:
+            data_key = aead.decrypt(wrapped_key[:_NONCE_SIZE], wrapped_key[_NONCE_SIZE:],
+                                    authenticated + key_header)
+        except InvalidTag:
+            raise InvalidToken("Clé de déchiffrement incorrecte ou fichier corrompu")
+        codec = cls(base64.urlsafe_b64encode(data_key), _check_chunk_size(chunk_size),
+                    cipher_id, salt, wrapped_key)
+        codec.key_header = key_header
+        return codec
+    
+    @classmethod
+    def _read_key_header(cls, stream, key):
+        """
+        Lit les paramètres propres à la clé maître placés avant la clé enveloppée
+        
+        Returns:
+            tuple: (octets lus, clé maître)
+        """
+        return b"", key
+    
+    def _master_key(self, key):
+        """Paramètres à écrire et clé maître correspondant à une nouvelle clé"""
+        return b"", key
+    
+    def wrap(self, key):
+        """Chiffre la clé de données avec une clé maître (nonce neuf à chaque appel)"""
+        self.key_header, master_key = self._master_key(key)
+        nonce = os.urandom(_NONCE_SIZE)
+        aead = AESGCM(_derive_wrapping_key(master_key, self.salt))
+        self.wrapped_key = nonce + aead.encrypt(nonce, base64.urlsafe_b64decode(self.data_key),
+                                                self.authenticated_header() + self.key_header)
+    
+    def header(self):
+        """En-tête complet du conteneur, clé de données enveloppée comprise"""
+        return self.authenticated_header() + self.key_header + self.wrapped_key
+
+class _PassphraseCodec(_EnvelopeCodec):
+    """
+    Blocs du format version 4 : format enveloppe protégé par une phrase secrète
+    
+    La clé maître est dérivée de la phrase par scrypt ; le sel et les
+    paramètres de scrypt précèdent la clé enveloppée et peuvent changer avec
+    elle lors d'un rewrap().
+    """
+    
+    version = FORMAT_PASSPHRASE
+    
+    @classmethod
+    def _read_key_header(cls, stream, passphrase):
+        key_header = bytes(stream.read(_KDF_HEADER.size))
+        if len(key_header) != _KDF_HEADER.size:
+            raise InvalidToken("Fichier tronqué")
+        kdf_salt, log_n, r, p = _KDF_HEADER.unpack(key_header)
+        if not (1 <= log_n <= _MAX_SCRYPT_LOG_N and 1 <= r <= _MAX_SCRYPT_R and 1 <= p <= _MAX_SCRYPT_P):
+            raise InvalidToken("Paramètres de dérivation invalides")
+        return key_header, passphrase.master_key(kdf_salt, log_n, r, p)
+    
+    def _master_key(self, passphrase):
+        key_header = _KDF_HEADER.pack(passphrase.kdf_salt, passphrase.log_n, passphrase.r, passphrase.p)
+        return key_header, passphrase.master_key(passphrase.kdf_salt, passphrase.log_n,
+                                                 passphrase.r, passphrase.p)
+
+class _DigestTableMixin:
+    """
+    Table des empreintes des blocs en clair, placée à la fin de l'en-tête
+    
+    L'empreinte d'un bloc est un BLAKE2b à clé, dérivée de la clé de
+    données, de son index, du drapeau de dernier bloc et de son contenu :
+    elle ne révèle rien sans la clé. La table est chiffrée avec l'en-tête
+    comme donnée associée ; sa taille ne dépend que du nombre de blocs, ce
+    qui permet de la réserver puis de l'écrire une fois les blocs chiffrés.
+    """
+    
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.digest_key = _derive_digest_key(self.data_key, self.salt)
+        self.digest_count = 0
+        self.digests = []
+    
+    @classmethod
+    def read_header(cls, stream, key):
+        """Lit l'en-tête du format enveloppe puis déchiffre la table des empreintes"""
+        codec = super().read_header(stream, key)
+        count = bytes(stream.read(_DIGEST_COUNT.size))
+        if len(count) != _DIGEST_COUNT.size:
+            raise InvalidToken("Fichier tronqué")
+        codec.digest_count, = _DIGEST_COUNT.unpack(count)
+        sealed = stream.read(codec.digest_table_size - _DIGEST_COUNT.size)
+        if len(sealed) != codec.digest_table_size - _DIGEST_COUNT.size:
+            raise InvalidToken("Fichier tronqué")
+        table = codec._open(sealed, codec._digests_associated_data())
+        codec.digests = [table[i:i + _DIGEST_SIZE] for i in range(0, len(table), _DIGEST_SIZE)]
+        return codec
+    
+    @property
+    def digest_table_size(self):
+        """Taille de la table des empreintes chiffrée, nombre d'empreintes compris"""
+        return _DIGEST_COUNT.size + _NONCE_SIZE + self.digest_count * _DIGEST_SIZE + _TAG_SIZE
+    
+    def _digests_associated_data(self):
+        return self.associated_data + _DIGESTS_CONTEXT + _DIGEST_COUNT.pack(self.digest_count)
+    
+    def digest_table(self):
+        """Table des empreintes chiffrée, ou sa place réservée tant qu'elles ne sont pas toutes connues"""
+        count = _DIGEST_COUNT.pack(self.digest_count)
+        if len(self.digests) != self.digest_count:
+            return count + bytes(self.digest_table_size - len(count))
+        nonce, sealed = self._seal(b"".join(self.digests), self._digests_associated_data())
+        return count + nonce + sealed
+    
+    def header(self):
+        """En-tête complet du conteneur, table des empreintes comprise"""
+        return super().header() + self.digest_table()
+    
+    def digest(self, index, chunk, is_last):
+        """Empreinte d'un bloc en clair"""
+        digest = hashlib.blake2b(key=self.digest_key, digest_size=_DIGEST_SIZE)
+        digest.update(_CHUNK_PREFIX.pack(index, is_last))
+        digest.update(chunk)
+        return digest.digest()
+    
+    def seal_changed_chunk(self, index, chunk, is_last, known_digest):
+        """
+        Chiffre un bloc s'il diffère du bloc de même index de la version
+        précédente (exécutable dans un processus de travail)
+        
+        Returns:
+            tuple: (empreinte, parties de l'enregistrement...), l'empreinte
+            seule si le bloc est inchangé
+        """
+        digest = self.digest(index, chunk, is_last)
+        if known_digest is not None and hmac.compare_digest(digest, known_digest):
+            return (digest,)
+        return (digest,) + self.seal_chunk(index, chunk, is_last)
+
+class _IndexedCodec(_DigestTableMixin, _EnvelopeCodec):
+    """Blocs du format version 5 : format enveloppe avec empreintes des blocs"""
+    
+    version = FORMAT_INDEXED
+
+class _IndexedPassphraseCodec(_DigestTableMixin, _PassphraseCodec):
+    """Blocs du format version 6 : format phrase secrète avec empreintes des blocs"""
+    
+    version = FORMAT_INDEXED_PASSPHRASE
+
+_CODECS = {
+    FORMAT_FERNET: _FernetCodec,
+    FORMAT_BINARY: _BinaryCodec,
+    FORMAT_ENVELOPE: _EnvelopeCodec,
+    FORMAT_PASSPHRASE: _PassphraseCodec,
+    FORMAT_INDEXED: _IndexedCodec,
+    FORMAT_INDEXED_PASSPHRASE: _IndexedPassphraseCodec,
+}
+_PASSPHRASE_FORMATS = {FORMAT_PASSPHRASE, FORMAT_INDEXED_PASSPHRASE}
+
+def _derive_aead_key(key, cipher_id, salt):
+    """Dérive la clé AEAD propre à un fichier à partir de la clé Fernet"""
+    hkdf = HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        info=b"encryptor_app " + _AEAD_CIPHERS[cipher_id][0].encode('ascii'),
+    )
+    return hkdf.derive(base64.urlsafe_b64decode(key))
+
+def _derive_wrapping_key(key, salt):
+    """Dérive la clé qui chiffre la clé de données d'un fichier (format enveloppe)"""
+    hkdf = HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        info=b"encryptor_app key wrap",
+    )
+    return hkdf.derive(base64.urlsafe_b64decode(key))
+
+def _derive_digest_key(data_key, salt):
+    """Dérive la clé des empreintes de blocs d'un fichier à partir de sa clé de données"""
+    hkdf = HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        info=b"encryptor_app chunk digests",
+    )
+    return hkdf.derive(base64.urlsafe_b64decode(data_key))
+
+def _new_codec(key, chunk_size, cipher, indexed=False):
+    """
+    Construit le codec d'écriture correspondant à l'algorithme demandé
+    
+    Avec indexed, le format garde les empreintes des blocs (AEAD seulement).
+    """
+    cipher = _resolve_cipher(cipher)
+    if isinstance(key, Passphrase):
+        if cipher not in _AEAD_IDS:
+            raise ValueError(f"Algorithme incompatible avec une phrase secrète: {cipher}")
+        codec_class = _IndexedPassphraseCodec if indexed else _PassphraseCodec
+        return codec_class.create(key, chunk_size, cipher)
+    if cipher in _AEAD_IDS:
+        codec_class = _IndexedCodec if indexed else _EnvelopeCodec
+        return codec_class.create(key, chunk_size, cipher)
+    if cipher == CIPHER_FERNET and not indexed:
+        return _FernetCodec(key, chunk_size)
+    if cipher == CIPHER_FERNET:
+        raise ValueError("Le chiffrement incrémental nécessite un algorithme AEAD")
+    raise ValueError(f"Algorithme de chiffrement inconnu: {cipher}")
+
+def _read_codec(stream, key):
+    """
+    Identifie le format d'un fichier chiffré grâce à son nombre magique
+    
+    Returns:
+        Codec du conteneur, ou None pour l'ancien format (un seul jeton Fernet)
+        
+    Raises:
+        InvalidToken: Si le fichier attend une clé et non une phrase secrète, ou l'inverse
+        ValueError: Si la version du format n'est pas supportée
+    """
+    preamble = bytes(stream.read(_PREAMBLE.size))
+    if len(preamble) < _PREAMBLE.size or preamble[:len(MAGIC)] != MAGIC:
+        version = None
+    else:
+        _, version = _PREAMBLE.unpack(preamble)
+        if version not in _CODECS:
+            raise ValueError(f"Version de format non supportée: {version}")
+    
+    if isinstance(key, Passphrase) != (version in _PASSPHRASE_FORMATS):
+        if version in _PASSPHRASE_FORMATS:
+            raise InvalidToken("Ce fichier est protégé par une phrase secrète")
+        raise InvalidToken("Ce fichier est protégé par une clé et non par une phrase secrète")
+    if version is None:
+        stream.seek(0)
+        return None
+    return _CODECS[version].read_header(stream, key)
+
+def _ordered_map(executor, function, arguments, max_pending):
+    """
+    Applique une fonction à une suite d'arguments en conservant l'ordre
+    
+    Sans exécuteur, les appels sont faits directement. Avec un exécuteur,
+    au plus max_pending tâches sont en vol, ce qui borne la mémoire utilisée.
+    
+    Yields:
+        Résultats de la fonction, dans l'ordre des arguments
+    """
+    if executor is None:
+        for args in arguments:
+            yield function(*args)
+        return
+    
+    pending = deque()
+    try:
+        for args in arguments:
+            pending.append(executor.submit(function, *args))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+class _ParallelContext:
+    """
+    Fournit l'exécuteur utilisé pour traiter les blocs
+    
+    Un exécuteur fourni par l'appelant est réutilisé tel quel ; sinon un pool
+    de processus est créé pour workers > 1 puis fermé en sortie.
+    """
+    
+    def __init__(self, workers, executor):
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError(f"Nombre de workers invalide: {workers}")
+        self.workers = workers
+        self.executor = executor
+        self.owned = executor is None and workers > 1
+    
+    def __enter__(self):
+        if self.owned:
+            # Import différé : multiprocessing est coûteux à charger
+            from concurrent.futures import ProcessPoolExecutor
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.owned:
+            self.executor.shutdown(wait=True)
+    
+    @property
+    def max_pending(self):
+        """Nombre maximal de blocs en vol"""
+        return 2 * self.workers
+
+def _report_progress(progress, cancel_event, done, total):
+    """
+    Signale l'avancement d'une opération et vérifie son annulation
+    
+    Raises:
+        OperationCancelled: Si l'événement d'annulation est positionné
+    """
+    if cancel_event is not None and cancel_event.is_set():
+        raise OperationCancelled("Opération annulée")
+    if progress is not None:
+        progress(done, total)
+
+def _build_metadata(original_path, original_size, compression=None):
+    """
+    Construit les métadonnées JSON du fichier original
+    
+    Le nom et la taille sont omis lorsqu'ils sont inconnus (None), par
+    exemple pour un flux.
+    """
+    metadata = {}
+    if original_path is not None:
+        metadata['original_extension'] = original_path.suffix
+        metadata['original_name'] = original_path.stem
+    if original_size is not None:
+        metadata['original_size'] = original_size
+    if compression is not None:
+        metadata['compression'] = compression
+    return json.dumps(metadata).encode('utf-8')
+
+def _check_not_bundle(metadata):
+    """
+    Refuse de déchiffrer une archive (create_bundle) comme un fichier unique
+    
+    Raises:
+        ValueError: Si les métadonnées sont celles d'une archive
+    """
+    if 'bundle' in metadata:
+        raise ValueError("Ce fichier est une archive : utilisez extract_bundle()")
+
+def _encrypted_output_path(original_path, output_dir=None):
+    """Chemin du fichier chiffré : nom complet de l'original suivi de .enc"""
+    return Path(output_dir or OUTPUT_DIR) / f"{original_path.name}{ENCRYPTED_SUFFIX}"
+
+def _decrypted_output_path(metadata, file_path, output_dir=None):
+    """Chemin du fichier déchiffré dans le dossier de sortie"""
+    original_extension = metadata.get('original_extension', '')
+    original_name = metadata.get('original_name', Path(file_path).stem)
+    
+    if original_extension:
+        decrypted_filename = f"{original_name}_decrypted{original_extension}"
+    else:
+        decrypted_filename = f"{original_name}_decrypted"
+    
+    return Path(output_dir or OUTPUT_DIR) / decrypted_filename
+
+def _remove_partial(path):
+    """Supprime un fichier de sortie incomplet"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def _candidate_paths(path):
+    """
+    Noms de sortie possibles : le nom demandé puis "nom (1).ext", "nom (2).ext"...
+    
+    Yields:
+        Path: Chemins candidats
+    """
+    yield path
+    counter = 1
+    while True:
+        yield path.with_name(f"{path.stem} ({counter}){path.suffix}")
+        counter += 1
+
+def _fsync_directory(directory):
+    """Rend durable la création d'une entrée de répertoire (sans effet sous Windows)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+class _AtomicOutput:
+    """
+    Fichier de sortie écrit sous un nom temporaire puis renommé atomiquement
+    
+    Aucun lecteur ne voit de fichier à moitié écrit et un échec ne laisse
+    que le fichier temporaire, supprimé aussitôt. Sans overwrite, le nom
+    final est réservé de façon exclusive (O_EXCL) : des tâches parallèles
+    visant le même nom obtiennent "nom (1).ext", "nom (2).ext"... Avec
+    fsync, le fichier est écrit sur le disque avant le renommage, puis le
+    répertoire après, pour que le renommage survive à une coupure.
+    
+    Avec partial_path, le fichier temporaire a un nom fixe, est ouvert en
+    lecture/écriture sans être vidé et n'est pas supprimé en cas d'échec :
+    c'est le fichier partiel d'un chiffrement avec reprise.
+    """
+    
+    def __init__(self, path, stats=None, overwrite=False, fsync=False, partial_path=None):
+        self.path = Path(path)
+        self.stats = stats or OperationStats()
+        self.overwrite = overwrite
+        self.fsync = fsync
+        self.partial_path = partial_path
+        self.temp_path = None
+        self._stream = None
+    
+    def __enter__(self):
+        directory = self.path.parent
+        with self.stats.measure('open'):
+            os.makedirs(directory, exist_ok=True)
+            if self.partial_path is not None:
+                self.temp_path = Path(self.partial_path)
+                fd = os.open(self.temp_path, os.O_CREAT | os.O_RDWR | getattr(os, 'O_BINARY', 0),
+                             0o666)
+                self._stream = _TimedStream(os.fdopen(fd, 'r+b'), self.stats)
+                return self._stream
+            # Pas de mkstemp : ses droits 0600 remplaceraient ceux du umask
+            while True:
+                self.temp_path = directory / f".{self.path.name}.{os.urandom(4).hex()}.part"
+                try:
+                    fd = os.open(self.temp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY
+                                 | getattr(os, 'O_BINARY', 0), 0o666)
+                    break
+                except FileExistsError:
+                    continue
+            self._stream = _TimedStream(os.fdopen(fd, 'wb'), self.stats)
+        return self._stream
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None and self.fsync:
+                self._stream.fsync()
+        finally:
+            self._stream.close()
+        if exc_type is not None:
+            if self.partial_path is None:
+                _remove_partial(self.temp_path)
+            return False
+        
+        try:
+            self.path = self._commit()
+        except BaseException:
+            if self.partial_path is None:
+                _remove_partial(self.temp_path)
+            raise
+        if self.fsync:
+            with self.stats.measure('fsync'):
+                _fsync_directory(self.path.parent)
+        return False
+    
+    def _commit(self):
+        """Renomme le fichier temporaire vers son nom définitif"""
+        if self.overwrite:
+            os.replace(self.temp_path, self.path)
+            return self.path
+        for candidate in _candidate_paths(self.path):
+            try:
+                fd = os.open(candidate, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+            except FileExistsError:
+                continue
+            os.close(fd)
+            try:
+                os.replace(self.temp_path, candidate)
+            except OSError:
+                # Ne pas laisser le fichier vide réservé sous ce nom
+                os.remove(candidate)
+                raise
+            return candidate
+
+def encrypt_file(file_path, key, chunk_size=DEFAULT_CHUNK_SIZE, workers=1, executor=None,
+                 cipher=DEFAULT_CIPHER, progress=None, cancel_event=None, stats=None,
+                 stats_sink=None, fsync=False, compression=None, output_dir=None, overwrite=False,
+                 resume=False, incremental=False, previous=None):
+    """
+    Chiffre un fichier avec la clé fournie
+    
+    Le fichier est lu et chiffré bloc par bloc : la mémoire utilisée
+    dépend de la taille des blocs et non de celle du fichier. Les blocs
+    étant indépendants, ils peuvent être chiffrés en parallèle puis
+    écrits dans l'ordre.
+    
+    Si une compression est demandée, elle n'est appliquée que lorsqu'un
+    échantillon du fichier se compresse bien (les JPEG, ZIP, etc. sont
+    chiffrés tels quels) ; l'algorithme retenu est noté dans les métadonnées.
+    
+    Le fichier chiffré s'appelle "nom.ext.enc" ; il est écrit sous un nom
+    temporaire puis renommé atomiquement. Si le nom est déjà pris, un
+    suffixe " (1)", " (2)"... est ajouté, sauf avec overwrite : plusieurs
+    chiffrements peuvent ainsi viser le même dossier en parallèle.
+    
+    Avec resume, le fichier partiel (".nom.ext.enc.resume") est conservé
+    en cas d'interruption, accompagné d'un journal (".nom.ext.enc.journal")
+    des blocs écrits sur le disque. Relancer le même chiffrement reprend
+    après le dernier bloc journalisé, dont l'intégrité est vérifiée, sans
+    relire ni rechiffrer le début du fichier. Si le fichier source a changé
+    entre-temps, ou si les paramètres diffèrent, le chiffrement repart du
+    début.
+    
+    Avec incremental, l'en-tête garde une empreinte de chaque bloc en
+    clair. Si une version chiffrée précédente existe (previous, par défaut
+    le fichier de sortie), seuls les blocs dont l'empreinte a changé sont
+    chiffrés ; les autres enregistrements sont recopiés tels quels, sans
+    être déchiffrés. La version précédente est ignorée si elle a été
+    chiffrée avec une autre clé, un autre algorithme, une autre taille de
+    bloc ou une autre compression. Sans previous, la nouvelle version
+    remplace toujours la précédente (overwrite est implicite) : chaque
+    passage repart ainsi de la dernière version.
+    
+    Args:
+        file_path (str): Chemin vers le fichier à chiffrer
+        key (bytes): Clé de chiffrement
+        chunk_size (int): Taille des blocs de données en octets
+        workers (int): Nombre de processus de chiffrement (None = nombre de cœurs)
+        executor (Executor): Exécuteur partagé à utiliser à la place d'un pool dédié
+        cipher (str): Algorithme ("aes-gcm", "chacha20-poly1305", "fernet" ou
+            "auto" pour le plus rapide sur cette machine, voir select_cipher)
+        progress (callable): Appelée avec (octets traités, octets au total) après chaque bloc
+        cancel_event (threading.Event): Annule l'opération lorsqu'il est positionné
+        stats (OperationStats): Statistiques par phase à remplir
+        stats_sink (callable): Reçoit les statistiques à la fin de l'opération
+        fsync (bool): Force l'écriture du fichier chiffré et de son entrée de
+            répertoire sur le disque
+        compression (str): Algorithme de compression ("zlib", "lzma", ou None)
+        output_dir (str): Dossier de sortie (par défaut "outputs")
+        overwrite (bool): Remplace un fichier existant au lieu de choisir un autre nom
+        resume (bool): Conserve un fichier partiel et un journal pour reprendre
+            un chiffrement interrompu
+        incremental (bool): Garde les empreintes des blocs et reprend les blocs
+            inchangés de la version précédente (algorithme AEAD uniquement)
+        previous (str): Version chiffrée précédente (avec incremental)
+        
+    Returns:
+        str: Chemin vers le fichier chiffré
+        
+    Raises:
+        FileNotFoundError: Si le fichier n'existe pas
+        ValueError: Si la taille de bloc, l'algorithme ou la compression est
+            invalide, si le même chiffrement avec reprise est déjà en cours ou
+            si resume et incremental sont combinés
+        OperationCancelled: Si l'opération est annulée (le fichier partiel est
+            supprimé, sauf avec resume)
+        Exception: Pour toute autre erreur de chiffrement
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Le fichier {file_path} n'existe pas")
+    
+    encrypted_path = _encrypted_output_path(Path(file_path), output_dir)
+    encrypted_path = _encrypt_to(file_path, encrypted_path, key, chunk_size, workers, executor,
+                                 cipher, progress, cancel_event, stats, stats_sink, fsync,
+                                 compression, overwrite, resume, incremental, previous)
+    return str(encrypted_path)
+
+def _encrypt_to(file_path, encrypted_path, key, chunk_size=DEFAULT_CHUNK_SIZE, workers=1,
+                executor=None, cipher=DEFAULT_CIPHER, progress=None, cancel_event=None,
+                stats=None, stats_sink=None, fsync=False, compression=None, overwrite=False,
+                resume=False, incremental=False, previous=None):
+    """
+    Chiffre un fichier vers le chemin de sortie indiqué (voir encrypt_file)
+    
+    Returns:
+        Path: Chemin effectif du fichier chiffré
+    """
+    _check_chunk_size(chunk_size)
+    if resume and incremental:
+        raise ValueError("La reprise et le chiffrement incrémental ne peuvent pas être combinés")
+    if incremental:
+        return _encrypt_incremental(file_path, encrypted_path, key, chunk_size, workers, executor,
+                                    cipher, progress, cancel_event, stats, stats_sink, fsync,
+                                    compression, overwrite, previous)
+    if resume:
+        return _encrypt_resumable(file_path, encrypted_path, key, chunk_size, workers, executor,
+                                  cipher, progress, cancel_event, stats, stats_sink, fsync,
+                                  compression, overwrite)
+    
+    # Valider la clé et préparer le format de sortie
+    _check_key(key)
+    codec = _new_codec(key, chunk_size, cipher)
+    compressor = _get_compressor(compression)
+    if compressor is not None and not _is_compressible(file_path):
+        compressor = None
+    
+    original_path = Path(file_path)
+    stats = stats or OperationStats()
+    stats.operation, stats.file_path, stats.output_path = 'encrypt', file_path, encrypted_path
+    
+    error = None
+    output = _AtomicOutput(encrypted_path, stats, overwrite, fsync)
+    try:
+        with _ParallelContext(workers, executor) as parallel, \
+                _open_input(file_path, stats, parallel.executor is None) as file, \
+                output as encrypted_file:
+            original_size = os.fstat(file.fileno()).st_size
+            metadata = _build_metadata(original_path, original_size,
+                                       compressor.name if compressor else None)
+            _encrypt_stream(file, encrypted_file, codec, metadata, compressor, parallel,
+                            stats, progress, cancel_event, original_size)
+            
+            if file.tell() != original_size:
+                raise ValueError(f"Le fichier {file_path} a été modifié pendant le chiffrement")
+        stats.output_path = output.path
+        return output.path
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _publish_stats(stats, stats_sink, error)
+
+def _encrypt_stream(source, sink, codec, metadata, compressor, parallel, stats,
+                    progress=None, cancel_event=None, total=None):
+    """
+    Écrit un conteneur chiffré : en-tête, métadonnées puis blocs lus dans source
+    
+    Returns:
+        int: Nombre d'octets en clair lus
+    """
+    sink.write(codec.header())
+    sink.write(codec.seal_metadata(metadata))
+    codec.compressor = compressor
+    return _encrypt_chunks(source, sink, codec, parallel, stats, progress, cancel_event, total)
+
+def _encrypt_chunks(source, sink, codec, parallel, stats, progress=None, cancel_event=None,
+                    total=None, start_index=0, journal=None, position=0):
+    """
+    Chiffre les blocs lus dans source à partir du bloc start_index
+    
+    Args:
+        journal (_ResumeJournal): Journal où noter régulièrement les blocs écrits
+        position (int): Position dans sink du premier enregistrement (avec journal)
+        
+    Returns:
+        int: Nombre d'octets en clair lus
+    """
+    sizes = deque()
+    
+    def arguments():
+        for index, (chunk, is_last) in enumerate(_iter_chunks(source, codec.chunk_size), start_index):
+            sizes.append((len(chunk), is_last))
+            yield index, chunk, is_last
+    
+    records = _ordered_map(parallel.executor, codec.seal_chunk, arguments(), parallel.max_pending)
+    skipped = start_index * codec.chunk_size
+    done = unsaved = 0
+    index = start_index
+    for record in _timed_iter(records, stats, 'encrypt'):
+        sink.writelines(record)
+        size, is_last = sizes.popleft()
+        done += size
+        index += 1
+        if journal is not None:
+            record_start, position = position, position + sum(map(len, record))
+            unsaved += size
+            # Le dernier bloc n'est jamais journalisé : une reprise a toujours un bloc à écrire
+            if unsaved >= _CHECKPOINT_BYTES and not is_last:
+                sink.fsync()
+                journal.checkpoint(index, position, record_start)
+                unsaved = 0
+        _report_progress(progress, cancel_event, skipped + done, total)
+    return done
+
+_CHECKPOINT_BYTES = 64 * 1024 * 1024
+
+def _resume_paths(encrypted_path):
+    """Fichier partiel et journal d'un chiffrement avec reprise"""
+    encrypted_path = Path(encrypted_path)
+    return (encrypted_path.with_name(f".{encrypted_path.name}.resume"),
+            encrypted_path.with_name(f".{encrypted_path.name}.journal"))
+
+class _ResumeJournal:
+    """
+    Journal des blocs écrits par un chiffrement avec reprise
+    
+    Fichier JSON ligne par ligne : une description du fichier source et des
+    paramètres, puis des points de reprise (blocs écrits, fin et début du
+    dernier enregistrement dans le fichier partiel), ajoutés une fois les
+    blocs écrits sur le disque. Une ligne tronquée par un arrêt brutal est
+    ignorée.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+    
+    def load(self):
+        """
+        Lit le journal d'un chiffrement précédent
+        
+        Returns:
+            tuple: (description, dernier point de reprise), None pour chaque
+            élément absent
+        """
+        try:
+            with open(self.path, 'rb') as journal_file:
+                lines = journal_file.read().splitlines()
+        except FileNotFoundError:
+            return None, None
+        entries = []
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                break
+        if not entries:
+            return None, None
+        return entries[0], entries[-1] if len(entries) > 1 else None
+    
+    def start(self, description, checkpoint=None):
+        """Réécrit le journal avec une description et un éventuel point de reprise"""
+        self._file = open(self.path, 'wb')
+        self._append(description)
+        if checkpoint is not None:
+            self._append(checkpoint)
+    
+    def checkpoint(self, chunks, offset, last):
+        """Note que chunks blocs, jusqu'à offset, sont écrits sur le disque"""
+        self._append({'chunks': chunks, 'offset': offset, 'last': last})
+    
+    def _append(self, entry):
+        self._file.write(json.dumps(entry).encode('utf-8') + b"\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+    
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def remove(self):
+        """Supprime le journal une fois le chiffrement terminé"""
+        self.close()
+        _remove_partial(self.path)
+
+def _lock_exclusive(file):
+    """
+    Verrouille un fichier pour ce seul processus (sans effet sous Windows)
+    
+    Raises:
+        ValueError: Si un autre processus le verrouille déjà
+    """
+    try:
+        import fcntl
+    except ImportError:
+        return
+    try:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        raise ValueError(f"Chiffrement déjà en cours vers {file.name}")
+
+def _resume_codec(partial_file, key, checkpoint):
+    """
+    Vérifie un fichier partiel jusqu'au point de reprise
+    
+    L'en-tête et les métadonnées sont relus et le dernier bloc journalisé
+    est authentifié ; les blocs précédents ne sont pas relus.
+    
+    Returns:
+        Codec pour écrire la suite, ou None si le fichier partiel est inutilisable
+    """
+    try:
+        partial_file.seek(0)
+        codec = _read_codec(partial_file, key)
+        if codec is None:
+            return None
+        metadata = json.loads(codec.open_metadata(partial_file).decode('utf-8'))
+        codec.compressor = _get_compressor(metadata.get('compression'))
+        
+        partial_file.seek(checkpoint['last'])
+        raw = partial_file.read(checkpoint['offset'] - checkpoint['last'])
+        codec.open_chunk(checkpoint['chunks'] - 1, codec.unwrap_record(raw), False)
+    except (InvalidToken, ValueError, KeyError, TypeError):
+        return None
+    return codec
+
+def _encrypt_resumable(file_path, encrypted_path, key, chunk_size, workers, executor, cipher,
+                       progress, cancel_event, stats, stats_sink, fsync, compression, overwrite):
+    """Chiffre un fichier en tenant un journal de reprise (voir encrypt_file)"""
+    _check_key(key)
+    cipher = _resolve_cipher(cipher)
+    partial_path, journal_path = _resume_paths(encrypted_path)
+    source = os.stat(file_path)
+    description = {
+        'source': os.path.abspath(file_path),
+        'size': source.st_size,
+        'mtime_ns': source.st_mtime_ns,
+        'chunk_size': chunk_size,
+        'cipher': cipher,
+        'compression': compression,
+    }
+    
+    stats = stats or OperationStats()
+    stats.operation, stats.file_path, stats.output_path = 'encrypt', file_path, encrypted_path
+    
+    error = None
+    journal = _ResumeJournal(journal_path)
+    output = _AtomicOutput(encrypted_path, stats, overwrite, fsync, partial_path)
+    try:
+        with _ParallelContext(workers, executor) as parallel, \
+                _open_input(file_path, stats, parallel.executor is None) as file, \
+                output as encrypted_file:
+            _lock_exclusive(encrypted_file)
+            recorded, checkpoint = journal.load()
+            codec = None
+            if recorded == description and checkpoint is not None:
+                codec = _resume_codec(encrypted_file, key, checkpoint)
+            
+            if codec is None:
+                codec = _new_codec(key, chunk_size, cipher)
+                compressor = _get_compressor(compression)
+                if compressor is not None and not _is_compressible(file_path):
+                    compressor = None
+                metadata = _build_metadata(Path(file_path), source.st_size,
+                                           compressor.name if compressor else None)
+                encrypted_file.seek(0)
+                encrypted_file.truncate()
+                encrypted_file.write(codec.header())
+                encrypted_file.write(codec.seal_metadata(metadata))
+                codec.compressor = compressor
+                journal.start(description)
+                start_index, position = 0, encrypted_file.tell()
+            else:
+                journal.start(description, checkpoint)
+                start_index, position = checkpoint['chunks'], checkpoint['offset']
+                encrypted_file.seek(position)
+                encrypted_file.truncate()
+                file.seek(start_index * chunk_size)
+            
+            _encrypt_chunks(file, encrypted_file, codec, parallel, stats, progress, cancel_event,
+                            source.st_size, start_index, journal, position)
+            if file.tell() != source.st_size or os.stat(file_path).st_mtime_ns != source.st_mtime_ns:
+                raise ValueError(f"Le fichier {file_path} a été modifié pendant le chiffrement")
+        journal.remove()
+        stats.output_path = output.path
+        return output.path
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        journal.close()
+        _publish_stats(stats, stats_sink, error)
+
+_COPY_BUFFER_SIZE = 1024 * 1024
+
+@contextmanager
+def _previous_version(previous_path, key, chunk_size, cipher, compressor):
+    """
+    Ouvre la version chiffrée précédente d'un chiffrement incrémental
+    
+    Yields:
+        tuple: (fichier, codec, position du premier enregistrement), ou None si
+        elle n'existe pas ou ne peut pas servir (autre format, clé ou paramètres)
+    """
+    try:
+        previous_file = open(previous_path, 'rb')
+    except FileNotFoundError:
+        yield None
+        return
+    with previous_file:
+        try:
+            codec = _read_codec(previous_file, key)
+            usable = (isinstance(codec, _DigestTableMixin) and codec.chunk_size == chunk_size
+                      and codec.cipher_name == cipher)
+            if usable:
+                metadata = json.loads(codec.open_metadata(previous_file).decode('utf-8'))
+                usable = metadata.get('compression') == (compressor.name if compressor else None)
+        except (InvalidToken, ValueError):
+            usable = False
+        if not usable:
+            yield None
+            return
+        codec.compressor = compressor
+        yield previous_file, codec, previous_file.tell()
+
+def _iter_record_spans(stream, codec, position):
+    """
+    Position et longueur (préfixe compris) de chaque enregistrement de bloc
+    
+    Seuls les préfixes de longueur sont lus, et seulement si les
+    enregistrements n'ont pas une taille fixe.
+    """
+    end = os.fstat(stream.fileno()).st_size
+    while position < end:
+        if codec.fixed_records:
+            length = min(codec.record_size, end - position)
+        else:
+            stream.seek(position)
+            prefix = bytes(stream.read(_RECORD_LENGTH.size))
+            if len(prefix) != _RECORD_LENGTH.size:
+                raise InvalidToken("Fichier tronqué")
+            length = _RECORD_LENGTH.size + _RECORD_LENGTH.unpack(prefix)[0]
+        yield position, length
+        position += length
+
+def _copy_span(source, offset, length, sink, stats):
+    """
+    Recopie une plage d'un fichier à la fin de sink
+    
+    La copie se fait dans le noyau (copy_file_range) quand c'est possible,
+    sans copie des données sur les systèmes de fichiers qui partagent les
+    blocs, sinon par lectures successives.
+    """
+    with stats.measure('copy', length):
+        sink.flush()
+        copy_file_range = getattr(os, 'copy_file_range', None)
+        try:
+            while copy_file_range is not None and length > 0:
+                copied = copy_file_range(source.fileno(), sink.fileno(), length, offset)
+                if copied == 0:
+                    break
+                offset += copied
+                length -= copied
+        except OSError:
+            pass
+        # Resynchroniser la position du tampon d'écriture avec celle du descripteur
+        sink.seek(0, io.SEEK_END)
+        
+        source.seek(offset)
+        while length > 0:
+            data = source.read(min(length, _COPY_BUFFER_SIZE))
+            if not data:
+                raise InvalidToken("Fichier tronqué")
+            sink.write(data)
+            length -= len(data)
+
+def _encrypt_changed_chunks(source, sink, codec, previous, parallel, stats, progress=None,
+                            cancel_event=None, total=None):
+    """
+    Chiffre les blocs modifiés depuis la version précédente et recopie les autres
+    
+    Les enregistrements inchangés consécutifs sont recopiés en une seule fois.
+    
+    Returns:
+        list: Empreintes des blocs
+    """
+    if previous is None:
+        known, spans = [], iter(())
+    else:
+        previous_file, previous_codec, position = previous
+        known = previous_codec.digests
+        spans = _iter_record_spans(previous_file, previous_codec, position)
+    sizes = deque()
+    
+    def arguments():
+        for index, (chunk, is_last) in enumerate(_iter_chunks(source, codec.chunk_size)):
+            sizes.append(len(chunk))
+            yield index, chunk, is_last, known[index] if index < len(known) else None
+    
+    records = _ordered_map(parallel.executor, codec.seal_changed_chunk, arguments(),
+                           parallel.max_pending)
+    digests = []
+    run_offset = run_length = 0
+    done = 0
+    for digest, *record in _timed_iter(records, stats, 'encrypt'):
+        span = next(spans, None)
+        digests.append(digest)
+        if record:
+            if run_length:
+                _copy_span(previous_file, run_offset, run_length, sink, stats)
+                run_length = 0
+            sink.writelines(record)
+        elif span is None:
+            raise InvalidToken("Version précédente tronquée")
+        elif run_length and run_offset + run_length == span[0]:
+            run_length += span[1]
+        else:
+            run_offset, run_length = span
+        done += sizes.popleft()
+        _report_progress(progress, cancel_event, done, total)
+    if run_length:
+        _copy_span(previous_file, run_offset, run_length, sink, stats)
+    return digests
+
+def _encrypt_incremental(file_path, encrypted_path, key, chunk_size, workers, executor, cipher,
+                         progress, cancel_event, stats, stats_sink, fsync, compression, overwrite,
+                         previous_path):
+    """Chiffre un fichier en reprenant les blocs inchangés de sa version précédente (voir encrypt_file)"""
+    _check_key(key)
+    cipher = _resolve_cipher(cipher)
+    if cipher not in _AEAD_IDS:
+        raise ValueError("Le chiffrement incrémental nécessite un algorithme AEAD")
+    compressor = _get_compressor(compression)
+    if compressor is not None and not _is_compressible(file_path):
+        compressor = None
+    
+    if previous_path is None or Path(previous_path) == Path(encrypted_path):
+        # La version suivante doit remplacer celle qu'elle reprend, et non s'écrire à côté
+        previous_path, overwrite = encrypted_path, True
+    
+    stats = stats or OperationStats()
+    stats.operation, stats.file_path, stats.output_path = 'encrypt', file_path, encrypted_path
+    
+    error = None
+    output = _AtomicOutput(encrypted_path, stats, overwrite, fsync)
+    try:
+        with _ParallelContext(workers, executor) as parallel, \
+                _open_input(file_path, stats, parallel.executor is None) as file, \
+                output as encrypted_file, \
+                _previous_version(previous_path, key, chunk_size, cipher,
+                                  compressor) as previous:
+            original_size = os.fstat(file.fileno()).st_size
+            if previous is None:
+                codec = _new_codec(key, chunk_size, cipher, indexed=True)
+            else:
+                # Même clé de données et même sel : les enregistrements recopiés restent valides
+                codec = copy.copy(previous[1])
+            codec.digest_count = max(1, -(-original_size // chunk_size))
+            codec.digests = []
+            metadata = _build_metadata(Path(file_path), original_size,
+                                       compressor.name if compressor else None)
+            encrypted_file.write(codec.header())
+            table_end = encrypted_file.tell()
+            encrypted_file.write(codec.seal_metadata(metadata))
+            codec.compressor = compressor
+            
+            digests = _encrypt_changed_chunks(file, encrypted_file, codec, previous, parallel,
+                                              stats, progress, cancel_event, original_size)
+            if file.tell() != original_size or len(digests) != codec.digest_count:
+                raise ValueError(f"Le fichier {file_path} a été modifié pendant le chiffrement")
+            codec.digests = digests
+            encrypted_file.seek(table_end - codec.digest_table_size)
+            encrypted_file.write(codec.digest_table())
+        stats.output_path = output.path
+        return output.path
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _publish_stats(stats, stats_sink, error)
+
+def _open_legacy(encrypted_file, fernet, stats=None):
+    """
+    Déchiffre un fichier de l'ancien format (un seul jeton Fernet)
+    
+    Returns:
+        tuple: (métadonnées, données originales)
+    """
+    encrypted_data = bytes(encrypted_file.read())
+    stats = stats or OperationStats()
+    
+    try:
+        with stats.measure('decrypt', len(encrypted_data)):
+            decrypted_content = fernet.decrypt(encrypted_data)
+    except InvalidToken:
+        raise InvalidToken("Clé de déchiffrement incorrecte ou fichier corrompu")
+    
+    # Extraire la longueur des métadonnées (4 premiers bytes)
+    metadata_length = int.from_bytes(decrypted_content[:4], byteorder='big')
+    
+    # Extraire les métadonnées
+    metadata_bytes = decrypted_content[4:4+metadata_length]
+    metadata = json.loads(metadata_bytes.decode('utf-8'))
+    
+    # Une vue évite de recopier tout le contenu déchiffré
+    return metadata, memoryview(decrypted_content)[4+metadata_length:]
+
+def _decrypt_legacy(encrypted_file, fernet, resolve_output, stats, fsync=False, overwrite=False):
+    """Déchiffre un fichier de l'ancien format vers le chemin choisi d'après ses métadonnées"""
+    metadata, original_data = _open_legacy(encrypted_file, fernet, stats)
+    
+    output = _AtomicOutput(resolve_output(metadata), stats, overwrite, fsync)
+    stats.output_path = output.path
+    
+    # Écrire les données originales
+    with output as decrypted_file:
+        decrypted_file.write(original_data)
+    
+    stats.output_path = output.path
+    return output.path
+
+def _open_chunk_detached(codec, index, record, is_last):
+    """Déchiffre un bloc dans un processus de travail, en renvoyant des bytes transmissibles"""
+    is_last, chunk = codec.open_chunk(index, bytes(record), is_last)
+    return is_last, bytes(chunk)
+
+def _decrypt_chunks(encrypted_file, codec, parallel):
+    """
+    Déchiffre les blocs de données d'un conteneur
+    
+    Yields:
+        bytes: Données en clair de chaque bloc, dans l'ordre
+        
+    Raises:
+        InvalidToken: Si un bloc est invalide, déplacé ou manquant
+    """
+    open_chunk = codec.open_chunk
+    if parallel.executor is not None:
+        open_chunk = functools.partial(_open_chunk_detached, codec)
+    
+    seen_last = False
+    for is_last, chunk in _ordered_map(parallel.executor, open_chunk,
+                                       codec.iter_records(encrypted_file),
+                                       parallel.max_pending):
+        if seen_last:
+            raise InvalidToken("Données inattendues après le dernier bloc")
+        yield chunk
+        seen_last = is_last
+    
+    if not seen_last:
+        raise InvalidToken("Fichier tronqué")
+
+def _decrypt_stream(encrypted_file, sink, codec, parallel, stats,
+                    progress=None, cancel_event=None, total=None):
+    """
+    Déchiffre les blocs d'un conteneur dont les métadonnées ont été lues
+    
+    Returns:
+        int: Nombre d'octets en clair écrits
+    """
+    done = 0
+    chunks = _decrypt_chunks(encrypted_file, codec, parallel)
+    for chunk in _timed_iter(chunks, stats, 'decrypt'):
+        sink.write(chunk)
+        done += len(chunk)
+        _report_progress(progress, cancel_event, done, total)
+    return done
+
+def decrypt_file(file_path, key, workers=1, executor=None, progress=None, cancel_event=None,
+                 stats=None, stats_sink=None, fsync=False, output_dir=None, overwrite=False):
+    """
+    Déchiffre un fichier avec la clé fournie
+    
+    Le format est détecté grâce au nombre magique de l'en-tête. Les fichiers
+    au format par blocs (Fernet ou binaire) sont déchiffrés en mémoire
+    constante, éventuellement en parallèle ; les fichiers de l'ancien format
+    (un seul jeton Fernet) restent lisibles.
+    
+    Comme pour encrypt_file, le fichier déchiffré n'apparaît sous son nom
+    définitif qu'une fois complet, et un nom déjà pris reçoit un suffixe
+    " (1)", " (2)"... sauf avec overwrite.
+    
+    Args:
+        file_path (str): Chemin vers le fichier à déchiffrer
+        key (bytes): Clé de déchiffrement
+        workers (int): Nombre de processus de déchiffrement (None = nombre de cœurs)
+        executor (Executor): Exécuteur partagé à utiliser à la place d'un pool dédié
+        progress (callable): Appelée avec (octets écrits, octets au total ou None) après chaque bloc
+        cancel_event (threading.Event): Annule l'opération lorsqu'il est positionné
+        stats (OperationStats): Statistiques par phase à remplir
+        stats_sink (callable): Reçoit les statistiques à la fin de l'opération
+        fsync (bool): Force l'écriture du fichier déchiffré et de son entrée de
+            répertoire sur le disque
+        output_dir (str): Dossier de sortie (par défaut "outputs")
+        overwrite (bool): Remplace un fichier existant au lieu de choisir un autre nom
+        
+    Returns:
+        str: Chemin vers le fichier déchiffré
+        
+    Raises:
+        FileNotFoundError: Si le fichier n'existe pas
+        InvalidToken: Si la clé est incorrecte
+        OperationCancelled: Si l'opération est annulée (le fichier partiel est supprimé)
+        Exception: Pour toute autre erreur de déchiffrement
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Le fichier {file_path} n'existe pas")
+    
+    decrypted_path = _decrypt_to(file_path, key,
+                                 lambda metadata: _decrypted_output_path(metadata, file_path,
+                                                                         output_dir),
+                                 workers, executor, progress, cancel_event,
+                                 stats, stats_sink, fsync, overwrite)
+    return str(decrypted_path)
+
+def _decrypt_to(file_path, key, resolve_output, workers=1, executor=None, progress=None,
+                cancel_event=None, stats=None, stats_sink=None, fsync=False, overwrite=False):
+    """
+    Déchiffre un fichier vers un chemin choisi d'après ses métadonnées (voir decrypt_file)
+    
+    Args:
+        resolve_output (callable): Reçoit les métadonnées et renvoie le chemin de sortie
+        
+    Returns:
+        Path: Chemin effectif du fichier déchiffré
+    """
+    _check_key(key)
+    
+    stats = stats or OperationStats()
+    stats.operation, stats.file_path = 'decrypt', file_path
+    
+    error = None
+    try:
+        # Sans exécuteur, les blocs sont déchiffrés directement depuis les tampons de lecture
+        reuse_buffers = executor is None and workers == 1
+        with _open_input(file_path, stats, reuse_buffers) as encrypted_file:
+            codec = _read_codec(encrypted_file, key)
+            if codec is None:
+                decrypted_path = _decrypt_legacy(encrypted_file, Fernet(key), resolve_output,
+                                                 stats, fsync, overwrite)
+                size = os.path.getsize(decrypted_path)
+                _report_progress(progress, None, size, size)
+                return decrypted_path
+            
+            # Déchiffrer les métadonnées
+            metadata = json.loads(codec.open_metadata(encrypted_file).decode('utf-8'))
+            _check_not_bundle(metadata)
+            codec.compressor = _get_compressor(metadata.get('compression'))
+            total = metadata.get('original_size')
+            
+            output = _AtomicOutput(resolve_output(metadata), stats, overwrite, fsync)
+            stats.output_path = output.path
+            
+            # Déchiffrer et écrire les données bloc par bloc
+            with _ParallelContext(workers, executor) as parallel, output as decrypted_file:
+                _decrypt_stream(encrypted_file, decrypted_file, codec, parallel,
+                                stats, progress, cancel_event, total)
+            decrypted_path = stats.output_path = output.path
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _publish_stats(stats, stats_sink, error)
+    
+    return decrypted_path
+
+class _RewindableStream:
+    """
+    Flux non positionnable dont le début peut être relu
+    
+    Permet à _read_codec de revenir au début d'un flux (tube, socket...)
+    après avoir lu le préambule, pour reconnaître l'ancien format.
+    """
+    
+    def __init__(self, stream, head_size):
+        self._stream = stream
+        self._head = stream.read(head_size)
+        self._position = 0
+    
+    def read(self, size=-1):
+        if size is None or size < 0:
+            head = self._head[self._position:]
+        else:
+            head = self._head[self._position:self._position + size]
+        self._position += len(head)
+        if size is not None and 0 <= size == len(head):
+            return head
+        rest = self._stream.read(-1 if size is None or size < 0 else size - len(head))
+        self._position += len(rest)
+        return head + rest if head else rest
+    
+    def seek(self, offset, whence=io.SEEK_SET):
+        if offset != 0 or whence != io.SEEK_SET or self._position > len(self._head):
+            raise io.UnsupportedOperation("Seul un retour au début du flux est possible")
+        self._position = 0
+        return 0
+
+def encrypt_stream(source, sink, key, name=None, chunk_size=DEFAULT_CHUNK_SIZE, workers=1,
+                   executor=None, cipher=DEFAULT_CIPHER, compression=None, progress=None,
+                   cancel_event=None, stats=None, stats_sink=None, size=None):
+    """
+    Chiffre un flux binaire vers un autre, en mémoire constante
+    
+    Convient aux tubes (tar c dossier | encrypt | envoi) : source et sink
+    peuvent être sys.stdin.buffer et sys.stdout.buffer, aucun fichier
+    temporaire n'est créé. Le nom et la taille d'origine ne sont enregistrés
+    que s'ils sont fournis.
+    
+    Args:
+        source: Flux binaire lisible (méthode read)
+        sink: Flux binaire inscriptible (méthode write)
+        key (bytes | Passphrase): Clé de chiffrement ou phrase secrète
+        name (str): Nom d'origine à enregistrer dans les métadonnées (optionnel)
+        chunk_size (int): Taille des blocs de données en octets
+        workers (int): Nombre de processus de chiffrement (None = nombre de cœurs)
+        executor (Executor): Exécuteur partagé à utiliser à la place d'un pool dédié
+        cipher (str): Algorithme ("aes-gcm", "chacha20-poly1305", "fernet" ou
+            "auto" pour le plus rapide sur cette machine, voir select_cipher)
+        compression (str): Algorithme de compression ("zlib", "lzma", ou None)
+        progress (callable): Appelée avec (octets lus, taille ou None) après chaque bloc
+        cancel_event (threading.Event): Annule l'opération lorsqu'il est positionné
+        stats (OperationStats): Statistiques par phase à remplir
+        stats_sink (callable): Reçoit les statistiques à la fin de l'opération
+        size (int): Taille du contenu si elle est connue (vérifiée à la fin)
+        
+    Returns:
+        int: Nombre d'octets en clair chiffrés
+        
+    Raises:
+        ValueError: Si la clé, la taille de bloc ou l'algorithme est invalide,
+            ou si la taille lue diffère de size
+        OperationCancelled: Si l'opération est annulée
+    """
+    _check_chunk_size(chunk_size)
+    _check_key(key)
+    codec = _new_codec(key, chunk_size, cipher)
+    compressor = _get_compressor(compression)
+    stats = stats or OperationStats()
+    stats.operation = 'encrypt'
+    
+    metadata = _build_metadata(None if name is None else Path(name), size,
+                               compressor.name if compressor else None)
+    error = None
+    try:
+        with _ParallelContext(workers, executor) as parallel:
+            done = _encrypt_stream(_TimedStream(source, stats), _TimedStream(sink, stats), codec,
+                                   metadata, compressor, parallel, stats, progress,
+                                   cancel_event, size)
+        if size is not None and done != size:
+            raise ValueError("La source a été modifiée pendant le chiffrement")
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _publish_stats(stats, stats_sink, error)
+    return done
+
+def decrypt_stream(source, sink, key, workers=1, executor=None, progress=None,
+                   cancel_event=None, stats=None, stats_sink=None):
+    """
+    Déchiffre un flux binaire vers un autre, en mémoire constante
+    
+    Pendant de encrypt_stream. La source n'a pas besoin d'être
+    positionnable. Les fichiers de l'ancien format (un seul jeton Fernet)
+    sont acceptés mais entièrement chargés en mémoire.
+    
+    Args:
+        source: Flux binaire lisible (méthode read)
+        sink: Flux binaire inscriptible (méthode write)
+        key (bytes | Passphrase): Clé de déchiffrement ou phrase secrète
+        workers (int): Nombre de processus de déchiffrement (None = nombre de cœurs)
+        executor (Executor): Exécuteur partagé à utiliser à la place d'un pool dédié
+        progress (callable): Appelée avec (octets écrits, octets au total ou None) après chaque bloc
+        cancel_event (threading.Event): Annule l'opération lorsqu'il est positionné
+        stats (OperationStats): Statistiques par phase à remplir
+        stats_sink (callable): Reçoit les statistiques à la fin de l'opération
+        
+    Returns:
+        dict: Métadonnées du contenu (nom et taille d'origine s'ils sont connus)
+        
+    Raises:
+        InvalidToken: Si la clé est incorrecte ou les données corrompues
+        OperationCancelled: Si l'opération est annulée (des données en clair
+            ont pu être écrites dans sink)
+    """
+    _check_key(key)
+    stats = stats or OperationStats()
+    stats.operation = 'decrypt'
+    
+    error = None
+    try:
+        source = _TimedStream(_RewindableStream(source, _PREAMBLE.size), stats)
+        sink = _TimedStream(sink, stats)
+        
+        codec = _read_codec(source, key)
+        if codec is None:
+            metadata, original_data = _open_legacy(source, Fernet(key), stats)
+            sink.write(original_data)
+            _report_progress(progress, None, len(original_data), len(original_data))
+            return metadata
+        
+        metadata = json.loads(codec.open_metadata(source).decode('utf-8'))
+        _check_not_bundle(metadata)
+        codec.compressor = _get_compressor(metadata.get('compression'))
+        with _ParallelContext(workers, executor) as parallel:
+            _decrypt_stream(source, sink, codec, parallel, stats, progress, cancel_event,
+                            metadata.get('original_size'))
+        return metadata
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _publish_stats(stats, stats_sink, error)
+
+def _iter_tree(src_dir, exclude_dir, suffix=""):
+    """
+    Parcourt une arborescence sous forme de flux, dans l'ordre alphabétique
+    
+    Seuls les fichiers se terminant par suffix sont renvoyés.
+    
+    Yields:
+        tuple: (chemin du fichier, chemin relatif à src_dir)
+    """
+    exclude_dir = os.path.realpath(exclude_dir)
+    for root, dirs, files in os.walk(src_dir):
+        # Ne pas parcourir le dossier de destination s'il est dans la source
+        dirs[:] = sorted(d for d in dirs if os.path.realpath(os.path.join(root, d)) != exclude_dir)
+        for name in sorted(files):
+            if name.endswith(suffix):
+                file_path = os.path.join(root, name)
+                yield file_path, os.path.relpath(file_path, src_dir)
+
+def _process_tree(src_dir, dst_dir, key, process, workers, executor, suffix=""):
+    """
+    Applique une opération à chaque fichier d'une arborescence via un pool partagé
+    
+    Args:
+        process (callable): Reçoit (chemin source, dossier de destination) et
+            renvoie (chemin de sortie, octets en clair traités)
+        
+    Returns:
+        dict: Rapport de synthèse (voir encrypt_tree)
+    """
+    if not os.path.isdir(src_dir):
+        raise FileNotFoundError(f"Le dossier {src_dir} n'existe pas")
+    _check_key(key)
+    
+    created_dirs = set()
+    
+    def run(file_path, relative_path):
+        started = time.perf_counter()
+        entry = {'source': file_path, 'output': None, 'bytes': 0, 'seconds': 0.0, 'error': None}
+        try:
+            target_dir = os.path.join(dst_dir, os.path.dirname(relative_path))
+            if target_dir not in created_dirs:
+                os.makedirs(target_dir, exist_ok=True)
+                created_dirs.add(target_dir)
+            output_path, size = process(file_path, target_dir)
+            entry['output'] = str(output_path)
+            entry['bytes'] = size
+        except Exception as e:
+            entry['error'] = f"{type(e).__name__}: {e}"
+        entry['seconds'] = time.perf_counter() - started
+        return entry
+    
+    report = {'files': [], 'succeeded': 0, 'failed': 0, 'bytes': 0, 'seconds': 0.0}
+    started = time.perf_counter()
+    
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError(f"Nombre de workers invalide: {workers}")
+    own_executor = executor is None and workers > 1
+    if own_executor:
+        # Import différé : concurrent.futures est inutile pour un seul fichier
+        from concurrent.futures import ThreadPoolExecutor
+        executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        max_pending = 4 * workers
+        for entry in _ordered_map(executor, run, _iter_tree(src_dir, dst_dir, suffix), max_pending):
+            report['files'].append(entry)
+            if entry['error'] is None:
+                report['succeeded'] += 1
+                report['bytes'] += entry['bytes']
+            else:
+                report['failed'] += 1
+    finally:
+        if own_executor:
+            executor.shutdown(wait=True)
+    
+    report['seconds'] = time.perf_counter() - started
+    return report
+
+def encrypt_tree(src_dir, dst_dir, key, workers=4, executor=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 cipher=DEFAULT_CIPHER, stats_sink=None, compression=None):
+    """
+    Chiffre tous les fichiers d'une arborescence
+    
+    L'arborescence est parcourue au fil de l'eau et les fichiers sont
+    répartis sur un pool de threads partagé, ce qui recouvre les entrées/
+    sorties et le chiffrement. La structure des dossiers est conservée :
+    src_dir/a/b.txt devient dst_dir/a/b.txt.enc.
+    
+    Args:
+        src_dir (str): Dossier à chiffrer
+        dst_dir (str): Dossier de destination
+        key (bytes): Clé de chiffrement
+        workers (int): Nombre de fichiers traités simultanément (None = nombre de cœurs)
+        executor (Executor): Exécuteur partagé à utiliser à la place d'un pool dédié
+        chunk_size (int): Taille des blocs de données en octets
+        cipher (str): Algorithme ("aes-gcm", "chacha20-poly1305", "fernet" ou
+            "auto" pour le plus rapide sur cette machine, voir select_cipher)
+        stats_sink (callable): Reçoit les statistiques par phase de chaque fichier
+        compression (str): Algorithme de compression ("zlib", "lzma", ou None)
+        
+    Returns:
+        dict: Rapport avec files (source, output, bytes, seconds et error pour
+        chaque fichier), succeeded, failed, bytes et seconds
+        
+    Raises:
+        FileNotFoundError: Si le dossier source n'existe pas
+        ValueError: Si la clé est invalide
+    """
+    def process(file_path, target_dir):
+        encrypted_path = _encrypt_to(file_path, _encrypted_output_path(Path(file_path), target_dir),
+                                     key, chunk_size, cipher=cipher, stats_sink=stats_sink,
+                                     compression=compression, overwrite=True)
+        return encrypted_path, os.path.getsize(file_path)
+    
+    return _process_tree(src_dir, dst_dir, key, process, workers, executor)
+
+def decrypt_tree(src_dir, dst_dir, key, workers=4, executor=None, stats_sink=None):
+    """
+    Déchiffre tous les fichiers .enc d'une arborescence
+    
+    Pendant de encrypt_tree : chaque fichier retrouve son nom d'origine,
+    dans le même sous-dossier relatif de dst_dir. Les autres fichiers sont
+    ignorés.
+    
+    Args:
+        src_dir (str): Dossier contenant les fichiers chiffrés
+        dst_dir (str): Dossier de destination
+        key (bytes): Clé de déchiffrement
+        workers (int): Nombre de fichiers traités simultanément (None = nombre de cœurs)
+        executor (Executor): Exécuteur partagé à utiliser à la place d'un pool dédié
+        stats_sink (callable): Reçoit les statistiques par phase de chaque fichier
+        
+    Returns:
+        dict: Rapport de synthèse (voir encrypt_tree)
+        
+    Raises:
+        FileNotFoundError: Si le dossier source n'existe pas
+        ValueError: Si la clé est invalide
+    """
+    def process(file_path, target_dir):
+        def resolve_output(metadata):
+            name = metadata.get('original_name', Path(file_path).stem)
+            return Path(target_dir) / (name + metadata.get('original_extension', ''))
+        
+        decrypted_path = _decrypt_to(file_path, key, resolve_output, stats_sink=stats_sink,
+                                     overwrite=True)
+        return decrypted_path, os.path.getsize(decrypted_path)
+    
+    return _process_tree(src_dir, dst_dir, key, process, workers, executor, ENCRYPTED_SUFFIX)
+
+_BUNDLE_VERSION = 1
+_BUNDLE_MAGIC = b"ENCB"
+_BUNDLE_TRAILER = struct.Struct(">Q4s")
+_BUNDLE_INDEX_CONTEXT = b"index"
+_BUNDLE_MEMBER = struct.Struct(">6sQ")
+
+def _bound_codec(codec, context, compressor=None):
+    """Copie du codec dont les blocs sont liés à un membre ou à l'index d'une archive"""
+    bound = copy.copy(codec)
+    bound.associated_data = codec.associated_data + context
+    bound.compressor = compressor
+    return bound
+
+def _member_context(number):
+    """Contexte authentifié des blocs du membre numéro number"""
+    return _BUNDLE_MEMBER.pack(b"member", number)
+
+class _BoundedStream:
+    """Lecture limitée à une portion d'un flux, à partir de sa position courante"""
+    
+    def __init__(self, stream, length):
+        self._stream = stream
+        self._remaining = length
+    
+    def read(self, size=-1):
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._stream.read(size)
+        self._remaining -= len(data)
+        return data
+
+class _BundleIndexWriter:
+    """
+    Chiffre l'index d'une archive au fur et à mesure de sa construction
+    
+    Les entrées sont chiffrées bloc par bloc dans un fichier temporaire,
+    recopié à la fin de l'archive : la mémoire utilisée ne dépend pas du
+    nombre de membres et aucun nom de fichier n'est écrit en clair.
+    """
+    
+    def __init__(self, codec):
+        # Import différé : tempfile n'est utile qu'aux archives
+        import tempfile
+        
+        self._codec = _bound_codec(codec, _BUNDLE_INDEX_CONTEXT)
+        self._spool = tempfile.TemporaryFile()
+        self._pending = bytearray()
+        self._index = 0
+    
+    def add(self, entry):
+        """Ajoute l'entrée d'un membre"""
+        self._pending += json.dumps(entry).encode('utf-8') + b"\n"
+        chunk_size = self._codec.chunk_size
+        # Le dernier bloc doit rester en attente : il n'est connu qu'à la fin
+        while len(self._pending) > chunk_size:
+            self._seal(bytes(self._pending[:chunk_size]), False)
+            del self._pending[:chunk_size]
+    
+    def _seal(self, chunk, is_last):
+        self._spool.writelines(self._codec.seal_chunk(self._index, chunk, is_last))
+        self._index += 1
+    
+    def copy_to(self, sink):
+        """Termine l'index et le recopie dans l'archive"""
+        import shutil
+        
+        self._seal(bytes(self._pending), True)
+        self._spool.seek(0)
+        shutil.copyfileobj(self._spool, sink)
+    
+    def close(self):
+        self._spool.close()
+
+def _iter_bundle_sources(src_dir, output):
+    """
+    Fichiers à archiver, sans l'archive en cours d'écriture si elle est dans src_dir
+    
+    Yields:
+        tuple: (chemin du fichier, chemin relatif à src_dir)
+    """
+    excluded = {os.path.realpath(output.path), os.path.realpath(output.temp_path)}
+    for file_path, relative_path in _iter_tree(src_dir, output.temp_path):
+        if os.path.realpath(file_path) not in excluded:
+            yield file_path, relative_path
+
+def create_bundle(src_dir, bundle_path, key, chunk_size=DEFAULT_CHUNK_SIZE, cipher=DEFAULT_CIPHER,
+                  compression=None, progress=None, cancel_event=None, fsync=False, overwrite=False):
+    """
+    Regroupe tous les fichiers d'une arborescence dans une archive chiffrée
+    
+    Pour de nombreux petits fichiers, l'archive évite le coût fixe de
+    encrypt_file (en-tête, clé enveloppée, métadonnées et fichier de sortie
+    par fichier) : chaque membre n'ajoute que ses blocs chiffrés. Un index
+    chiffré des noms, tailles et positions termine l'archive ; list_bundle()
+    ne lit que lui et extract_bundle() ne déchiffre que les membres demandés.
+    
+    L'archive est écrite au fil de l'eau : la mémoire utilisée ne dépend ni
+    de la taille ni du nombre des fichiers. Chaque bloc est lié à son membre,
+    qui ne peut être ni déplacé ni échangé avec un autre.
+    
+    Args:
+        src_dir (str): Dossier à archiver
+        bundle_path (str): Chemin de l'archive à créer
+        key (bytes | Passphrase): Clé de chiffrement ou phrase secrète
+        chunk_size (int): Taille des blocs de données en octets
+        cipher (str): Algorithme AEAD ("aes-gcm", "chacha20-poly1305" ou "auto")
+        compression (str): Algorithme de compression ("zlib", "lzma", ou None)
+        progress (callable): Appelée avec (octets archivés, None) après chaque bloc
+        cancel_event (threading.Event): Annule l'opération lorsqu'il est positionné
+        fsync (bool): Force l'écriture de l'archive sur le disque
+        overwrite (bool): Remplace une archive existante au lieu de choisir un autre nom
+        
+    Returns:
+        str: Chemin vers l'archive
+        
+    Raises:
+        FileNotFoundError: Si le dossier source n'existe pas
+        ValueError: Si la clé ou l'algorithme est invalide
+        OperationCancelled: Si l'opération est annulée (rien n'est écrit)
+    """
+    if not os.path.isdir(src_dir):
+        raise FileNotFoundError(f"Le dossier {src_dir} n'existe pas")
+    _check_key(key)
+    cipher = _resolve_cipher(cipher)
+    if cipher not in _AEAD_IDS:
+        raise ValueError(f"Algorithme incompatible avec une archive: {cipher}")
+    compressor = _get_compressor(compression)
+    codec = _new_codec(key, _check_chunk_size(chunk_size), cipher)
+    metadata = json.loads(_build_metadata(Path(os.path.abspath(src_dir)), None, compression))
+    metadata['bundle'] = _BUNDLE_VERSION
+    
+    output = _AtomicOutput(bundle_path, overwrite=overwrite, fsync=fsync)
+    index = _BundleIndexWriter(codec)
+    try:
+        with output as sink:
+            preamble = codec.header() + codec.seal_metadata(json.dumps(metadata).encode('utf-8'))
+            sink.write(preamble)
+            offset = len(preamble)
+            done = 0
+            for number, (file_path, relative_path) in enumerate(_iter_bundle_sources(src_dir, output)):
+                member_compressor = compressor
+                if Path(file_path).suffix.lower() in INCOMPRESSIBLE_EXTENSIONS:
+                    member_compressor = None
+                member_codec = _bound_codec(codec, _member_context(number), member_compressor)
+                
+                size = length = 0
+                with open(file_path, 'rb') as file:
+                    for chunk_index, (chunk, is_last) in enumerate(_iter_chunks(file, chunk_size)):
+                        record = member_codec.seal_chunk(chunk_index, chunk, is_last)
+                        sink.writelines(record)
+                        length += sum(len(part) for part in record)
+                        size += len(chunk)
+                        done += len(chunk)
+                        _report_progress(progress, cancel_event, done, None)
+                
+                index.add({
+                    'name': Path(relative_path).as_posix(),
+                    'size': size,
+                    'offset': offset,
+                    'length': length,
+                    'compressed': member_compressor is not None,
+                })
+                offset += length
+            
+            index.copy_to(sink)
+            sink.write(_BUNDLE_TRAILER.pack(offset, _BUNDLE_MAGIC))
+    finally:
+        index.close()
+    return str(output.path)
+
+def _open_bundle(bundle_file, key):
+    """
+    Lit l'en-tête et le pied d'une archive
     
     Returns:
-        bytes: Clé de chiffrement encodée en base64
+        tuple: (codec, compression, début des membres, début de l'index, fin de l'index)
+        
+    Raises:
+        InvalidToken: Si la clé est incorrecte ou l'archive tronquée
+        ValueError: Si le fichier n'est pas une archive
     """
-    return Fernet.generate_key()
+    codec = _read_codec(bundle_file, key)
+    if codec is None:
+        raise ValueError("Ce fichier n'est pas une archive")
+    metadata = json.loads(codec.open_metadata(bundle_file).decode('utf-8'))
+    if 'bundle' not in metadata:
+        raise ValueError("Ce fichier n'est pas une archive")
+    if metadata['bundle'] != _BUNDLE_VERSION:
+        raise ValueError(f"Version d'archive non supportée: {metadata['bundle']}")
+    
+    data_start = bundle_file.tell()
+    index_end = bundle_file.seek(0, os.SEEK_END) - _BUNDLE_TRAILER.size
+    if index_end < data_start:
+        raise InvalidToken("Archive tronquée")
+    bundle_file.seek(index_end)
+    index_start, magic = _BUNDLE_TRAILER.unpack(bundle_file.read(_BUNDLE_TRAILER.size))
+    if magic != _BUNDLE_MAGIC or not data_start <= index_start <= index_end:
+        raise InvalidToken("Archive tronquée")
+    return codec, _get_compressor(metadata.get('compression')), data_start, index_start, index_end
 
-def encrypt_file(file_path, key):
+def _iter_bundle_index(bundle_file, codec, index_start, index_end):
     """
-    Chiffre un fichier avec la clé fournie
+    Déchiffre l'index d'une archive entrée par entrée
+    
+    Yields:
+        tuple: (numéro du membre, entrée)
+    """
+    bundle_file.seek(index_start)
+    index_codec = _bound_codec(codec, _BUNDLE_INDEX_CONTEXT)
+    chunks = _decrypt_chunks(_BoundedStream(bundle_file, index_end - index_start),
+                             index_codec, _ParallelContext(1, None))
+    pending = b""
+    number = 0
+    for chunk in chunks:
+        *lines, pending = (pending + bytes(chunk)).split(b"\n")
+        for line in lines:
+            yield number, json.loads(line.decode('utf-8'))
+            number += 1
+    if pending:
+        raise InvalidToken("Index d'archive invalide")
+
+def list_bundle(bundle_path, key):
+    """
+    Liste les membres d'une archive sans déchiffrer leur contenu
+    
+    Seuls l'en-tête et l'index sont lus.
     
     Args:
-        file_path (str): Chemin vers le fichier à chiffrer
-        key (bytes): Clé de chiffrement
+        bundle_path (str): Chemin vers l'archive
+        key (bytes | Passphrase): Clé de déchiffrement ou phrase secrète
         
     Returns:
-        str: Chemin vers le fichier chiffré
+        list: Un dict par membre avec name, size, stored_size et compressed
+        
+    Raises:
+        FileNotFoundError: Si l'archive n'existe pas
+        InvalidToken: Si la clé est incorrecte ou l'archive corrompue
+        ValueError: Si le fichier n'est pas une archive
+    """
+    if not os.path.exists(bundle_path):
+        raise FileNotFoundError(f"Le fichier {bundle_path} n'existe pas")
+    _check_key(key)
+    
+    with open(bundle_path, 'rb') as bundle_file:
+        codec, _, _, index_start, index_end = _open_bundle(bundle_file, key)
+        return [
+            {
+                'name': entry['name'],
+                'size': entry['size'],
+                'stored_size': entry['length'],
+                'compressed': entry['compressed'],
+            }
+            for _, entry in _iter_bundle_index(bundle_file, codec, index_start, index_end)
+        ]
+
+def _member_path(dst_dir, name):
+    """
+    Chemin d'extraction d'un membre, qui doit rester dans dst_dir
+    
+    Raises:
+        ValueError: Si le nom est absolu ou remonte hors de dst_dir
+    """
+    # PureWindowsPath reconnaît aussi bien / que \ et les lecteurs (C:)
+    relative = PureWindowsPath(name)
+    if not relative.parts or relative.anchor or '..' in relative.parts:
+        raise ValueError(f"Nom de membre invalide: {name}")
+    return Path(dst_dir).joinpath(*relative.parts)
+
+def extract_bundle(bundle_path, key, dst_dir, members=None, overwrite=False, fsync=False):
+    """
+    Extrait tout ou partie d'une archive créée par create_bundle
+    
+    Seuls les membres demandés sont lus et déchiffrés ; la lecture de
+    l'index s'arrête dès qu'ils ont tous été trouvés.
+    
+    Args:
+        bundle_path (str): Chemin vers l'archive
+        key (bytes | Passphrase): Clé de déchiffrement ou phrase secrète
+        dst_dir (str): Dossier de destination (l'arborescence y est recréée)
+        members (list): Noms des membres à extraire (None = tous)
+        overwrite (bool): Remplace les fichiers existants au lieu de choisir un autre nom
+        fsync (bool): Force l'écriture des fichiers extraits sur le disque
+        
+    Returns:
+        list: Chemins des fichiers extraits
+        
+    Raises:
+        FileNotFoundError: Si l'archive n'existe pas
+        InvalidToken: Si la clé est incorrecte ou l'archive corrompue
+        ValueError: Si le fichier n'est pas une archive ou si un membre est absent
+    """
+    if not os.path.exists(bundle_path):
+        raise FileNotFoundError(f"Le fichier {bundle_path} n'existe pas")
+    _check_key(key)
+    wanted = None if members is None else set(members)
+    
+    extracted = []
+    # Deux descripteurs : l'index est lu pendant que les membres sont déchiffrés
+    with open(bundle_path, 'rb') as index_file, open(bundle_path, 'rb') as member_file:
+        codec, compressor, data_start, index_start, index_end = _open_bundle(index_file, key)
+        for number, entry in _iter_bundle_index(index_file, codec, index_start, index_end):
+            if wanted is not None:
+                if entry['name'] not in wanted:
+                    continue
+                wanted.discard(entry['name'])
+            
+            if not data_start <= entry['offset'] <= entry['offset'] + entry['length'] <= index_start:
+                raise InvalidToken("Index d'archive invalide")
+            member_codec = _bound_codec(codec, _member_context(number),
+                                        compressor if entry['compressed'] else None)
+            member_file.seek(entry['offset'])
+            
+            output = _AtomicOutput(_member_path(dst_dir, entry['name']), overwrite=overwrite,
+                                   fsync=fsync)
+            with output as sink:
+                size = _decrypt_stream(_BoundedStream(member_file, entry['length']), sink,
+                                       member_codec, _ParallelContext(1, None), output.stats)
+                if size != entry['size']:
+                    raise InvalidToken("Membre d'archive tronqué")
+            extracted.append(str(output.path))
+            
+            if wanted is not None and not wanted:
+                break
+    
+    if wanted:
+        raise ValueError(f"Membres absents de l'archive: {', '.join(sorted(wanted))}")
+    return extracted
+
+def _verify_records(stream, codec, position, state, progress=None, cancel_event=None,
+                    done=0, total=None):
+    """
+    Authentifie une suite d'enregistrements de blocs sans conserver le texte clair
+    
+    state['chunk'] et state['offset'] désignent en permanence l'enregistrement
+    en cours de traitement, pour localiser une éventuelle erreur.
+    
+    Args:
+        position (int): Position du premier enregistrement dans le fichier
+        done (int): Octets déjà vérifiés, pour la progression
+        
+    Returns:
+        int: Nombre d'octets en clair authentifiés
+    """
+    state['chunk'], state['offset'] = 0, position
+    seen_last = False
+    size = 0
+    for index, record, is_last in codec.iter_records(stream):
+        if seen_last:
+            raise InvalidToken("Données inattendues après le dernier bloc")
+        seen_last, chunk = codec.open_chunk(index, record, is_last)
+        size += len(chunk)
+        position += codec.length_prefix_size + len(record)
+        state['chunk'], state['offset'] = index + 1, position
+        _report_progress(progress, cancel_event, done + size, total)
+    if not seen_last:
+        raise InvalidToken("Fichier tronqué")
+    return size
+
+def _verify_bundle(file_path, bundle_file, key, state, progress, cancel_event):
+    """
+    Vérifie l'index puis chaque membre d'une archive
+    
+    Returns:
+        int: Nombre d'octets en clair authentifiés
+    """
+    bundle_file.seek(0)
+    codec, compressor, data_start, index_start, index_end = _open_bundle(bundle_file, key)
+    bundle_file.seek(index_start)
+    _verify_records(_BoundedStream(bundle_file, index_end - index_start),
+                    _bound_codec(codec, _BUNDLE_INDEX_CONTEXT), index_start, state)
+    
+    done = 0
+    with _open_input(file_path, OperationStats(), True) as member_file:
+        for number, entry in _iter_bundle_index(bundle_file, codec, index_start, index_end):
+            state['member'] = entry['name']
+            if not data_start <= entry['offset'] <= entry['offset'] + entry['length'] <= index_start:
+                raise InvalidToken("Index d'archive invalide")
+            member_codec = _bound_codec(codec, _member_context(number),
+                                        compressor if entry['compressed'] else None)
+            member_file.seek(entry['offset'])
+            size = _verify_records(_BoundedStream(member_file, entry['length']), member_codec,
+                                   entry['offset'], state, progress, cancel_event, done)
+            if size != entry['size']:
+                raise InvalidToken("Membre d'archive tronqué")
+            done += size
+        state['member'] = None
+    return done
+
+def verify(file_path, key, progress=None, cancel_event=None):
+    """
+    Vérifie l'intégrité d'un fichier chiffré sans rien écrire
+    
+    Chaque bloc est authentifié (tag AEAD ou HMAC Fernet) puis oublié : aucun
+    texte clair n'est écrit ni conservé, et le fichier est lu une seule fois,
+    dans des tampons réutilisés. Un fichier tronqué pendant la vérification
+    est signalé comme invalide. Les archives (create_bundle) sont vérifiées index et
+    membres compris.
+    
+    Args:
+        file_path (str): Chemin vers le fichier chiffré
+        key (bytes | Passphrase): Clé de déchiffrement ou phrase secrète
+        progress (callable): Appelée avec (octets vérifiés, octets au total ou None)
+        cancel_event (threading.Event): Annule l'opération lorsqu'il est positionné
+        
+    Returns:
+        dict: path, valid, bytes (octets en clair authentifiés), error, et pour
+        un fichier invalide chunk (numéro du premier bloc en erreur, None
+        avant les blocs), offset (position de cet enregistrement dans le
+        fichier chiffré) et member (membre d'archive concerné)
         
     Raises:
         FileNotFoundError: Si le fichier n'existe pas
-        Exception: Pour toute autre erreur de chiffrement
+        ValueError: Si la clé est invalide
+        OperationCancelled: Si l'opération est annulée
     """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Le fichier {file_path} n'existe pas")
+    _check_key(key)
     
-    # Créer l'objet Fernet
-    fernet = Fernet(key)
+    state = {'chunk': None, 'offset': 0, 'member': None}
+    report = {'path': str(file_path), 'valid': False, 'bytes': 0, 'error': None,
+              'chunk': None, 'offset': None, 'member': None}
+    try:
+        with _open_input(file_path, OperationStats(), True) as encrypted_file:
+            codec = _read_codec(encrypted_file, key)
+            if codec is None:
+                _, original_data = _open_legacy(encrypted_file, Fernet(key))
+                report['bytes'] = len(original_data)
+            else:
+                state['offset'] = encrypted_file.tell()
+                metadata = json.loads(codec.open_metadata(encrypted_file).decode('utf-8'))
+                if 'bundle' in metadata:
+                    report['bytes'] = _verify_bundle(file_path, encrypted_file, key, state,
+                                                     progress, cancel_event)
+                else:
+                    codec.compressor = _get_compressor(metadata.get('compression'))
+                    size = _verify_records(encrypted_file, codec, encrypted_file.tell(), state,
+                                           progress, cancel_event,
+                                           total=metadata.get('original_size'))
+                    if metadata.get('original_size', size) != size:
+                        raise InvalidToken("Fichier tronqué")
+                    report['bytes'] = size
+        report['valid'] = True
+    except (InvalidToken, ValueError) as e:
+        report['error'] = str(e) or type(e).__name__
+        report.update(state)
+    return report
+
+def verify_files(file_paths, key, workers=4, executor=None, progress=None, cancel_event=None):
+    """
+    Vérifie un lot de fichiers chiffrés, plusieurs à la fois
     
-    # Lire le fichier original
-    with open(file_path, 'rb') as file:
-        original_data = file.read()
+    Un fichier invalide ou illisible n'interrompt pas le lot : son erreur
+    figure dans le rapport.
     
-    # Créer les métadonnées avec l'extension originale
-    original_path = Path(file_path)
-    metadata = {
-        'original_extension': original_path.suffix,
-        'original_name': original_path.stem
+    Args:
+        file_paths (iterable): Chemins des fichiers (parcourus au fil de l'eau)
+        key (bytes | Passphrase): Clé de déchiffrement ou phrase secrète
+        workers (int): Nombre de fichiers vérifiés simultanément (None = nombre de cœurs)
+        executor (Executor): Exécuteur partagé à utiliser à la place d'un pool dédié
+        progress (callable): Appelée avec (fichiers vérifiés, None) après chaque fichier
+        cancel_event (threading.Event): Annule l'opération lorsqu'il est positionné
+        
+    Returns:
+        dict: Rapport avec files (résultat de verify pour chaque fichier),
+        valid, invalid, bytes et seconds
+        
+    Raises:
+        ValueError: Si la clé est invalide
+        OperationCancelled: Si l'opération est annulée
+    """
+    _check_key(key)
+    
+    def run(file_path):
+        try:
+            return verify(file_path, key, cancel_event=cancel_event)
+        except OperationCancelled:
+            raise
+        except Exception as e:
+            return {'path': str(file_path), 'valid': False, 'bytes': 0,
+                    'error': f"{type(e).__name__}: {e}", 'chunk': None, 'offset': None,
+                    'member': None}
+    
+    report = {'files': [], 'valid': 0, 'invalid': 0, 'bytes': 0, 'seconds': 0.0}
+    started = time.perf_counter()
+    
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError(f"Nombre de workers invalide: {workers}")
+    own_executor = executor is None and workers > 1
+    if own_executor:
+        from concurrent.futures import ThreadPoolExecutor
+        executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        max_pending = 4 * workers
+        arguments = ((file_path,) for file_path in file_paths)
+        for entry in _ordered_map(executor, run, arguments, max_pending):
+            report['files'].append(entry)
+            if entry['valid']:
+                report['valid'] += 1
+                report['bytes'] += entry['bytes']
+            else:
+                report['invalid'] += 1
+            _report_progress(progress, cancel_event, len(report['files']), None)
+    finally:
+        if own_executor:
+            executor.shutdown(wait=True)
+    
+    report['seconds'] = time.perf_counter() - started
+    return report
+
+def read_metadata(file_path, key):
+    """
+    Lit les métadonnées d'un fichier chiffré sans déchiffrer son contenu
+    
+    Pour le format par blocs, seul l'en-tête est lu et déchiffré : le coût
+    ne dépend pas de la taille du fichier. Les fichiers de l'ancien format
+    doivent en revanche être entièrement déchiffrés.
+    
+    Args:
+        file_path (str): Chemin vers le fichier chiffré
+        key (bytes): Clé de déchiffrement
+        
+    Returns:
+        dict: original_name, original_extension, original_size (None si
+        inconnue), format_version (0 pour l'ancien format), cipher,
+        compression (None si le contenu n'est pas compressé) et bundle
+        (True pour une archive créée par create_bundle)
+        
+    Raises:
+        FileNotFoundError: Si le fichier n'existe pas
+        InvalidToken: Si la clé est incorrecte ou l'en-tête corrompu
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Le fichier {file_path} n'existe pas")
+    
+    _check_key(key)
+    
+    with open(file_path, 'rb') as encrypted_file:
+        codec = _read_codec(encrypted_file, key)
+        if codec is None:
+            metadata, original_data = _open_legacy(encrypted_file, Fernet(key))
+            metadata['original_size'] = len(original_data)
+            format_version, cipher = 0, CIPHER_FERNET
+        else:
+            metadata = json.loads(codec.open_metadata(encrypted_file).decode('utf-8'))
+            format_version, cipher = codec.version, codec.cipher_name
+    
+    return {
+        'original_name': metadata.get('original_name', Path(file_path).stem),
+        'original_extension': metadata.get('original_extension', ''),
+        'original_size': metadata.get('original_size'),
+        'format_version': format_version,
+        'cipher': cipher,
+        'compression': metadata.get('compression'),
+        'bundle': 'bundle' in metadata,
     }
+
+class EncryptedFileReader(io.RawIOBase):
+    """
+    Lecteur positionnable sur le contenu en clair d'un fichier chiffré
     
-    # Convertir les métadonnées en JSON puis en bytes
-    metadata_json = json.dumps(metadata).encode('utf-8')
-    metadata_length = len(metadata_json)
+    Les enregistrements de blocs ayant une taille fixe, la position de
+    chaque bloc dans le fichier chiffré se calcule directement : seuls les
+    blocs couvrant la zone lue sont déchiffrés. Pour un contenu compressé,
+    les positions sont relevées à l'ouverture en parcourant les préfixes de
+    longueur, sans rien déchiffrer.
+    """
     
-    # Créer le contenu à chiffrer : [longueur_metadata][metadata][données_originales]
-    content_to_encrypt = metadata_length.to_bytes(4, byteorder='big') + metadata_json + original_data
+    def __init__(self, file_path, key):
+        super().__init__()
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Le fichier {file_path} n'existe pas")
+        _check_key(key)
+        
+        self._file = open(file_path, 'rb')
+        try:
+            self._codec = _read_codec(self._file, key)
+            if self._codec is None:
+                raise ValueError("L'ancien format ne permet pas l'accès aléatoire")
+            self.metadata = json.loads(self._codec.open_metadata(self._file).decode('utf-8'))
+            _check_not_bundle(self.metadata)
+            self._codec.compressor = _get_compressor(self.metadata.get('compression'))
+            
+            # Localiser les blocs de données
+            self._data_start = self._file.tell()
+            data_length = os.fstat(self._file.fileno()).st_size - self._data_start
+            if data_length <= 0:
+                raise InvalidToken("Fichier tronqué")
+            if self._codec.fixed_records:
+                record_size = self._codec.record_size
+                self._offsets = None
+                self._last_index = (data_length - 1) // record_size
+                self._last_record_size = data_length - self._last_index * record_size
+            else:
+                self._offsets = self._scan_records(self._data_start + data_length)
+                self._last_index = len(self._offsets) - 2
+            
+            self._cached_index = None
+            self._cached_chunk = b""
+            self._size = self.metadata.get('original_size')
+            if self._size is None:
+                # Taille inconnue : la déduire du dernier bloc
+                last_chunk = self._read_chunk(self._last_index)
+                self._size = self._last_index * self._codec.chunk_size + len(last_chunk)
+            elif max(self._size - 1, 0) // self._codec.chunk_size != self._last_index:
+                raise InvalidToken("Fichier tronqué")
+        except BaseException:
+            self._file.close()
+            raise
+        self._position = 0
     
-    # Chiffrer le contenu complet
-    encrypted_data = fernet.encrypt(content_to_encrypt)
+    @property
+    def size(self):
+        """Taille du contenu en clair"""
+        return self._size
     
-    # Créer le nom du fichier chiffré
-    encrypted_filename = f"{original_path.stem}.enc"
+    def _scan_records(self, end):
+        """
+        Relève la position des enregistrements préfixés par leur longueur
+        
+        Returns:
+            list: Positions de début de chaque enregistrement, suivies de la fin
+        """
+        offsets = [self._data_start]
+        while offsets[-1] < end:
+            self._file.seek(offsets[-1])
+            prefix = self._file.read(_RECORD_LENGTH.size)
+            if len(prefix) != _RECORD_LENGTH.size:
+                raise InvalidToken("Fichier tronqué")
+            (length,) = _RECORD_LENGTH.unpack(prefix)
+            offsets.append(offsets[-1] + _RECORD_LENGTH.size + length)
+        if offsets[-1] != end:
+            raise InvalidToken("Fichier tronqué")
+        return offsets
     
-    # Créer le dossier outputs s'il n'existe pas
-    outputs_dir = Path("outputs")
-    outputs_dir.mkdir(exist_ok=True)
+    def _read_chunk(self, index):
+        """Lit et déchiffre un bloc, en gardant le dernier bloc lu en cache"""
+        if index == self._cached_index:
+            return self._cached_chunk
+        
+        is_last = index == self._last_index
+        if self._offsets is not None:
+            offset = self._offsets[index]
+            record_size = self._offsets[index + 1] - offset
+        else:
+            offset = self._data_start + index * self._codec.record_size
+            record_size = self._last_record_size if is_last else self._codec.record_size
+        self._file.seek(offset)
+        raw = self._file.read(record_size)
+        if len(raw) != record_size:
+            raise InvalidToken("Fichier tronqué")
+        
+        chunk_is_last, chunk = self._codec.open_chunk(index, self._codec.unwrap_record(raw), is_last)
+        if chunk_is_last != is_last:
+            raise InvalidToken("Blocs réordonnés ou manquants")
+        
+        self._cached_index = index
+        self._cached_chunk = chunk
+        return chunk
     
-    encrypted_path = outputs_dir / encrypted_filename
+    def readable(self):
+        return True
     
-    # Écrire le fichier chiffré
-    with open(encrypted_path, 'wb') as encrypted_file:
-        encrypted_file.write(encrypted_data)
+    def seekable(self):
+        return True
     
-    return str(encrypted_path)
+    def tell(self):
+        return self._position
+    
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError(f"Valeur de whence invalide: {whence}")
+        if position < 0:
+            raise ValueError(f"Position négative: {position}")
+        self._position = position
+        return position
+    
+    def readinto(self, buffer):
+        chunk_size = self._codec.chunk_size
+        view = memoryview(buffer).cast('B')
+        written = 0
+        while written < len(view) and self._position < self._size:
+            index, start = divmod(self._position, chunk_size)
+            chunk = self._read_chunk(index)
+            count = min(len(chunk) - start, len(view) - written)
+            view[written:written + count] = memoryview(chunk)[start:start + count]
+            written += count
+            self._position += count
+        return written
+    
+    def close(self):
+        if not self.closed:
+            self._file.close()
+        super().close()
 
-def decrypt_file(file_path, key):
+def open_encrypted(file_path, key):
     """
-    Déchiffre un fichier avec la clé fournie
+    Ouvre un fichier chiffré en lecture positionnable
     
     Args:
-        file_path (str): Chemin vers le fichier à déchiffrer
+        file_path (str): Chemin vers le fichier chiffré
         key (bytes): Clé de déchiffrement
         
     Returns:
-        str: Chemin vers le fichier déchiffré
+        EncryptedFileReader: Lecteur du contenu en clair
         
     Raises:
         FileNotFoundError: Si le fichier n'existe pas
-        InvalidToken: Si la clé est incorrecte
-        Exception: Pour toute autre erreur de déchiffrement
+        InvalidToken: Si la clé est incorrecte ou le fichier corrompu
+        ValueError: Si le fichier est à l'ancien format
+    """
+    return EncryptedFileReader(file_path, key)
+
+def decrypt_range(file_path, key, offset, length):
+    """
+    Déchiffre une plage d'octets d'un fichier chiffré
+    
+    Seuls les blocs couvrant la plage sont lus et déchiffrés : le coût
+    dépend de la taille de la plage et non de celle du fichier.
+    
+    Args:
+        file_path (str): Chemin vers le fichier chiffré
+        key (bytes): Clé de déchiffrement
+        offset (int): Position de début dans le contenu en clair
+        length (int): Nombre d'octets à lire
+        
+    Returns:
+        bytes: Données en clair (plus courtes si la plage dépasse la fin)
+        
+    Raises:
+        FileNotFoundError: Si le fichier n'existe pas
+        InvalidToken: Si la clé est incorrecte ou le fichier corrompu
+        ValueError: Si la plage est invalide ou le fichier à l'ancien format
+    """
+    if offset < 0 or length < 0:
+        raise ValueError(f"Plage invalide: {offset}+{length}")
+    with open_encrypted(file_path, key) as reader:
+        reader.seek(offset)
+        return reader.read(length)
+
+def _rewrap_journal_path(file_path):
+    """Journal des octets d'en-tête remplacés par un rewrap() en cours"""
+    file_path = Path(file_path)
+    return file_path.with_name(f".{file_path.name}.rewrap")
+
+def _recover_rewrap(file_path, keep_new=True):
+    """
+    Termine ou annule le rewrap() interrompu d'un fichier
+    
+    Le journal décrit le fichier (taille et début de l'en-tête, qui contient
+    son sel aléatoire), l'ancien et le nouvel en-tête. Un journal qui ne
+    correspond plus au fichier (rechiffré depuis) est ignoré ; si le nouvel
+    en-tête est déjà en place, le changement de clé est conservé ; sinon
+    l'écriture a pu être interrompue et l'ancien en-tête est restauré.
+    
+    Args:
+        keep_new (bool): Conserve un nouvel en-tête complet (False : l'écriture
+            a échoué, l'ancien en-tête est restauré dans tous les cas)
+        
+    Returns:
+        bool: True si l'ancien en-tête a été restauré
+    """
+    journal_path = _rewrap_journal_path(file_path)
+    try:
+        with open(journal_path, 'rb') as journal_file:
+            journal = json.loads(journal_file.read().decode('utf-8'))
+    except FileNotFoundError:
+        return False
+    
+    identity = bytes.fromhex(journal['identity'])
+    old_header = bytes.fromhex(journal['old'])
+    new_header = bytes.fromhex(journal['new'])
+    restored = False
+    with open(file_path, 'r+b') as encrypted_file:
+        same_file = (os.fstat(encrypted_file.fileno()).st_size == journal['size']
+                     and encrypted_file.read(len(identity)) == identity)
+        kept = (new_header, old_header) if keep_new else (old_header,)
+        if same_file and encrypted_file.read(len(new_header)) not in kept:
+            encrypted_file.seek(len(identity))
+            encrypted_file.write(old_header)
+            encrypted_file.flush()
+            os.fsync(encrypted_file.fileno())
+            restored = True
+    os.remove(journal_path)
+    return restored
+
+def rewrap(file_path, old_key, new_key, fsync=False):
+    """
+    Change la clé maître d'un fichier chiffré sans rechiffrer son contenu
+    
+    Seule la clé de données enveloppée, de taille fixe, est réécrite sur
+    place dans l'en-tête : le coût ne dépend pas de la taille du fichier.
+    
+    L'ancien et le nouvel en-tête sont d'abord notés dans un journal
+    (".nom.enc.rewrap") écrit sur le disque, puis le nouvel en-tête est
+    écrit sur le disque avant la suppression du journal. Si un rewrap() a
+    été interrompu, l'appel suivant sur le même fichier le termine : un
+    nouvel en-tête complet est conservé, une écriture incomplète est
+    annulée (le fichier s'ouvre alors toujours avec l'ancienne clé).
+    
+    Args:
+        file_path (str): Chemin vers le fichier chiffré
+        old_key (bytes | Passphrase): Clé maître ou phrase secrète actuelle
+        new_key (bytes | Passphrase): Nouvelle clé maître ou phrase secrète
+        fsync (bool): Écrit aussi sur le disque la suppression du journal
+            (l'en-tête et le journal le sont toujours)
+        
+    Raises:
+        FileNotFoundError: Si le fichier n'existe pas
+        InvalidToken: Si l'ancienne clé est incorrecte ou l'en-tête corrompu
+        ValueError: Si la nouvelle clé est invalide, si le format du fichier
+            n'a pas de clé de données ou si l'on passe d'une clé à une phrase
+            secrète (il faut alors rechiffrer le fichier)
     """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Le fichier {file_path} n'existe pas")
+    _check_key(old_key)
+    _check_key(new_key)
+    _recover_rewrap(file_path)
     
-    # Créer l'objet Fernet
-    fernet = Fernet(key)
+    journal_path = _rewrap_journal_path(file_path)
+    with open(file_path, 'r+b') as encrypted_file:
+        codec = _read_codec(encrypted_file, old_key)
+        if not isinstance(codec, _EnvelopeCodec):
+            raise ValueError("Ce format ne permet pas de changer de clé sans rechiffrer le fichier")
+        if isinstance(new_key, Passphrase) != isinstance(old_key, Passphrase):
+            raise ValueError("Passer d'une clé à une phrase secrète nécessite de rechiffrer le fichier")
+        
+        identity = codec.authenticated_header()
+        old_header = codec.key_header + codec.wrapped_key
+        codec.wrap(new_key)
+        new_header = codec.key_header + codec.wrapped_key
+        journal = {'size': os.fstat(encrypted_file.fileno()).st_size, 'identity': identity.hex(),
+                   'old': old_header.hex(), 'new': new_header.hex()}
+        with _AtomicOutput(journal_path, overwrite=True, fsync=True) as journal_file:
+            journal_file.write(json.dumps(journal).encode('utf-8'))
+        
+        try:
+            encrypted_file.seek(len(identity))
+            encrypted_file.write(new_header)
+            encrypted_file.flush()
+            os.fsync(encrypted_file.fileno())
+        except BaseException:
+            encrypted_file.close()
+            _recover_rewrap(file_path, keep_new=False)
+            raise
+    os.remove(journal_path)
+    if fsync:
+        _fsync_directory(journal_path.parent)
+
+class _LoopBridge:
+    """
+    Base des adaptateurs entre le thread de chiffrement et la boucle asyncio
     
-    # Lire le fichier chiffré
-    with open(file_path, 'rb') as encrypted_file:
-        encrypted_data = encrypted_file.read()
+    Chaque appel bloque le thread jusqu'à ce que la coroutine correspondante
+    ait été exécutée par la boucle, qui n'est donc jamais bloquée.
+    """
     
-    # Déchiffrer les données
-    try:
-        decrypted_content = fernet.decrypt(encrypted_data)
-    except InvalidToken:
-        raise InvalidToken("Clé de déchiffrement incorrecte ou fichier corrompu")
+    def __init__(self, loop, cancel_event):
+        self._loop = loop
+        self._cancel_event = cancel_event
+        self._future = None
     
-    # Extraire la longueur des métadonnées (4 premiers bytes)
-    metadata_length = int.from_bytes(decrypted_content[:4], byteorder='big')
+    def _call(self, coroutine):
+        import asyncio
+        
+        if self._cancel_event.is_set():
+            coroutine.close()
+            raise OperationCancelled("Opération annulée")
+        self._future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        return self._future.result()
     
-    # Extraire les métadonnées
-    metadata_bytes = decrypted_content[4:4+metadata_length]
-    metadata = json.loads(metadata_bytes.decode('utf-8'))
+    def cancel(self):
+        """Interrompt l'appel en cours, s'il y en a un"""
+        if self._future is not None:
+            self._future.cancel()
+
+class _AsyncSourceBridge(_LoopBridge):
+    """
+    Présente une source asynchrone comme un flux binaire bloquant
     
-    # Extraire les données originales
-    original_data = decrypted_content[4+metadata_length:]
+    Accepte les objets dont read() est une coroutine (asyncio.StreamReader,
+    flux aiohttp...) et les itérables asynchrones de bytes.
+    """
     
-    # Reconstruire le nom du fichier avec l'extension originale
-    original_extension = metadata.get('original_extension', '')
-    original_name = metadata.get('original_name', Path(file_path).stem)
+    def __init__(self, source, loop, cancel_event):
+        super().__init__(loop, cancel_event)
+        self._source = source
+        self._iterator = None if _has_async_read(source) else source.__aiter__()
+        self._pending = bytearray()
     
-    # Créer le nom du fichier déchiffré avec l'extension originale
-    if original_extension:
-        decrypted_filename = f"{original_name}_decrypted{original_extension}"
+    async def _read(self, size):
+        if self._iterator is None:
+            if size < 0:
+                return await self._source.read(-1)
+            parts = []
+            remaining = size
+            while remaining > 0:
+                data = await self._source.read(remaining)
+                if not data:
+                    break
+                parts.append(data)
+                remaining -= len(data)
+            return b"".join(parts)
+        
+        while size < 0 or len(self._pending) < size:
+            try:
+                self._pending += await self._iterator.__anext__()
+            except StopAsyncIteration:
+                break
+        size = len(self._pending) if size < 0 else size
+        data = bytes(self._pending[:size])
+        del self._pending[:size]
+        return data
+    
+    def read(self, size=-1):
+        return self._call(self._read(-1 if size is None else size))
+
+class _AsyncSinkBridge(_LoopBridge):
+    """
+    Présente une destination asynchrone comme un flux binaire bloquant
+    
+    write() peut être une coroutine (aiohttp) ; si la destination a une
+    méthode drain() (asyncio.StreamWriter), elle est attendue après chaque
+    écriture, ce qui propage la contre-pression jusqu'à la lecture.
+    """
+    
+    def __init__(self, sink, loop, cancel_event):
+        super().__init__(loop, cancel_event)
+        self._sink = sink
+    
+    async def _write(self, data):
+        import inspect
+        
+        result = self._sink.write(data)
+        if inspect.isawaitable(result):
+            await result
+        drain = getattr(self._sink, 'drain', None)
+        if drain is not None:
+            await drain()
+    
+    def write(self, data):
+        self._call(self._write(data))
+        return len(data)
+    
+    def writelines(self, parts):
+        self._call(self._write(b"".join(parts)))
+
+def _has_async_read(source):
+    """Indique si read() est une coroutine"""
+    import inspect
+    
+    return inspect.iscoroutinefunction(getattr(source, 'read', None))
+
+@contextmanager
+def _bridged_source(source, loop, cancel_event, bridges):
+    """Ouvre une source de chiffrement asynchrone dans le thread de travail"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as file:
+            yield file
+    elif _has_async_read(source) or hasattr(source, '__aiter__'):
+        bridge = _AsyncSourceBridge(source, loop, cancel_event)
+        bridges.append(bridge)
+        yield bridge
     else:
-        decrypted_filename = f"{original_name}_decrypted"
+        yield source
+
+@contextmanager
+def _bridged_sink(sink, loop, cancel_event, bridges):
+    """Ouvre une destination asynchrone dans le thread de travail"""
+    import inspect
     
-    # Créer le dossier outputs s'il n'existe pas
-    outputs_dir = Path("outputs")
-    outputs_dir.mkdir(exist_ok=True)
+    if isinstance(sink, (str, os.PathLike)):
+        with _AtomicOutput(sink, overwrite=True) as file:
+            yield file
+    elif inspect.iscoroutinefunction(getattr(sink, 'write', None)) or hasattr(sink, 'drain'):
+        bridge = _AsyncSinkBridge(sink, loop, cancel_event)
+        bridges.append(bridge)
+        yield bridge
+    else:
+        yield sink
+
+async def _run_bridged(source, sink, run, progress):
+    """
+    Exécute run(lecteur, écrivain, progression, événement d'annulation) dans un thread
+    
+    Si la tâche asyncio est annulée, le thread est interrompu et attendu
+    avant de propager l'annulation, pour ne pas laisser de fichier partiel.
+    """
+    # Import différé : asyncio est coûteux à charger et inutile à la ligne de commande
+    import asyncio
     
-    decrypted_path = outputs_dir / decrypted_filename
+    loop = asyncio.get_running_loop()
+    cancel_event = threading.Event()
+    bridges = []
     
-    # Écrire le fichier déchiffré
-    with open(decrypted_path, 'wb') as decrypted_file:
-        decrypted_file.write(original_data)
+    report = None
+    if progress is not None:
+        def report(done, total):
+            loop.call_soon_threadsafe(progress, done, total)
     
-    return str(decrypted_path)
+    def work():
+        with _bridged_source(source, loop, cancel_event, bridges) as reader, \
+                _bridged_sink(sink, loop, cancel_event, bridges) as writer:
+            return run(reader, writer, report, cancel_event)
+    
+    future = loop.run_in_executor(None, work)
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        cancel_event.set()
+        for bridge in bridges:
+            bridge.cancel()
+        try:
+            await future
+        except BaseException:
+            pass
+        raise
+
+async def encrypt_async(source, sink, key, name=None, chunk_size=DEFAULT_CHUNK_SIZE, workers=1,
+                        executor=None, cipher=DEFAULT_CIPHER, compression=None, progress=None):
+    """
+    Chiffre une source vers une destination sans bloquer la boucle asyncio
+    
+    Les blocs sont lus, chiffrés et écrits au fil de l'eau dans un thread de
+    travail : la mémoire reste bornée et une destination lente ralentit la
+    lecture de la source (contre-pression). Un envoi peut ainsi être chiffré
+    à mesure qu'il arrive, sans passer par un fichier temporaire.
+    
+    Args:
+        source: Chemin, flux binaire, objet dont read() est une coroutine
+            (asyncio.StreamReader, aiohttp...) ou itérable asynchrone de bytes
+        sink: Chemin, flux binaire, asyncio.StreamWriter ou objet dont
+            write() est une coroutine
+        key (bytes | Passphrase): Clé de chiffrement ou phrase secrète
+        name (str): Nom d'origine à enregistrer (par défaut celui du chemin source)
+        chunk_size (int): Taille des blocs de données en octets
+        workers (int): Nombre de processus de chiffrement (None = nombre de cœurs)
+        executor (Executor): Exécuteur partagé pour le chiffrement des blocs
+        cipher (str): Algorithme ("aes-gcm", "chacha20-poly1305", "fernet" ou
+            "auto" pour le plus rapide sur cette machine, voir select_cipher)
+        compression (str): Algorithme de compression ("zlib", "lzma", ou None)
+        progress (callable): Appelée dans la boucle avec (octets lus, octets au
+            total ou None) après chaque bloc
+        
+    Returns:
+        int: Nombre d'octets en clair chiffrés
+        
+    Raises:
+        ValueError: Si la clé, la taille de bloc ou l'algorithme est invalide
+    """
+    size = None
+    if isinstance(source, (str, os.PathLike)):
+        name = os.fspath(source) if name is None else name
+        size = os.path.getsize(source)
+        if compression is not None and not _is_compressible(source):
+            compression = None
+    
+    def run(reader, writer, report, cancel_event):
+        return encrypt_stream(reader, writer, key, name, chunk_size, workers, executor,
+                              cipher, compression, report, cancel_event, size=size)
+    
+    return await _run_bridged(source, sink, run, progress)
+
+async def decrypt_async(source, sink, key, workers=1, executor=None, progress=None):
+    """
+    Déchiffre une source vers une destination sans bloquer la boucle asyncio
+    
+    Pendant de encrypt_async, avec les mêmes types de source et de destination.
+    
+    Args:
+        source: Chemin, flux binaire, objet dont read() est une coroutine ou
+            itérable asynchrone de bytes
+        sink: Chemin, flux binaire, asyncio.StreamWriter ou objet dont
+            write() est une coroutine
+        key (bytes | Passphrase): Clé de déchiffrement ou phrase secrète
+        workers (int): Nombre de processus de déchiffrement (None = nombre de cœurs)
+        executor (Executor): Exécuteur partagé pour le déchiffrement des blocs
+        progress (callable): Appelée dans la boucle avec (octets écrits, octets au total ou None)
+        
+    Returns:
+        dict: Métadonnées du contenu (nom et taille d'origine s'ils sont connus)
+        
+    Raises:
+        InvalidToken: Si la clé est incorrecte ou les données corrompues
+    """
+    def run(reader, writer, report, cancel_event):
+        return decrypt_stream(reader, writer, key, workers, executor, report, cancel_event)
+    
+    return await _run_bridged(source, sink, run, progress)
 
 def validate_key(key_string):
     """
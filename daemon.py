@@ -0,0 +1,594 @@
+"""
+Service local de chiffrement sur socket Unix, et son client léger
+
+Le service garde cryptography chargé, les clés en mémoire et un pool de
+threads prêt : une requête ne coûte que le chiffrement lui-même, sans le
+démarrage d'un interpréteur. Le client n'importe ni cryptography ni
+crypto_utils.
+
+Protocole : une requête JSON par ligne, une réponse JSON par ligne
+({"ok": true, "result": ...} ou {"ok": false, "error": ..., "type": ...}).
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import logging
+import os
+import socket
+import stat
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+DEFAULT_WORKERS = 4
+DEFAULT_KEY_TTL = 900
+_MAX_REQUEST_SIZE = 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+def default_socket_path():
+    """
+    Chemin du socket : $ENCRYPTOR_SOCKET, sinon un socket propre à l'utilisateur
+    
+    Sans $XDG_RUNTIME_DIR, le socket est placé dans un dossier privé (0700)
+    du répertoire temporaire, pour qu'aucun autre utilisateur ne puisse
+    créer le socket à sa place et recevoir les clés envoyées par le client.
+    """
+    if os.environ.get("ENCRYPTOR_SOCKET"):
+        return os.environ["ENCRYPTOR_SOCKET"]
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return os.path.join(os.environ["XDG_RUNTIME_DIR"], f"encryptor-{os.getuid()}.sock")
+    return os.path.join(_private_directory(), "encryptor.sock")
+
+def _private_directory():
+    """
+    Crée ou vérifie le dossier privé de l'utilisateur dans le répertoire temporaire
+    
+    Raises:
+        PermissionError: Si le dossier existe mais appartient à un autre
+            utilisateur, est un lien ou est accessible aux autres
+    """
+    directory = os.path.join(tempfile.gettempdir(), f"encryptor-{os.getuid()}")
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(directory)
+    if (not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid()
+            or info.st_mode & 0o077):
+        raise PermissionError(f"Dossier du socket non sûr: {directory}")
+    return directory
+
+def _peer_uid(sock):
+    """Utilisateur du processus à l'autre bout d'un socket Unix (None si inconnu)"""
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return None
+    credentials = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    return struct.unpack("3i", credentials)[1]
+
+class DaemonError(Exception):
+    """Erreur renvoyée par le service ; error_type est le nom de l'exception d'origine"""
+    
+    def __init__(self, message, error_type=None):
+        super().__init__(message)
+        self.error_type = error_type
+
+class _KeyStore:
+    """
+    Clés chargées dans le service, désignées par un identifiant
+    
+    L'identifiant est une empreinte HMAC de la clé avec un secret propre au
+    processus : il ne révèle rien de la clé et ne sert que dans ce service.
+    Une clé expire après ttl secondes sans utilisation.
+    """
+    
+    def __init__(self, ttl=DEFAULT_KEY_TTL):
+        self.ttl = ttl
+        self._secret = os.urandom(32)
+        self._entries = {}
+        self._lock = threading.Lock()
+    
+    def add(self, key, material):
+        """
+        Mémorise une clé (bytes ou Passphrase)
+        
+        Args:
+            material (bytes): Octets identifiant la clé (clé ou phrase secrète)
+            
+        Returns:
+            str: Identifiant de la clé
+        """
+        key_id = hmac.new(self._secret, material, hashlib.sha256).hexdigest()[:32]
+        with self._lock:
+            self._entries[key_id] = (key, time.monotonic() + self.ttl)
+        return key_id
+    
+    def get(self, key_id):
+        """
+        Renvoie la clé et repousse son expiration
+        
+        Raises:
+            ValueError: Si la clé est inconnue ou expirée
+        """
+        with self._lock:
+            now = time.monotonic()
+            for expired in [k for k, (_, expires) in self._entries.items() if expires <= now]:
+                del self._entries[expired]
+            if key_id not in self._entries:
+                raise ValueError("Clé inconnue ou expirée : rechargez-la avec load_key")
+            key = self._entries[key_id][0]
+            self._entries[key_id] = (key, now + self.ttl)
+            return key
+    
+    def remove(self, key_id):
+        """Oublie une clé"""
+        with self._lock:
+            self._entries.pop(key_id, None)
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+class EncryptionDaemon:
+    """
+    Service de chiffrement à l'écoute d'un socket Unix
+    
+    Chaque connexion est lue par un thread dédié, qui confie ses requêtes au
+    pool de travail partagé : le nombre d'opérations simultanées reste borné
+    quel que soit le nombre de clients. Le socket n'est accessible qu'à
+    l'utilisateur qui lance le service (mode 0600).
+    
+    Args:
+        socket_path (str): Chemin du socket
+        workers (int): Nombre d'opérations traitées simultanément
+        key_ttl (float): Durée de vie des clés chargées, en secondes, sans utilisation
+    """
+    
+    def __init__(self, socket_path=None, workers=DEFAULT_WORKERS, key_ttl=DEFAULT_KEY_TTL):
+        import crypto_utils
+        from concurrent.futures import ThreadPoolExecutor
+        
+        self.socket_path = socket_path or default_socket_path()
+        self.workers = workers
+        self.keys = _KeyStore(key_ttl)
+        self._crypto = crypto_utils
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="encryptor")
+        self._socket = None
+        self._stopping = threading.Event()
+        self._handlers = {
+            'ping': self._ping,
+            'load_key': self._load_key,
+            'forget_key': self._forget_key,
+            'encrypt': self._encrypt,
+            'decrypt': self._decrypt,
+            'verify': self._verify,
+            'shutdown': self._shutdown,
+        }
+    
+    def warm_up(self):
+        """Démarre les threads du pool et initialise les algorithmes de chiffrement"""
+        # Mesure faite une fois pour toutes : les requêtes cipher="auto" n'attendent pas
+        self._crypto.benchmark_ciphers()
+        key = self._crypto.generate_key()
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "warm-up")
+            with open(source, 'wb') as file:
+                file.write(os.urandom(1024))
+            for cipher in ("aes-gcm", "chacha20-poly1305"):
+                futures = [self._pool.submit(self._crypto.encrypt_file, source, key,
+                                             cipher=cipher, output_dir=directory)
+                           for _ in range(self.workers)]
+                for future in futures:
+                    self._crypto.verify(future.result(), key)
+    
+    def _bind(self):
+        """Crée le socket d'écoute, en remplaçant un socket abandonné"""
+        if not hasattr(socket, 'AF_UNIX'):
+            raise OSError("Les sockets Unix ne sont pas disponibles sur ce système")
+        if os.path.exists(self.socket_path):
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                    probe.connect(self.socket_path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.remove(self.socket_path)
+            else:
+                raise OSError(f"Un service écoute déjà sur {self.socket_path}")
+        
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Créé d'emblée en 0600 : aucun autre utilisateur ne peut s'y connecter
+        previous_umask = os.umask(0o177)
+        try:
+            listener.bind(self.socket_path)
+        finally:
+            os.umask(previous_umask)
+        listener.listen(64)
+        return listener
+    
+    def serve_forever(self):
+        """Écoute le socket jusqu'à stop() ou une requête shutdown"""
+        self._socket = self._bind()
+        logger.info("Service à l'écoute sur %s (%d workers)", self.socket_path, self.workers)
+        try:
+            while not self._stopping.is_set():
+                try:
+                    connection, _ = self._socket.accept()
+                except OSError:
+                    if self._stopping.is_set():
+                        break
+                    raise
+                threading.Thread(target=self._serve_connection, args=(connection,),
+                                 daemon=True).start()
+        finally:
+            self._close()
+    
+    def stop(self):
+        """Arrête le service (appelable depuis n'importe quel thread)"""
+        self._stopping.set()
+        if self._socket is not None:
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._socket.close()
+    
+    def _close(self):
+        self._pool.shutdown(wait=True)
+        try:
+            os.remove(self.socket_path)
+        except OSError:
+            pass
+    
+    def _serve_connection(self, connection):
+        """Traite les requêtes d'une connexion jusqu'à sa fermeture"""
+        if _peer_uid(connection) not in (None, os.getuid()):
+            connection.close()
+            return
+        with connection, connection.makefile('rb') as reader, connection.makefile('wb') as writer:
+            while True:
+                line = reader.readline(_MAX_REQUEST_SIZE + 1)
+                if not line:
+                    return
+                if len(line) > _MAX_REQUEST_SIZE:
+                    self._reply(writer, self._error(ValueError("Requête trop volumineuse")))
+                    return
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    self._reply(writer, self._error(e))
+                    continue
+                response = self._pool.submit(self._dispatch, request).result()
+                self._reply(writer, response)
+                if response['ok'] and request.get('op') == 'shutdown':
+                    # Arrêt après la réponse, pour que le client la reçoive
+                    self.stop()
+                    return
+    
+    def _reply(self, writer, response):
+        writer.write(json.dumps(response).encode('utf-8') + b"\n")
+        writer.flush()
+    
+    def _error(self, error):
+        return {'ok': False, 'error': str(error) or type(error).__name__,
+                'type': type(error).__name__}
+    
+    def _dispatch(self, request):
+        """Exécute une requête dans le pool et construit la réponse"""
+        started = time.perf_counter()
+        operation = request.get('op') if isinstance(request, dict) else None
+        try:
+            if operation not in self._handlers:
+                raise ValueError(f"Opération inconnue: {operation}")
+            response = {'ok': True, 'result': self._handlers[operation](request)}
+        except Exception as e:
+            response = self._error(e)
+        logger.debug("%s %s en %.3f ms", operation, "ok" if response['ok'] else response['type'],
+                     (time.perf_counter() - started) * 1000)
+        return response
+    
+    def _request_key(self, request):
+        """Clé désignée par key_id, ou passée directement dans la requête"""
+        if request.get('key_id'):
+            return self.keys.get(request['key_id'])
+        if request.get('key'):
+            return self._crypto.validate_key(request['key'])
+        raise ValueError("Clé manquante (key_id ou key)")
+    
+    def _ping(self, request):
+        return {'pid': os.getpid(), 'workers': self.workers, 'keys': len(self.keys)}
+    
+    def _load_key(self, request):
+        if request.get('passphrase'):
+            secret = request['passphrase']
+            key = self._crypto.Passphrase(secret)
+            material = b"passphrase:" + secret.encode('utf-8')
+        elif request.get('key'):
+            key = self._crypto.validate_key(request['key'])
+            material = b"key:" + key
+        else:
+            raise ValueError("Clé manquante (key ou passphrase)")
+        return {'key_id': self.keys.add(key, material), 'ttl': self.keys.ttl}
+    
+    def _forget_key(self, request):
+        self.keys.remove(request.get('key_id'))
+        return {}
+    
+    def _encrypt(self, request):
+        output = self._crypto.encrypt_file(
+            request['path'], self._request_key(request),
+            chunk_size=request.get('chunk_size', self._crypto.DEFAULT_CHUNK_SIZE),
+            cipher=request.get('cipher', self._crypto.DEFAULT_CIPHER),
+            compression=request.get('compression'),
+            output_dir=request.get('output_dir'),
+            overwrite=request.get('overwrite', False),
+            fsync=request.get('fsync', False),
+            incremental=request.get('incremental', False),
+            previous=request.get('previous'),
+        )
+        return {'output': output}
+    
+    def _decrypt(self, request):
+        output = self._crypto.decrypt_file(
+            request['path'], self._request_key(request),
+            output_dir=request.get('output_dir'),
+            overwrite=request.get('overwrite', False),
+            fsync=request.get('fsync', False),
+        )
+        return {'output': output}
+    
+    def _verify(self, request):
+        return self._crypto.verify(request['path'], self._request_key(request))
+    
+    def _shutdown(self, request):
+        return {}
+
+class DaemonClient:
+    """
+    Client du service de chiffrement
+    
+    Une connexion est ouverte à la première requête puis réutilisée. Les
+    chemins sont rendus absolus avant l'envoi : le service ne partage pas le
+    dossier courant du client.
+    
+    Args:
+        socket_path (str): Chemin du socket (par défaut default_socket_path())
+        timeout (float): Délai maximal d'une requête, en secondes (None = illimité)
+    """
+    
+    def __init__(self, socket_path=None, timeout=None):
+        self.socket_path = socket_path or default_socket_path()
+        self.timeout = timeout
+        self._socket = None
+        self._reader = None
+    
+    def _connect(self):
+        """
+        Se connecte au service, après avoir vérifié qu'il appartient à l'utilisateur
+        
+        Les clés sont envoyées en clair sur le socket : un socket créé par
+        un autre utilisateur est refusé, avant et après la connexion.
+        """
+        if self._socket is None:
+            if os.stat(self.socket_path).st_uid != os.getuid():
+                raise PermissionError(f"Le socket {self.socket_path} appartient à un autre utilisateur")
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+                if _peer_uid(sock) not in (None, os.getuid()):
+                    raise PermissionError(f"Le service sur {self.socket_path} appartient à un autre utilisateur")
+            except OSError:
+                sock.close()
+                raise
+            self._socket = sock
+            self._reader = sock.makefile('rb')
+    
+    def request(self, operation, **fields):
+        """
+        Envoie une requête et renvoie son résultat
+        
+        Raises:
+            DaemonError: Si le service renvoie une erreur
+            OSError: Si le service est injoignable ou appartient à un autre
+                utilisateur (PermissionError)
+        """
+        self._connect()
+        fields['op'] = operation
+        self._socket.sendall(json.dumps(fields).encode('utf-8') + b"\n")
+        line = self._reader.readline()
+        if not line:
+            self.close()
+            raise ConnectionError("Le service a fermé la connexion")
+        response = json.loads(line)
+        if not response['ok']:
+            raise DaemonError(response['error'], response.get('type'))
+        return response['result']
+    
+    def _key_fields(self, key, key_id):
+        if key_id is not None:
+            return {'key_id': key_id}
+        if isinstance(key, bytes):
+            key = key.decode('ascii')
+        return {'key': key}
+    
+    def ping(self):
+        """Renvoie pid, workers et nombre de clés chargées"""
+        return self.request('ping')
+    
+    def load_key(self, key=None, passphrase=None):
+        """
+        Charge une clé ou une phrase secrète dans le service
+        
+        Returns:
+            str: Identifiant à passer ensuite en key_id
+        """
+        if passphrase is not None:
+            return self.request('load_key', passphrase=passphrase)['key_id']
+        return self.request('load_key', **self._key_fields(key, None))['key_id']
+    
+    def forget_key(self, key_id):
+        """Retire une clé du service"""
+        self.request('forget_key', key_id=key_id)
+    
+    def encrypt(self, path, key=None, key_id=None, output_dir=None, **options):
+        """
+        Chiffre un fichier (options : cipher, compression, chunk_size, overwrite,
+        fsync, incremental, previous)
+        """
+        if options.get('previous'):
+            options['previous'] = os.path.abspath(options['previous'])
+        return self.request('encrypt', path=os.path.abspath(path),
+                            output_dir=os.path.abspath(output_dir or "outputs"),
+                            **self._key_fields(key, key_id), **options)['output']
+    
+    def decrypt(self, path, key=None, key_id=None, output_dir=None, **options):
+        """Déchiffre un fichier (options : overwrite, fsync)"""
+        return self.request('decrypt', path=os.path.abspath(path),
+                            output_dir=os.path.abspath(output_dir or "outputs"),
+                            **self._key_fields(key, key_id), **options)['output']
+    
+    def verify(self, path, key=None, key_id=None):
+        """Vérifie un fichier chiffré (voir crypto_utils.verify)"""
+        return self.request('verify', path=os.path.abspath(path), **self._key_fields(key, key_id))
+    
+    def shutdown(self):
+        """Arrête le service"""
+        self.request('shutdown')
+        self.close()
+    
+    def close(self):
+        """Ferme la connexion"""
+        if self._socket is not None:
+            self._reader.close()
+            self._socket.close()
+            self._socket = self._reader = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def cmd_serve(args):
+    """Lance le service au premier plan"""
+    import signal
+    
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format="%(asctime)s %(levelname)s %(message)s")
+    daemon = EncryptionDaemon(args.socket, workers=args.workers, key_ttl=args.key_ttl)
+    daemon.warm_up()
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        daemon.stop()
+    return 0
+
+def _client_key(args):
+    """Arguments de clé d'une commande cliente"""
+    if args.key_id:
+        return {'key_id': args.key_id}
+    if args.key_file:
+        with open(args.key_file, 'r', encoding='utf-8') as key_file:
+            return {'key': key_file.read().strip()}
+    if args.key:
+        return {'key': args.key}
+    raise ValueError("Clé manquante (--key-id, --key ou --key-file)")
+
+def cmd_load_key(args):
+    """Charge une clé dans le service et affiche son identifiant"""
+    import getpass
+    
+    with DaemonClient(args.socket) as client:
+        if args.passphrase:
+            print(client.load_key(passphrase=getpass.getpass("Phrase secrète: ")))
+        else:
+            print(client.load_key(_client_key(args)['key']))
+    return 0
+
+def cmd_files(args):
+    """Chiffre, déchiffre ou vérifie des fichiers via le service"""
+    status = 0
+    with DaemonClient(args.socket) as client:
+        for file_path in args.files:
+            if args.command == "verify":
+                report = client.verify(file_path, **_client_key(args))
+                print(f"OK {file_path}" if report['valid']
+                      else f"INVALIDE {file_path} (octet {report['offset']}): {report['error']}")
+                status = status or (0 if report['valid'] else 1)
+                continue
+            operation = client.encrypt if args.command == "encrypt" else client.decrypt
+            print(operation(file_path, output_dir=args.output_dir, overwrite=args.overwrite,
+                            **_client_key(args)))
+    return status
+
+def cmd_ping(args):
+    """Affiche l'état du service"""
+    with DaemonClient(args.socket) as client:
+        print(json.dumps(client.ping()))
+    return 0
+
+def cmd_stop(args):
+    """Arrête le service"""
+    DaemonClient(args.socket).shutdown()
+    return 0
+
+def build_parser():
+    """Construit l'analyseur d'arguments"""
+    parser = argparse.ArgumentParser(prog="encryptor-daemon",
+                                     description="Service local de chiffrement et son client")
+    parser.add_argument("--socket", help="Chemin du socket (défaut: $ENCRYPTOR_SOCKET ou "
+                                         "$XDG_RUNTIME_DIR/encryptor-UID.sock)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    serve = subparsers.add_parser("serve", help="Lancer le service")
+    serve.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                       help="Nombre d'opérations simultanées")
+    serve.add_argument("--key-ttl", type=float, default=DEFAULT_KEY_TTL,
+                       help="Durée de vie des clés inutilisées, en secondes")
+    serve.add_argument("--verbose", action="store_true", help="Journaliser chaque requête")
+    serve.set_defaults(handler=cmd_serve)
+    
+    load_key = subparsers.add_parser("load-key", help="Charger une clé et afficher son identifiant")
+    group = load_key.add_mutually_exclusive_group()
+    group.add_argument("--key", help="Clé de chiffrement")
+    group.add_argument("--key-file", help="Fichier contenant la clé")
+    group.add_argument("--passphrase", action="store_true",
+                       help="Phrase secrète (demandée au clavier)")
+    load_key.set_defaults(handler=cmd_load_key, key_id=None)
+    
+    for name, help_text in (("encrypt", "Chiffrer des fichiers"),
+                            ("decrypt", "Déchiffrer des fichiers"),
+                            ("verify", "Vérifier des fichiers chiffrés")):
+        command = subparsers.add_parser(name, help=help_text)
+        command.add_argument("files", nargs="+", help="Fichiers à traiter")
+        group = command.add_mutually_exclusive_group()
+        group.add_argument("--key-id", help="Identifiant renvoyé par load-key")
+        group.add_argument("--key", help="Clé de chiffrement")
+        group.add_argument("--key-file", help="Fichier contenant la clé")
+        if name != "verify":
+            command.add_argument("--output-dir", help="Dossier de sortie (défaut: outputs)")
+            command.add_argument("--overwrite", action="store_true",
+                                 help="Remplacer les fichiers existants")
+        command.set_defaults(handler=cmd_files)
+    
+    ping = subparsers.add_parser("ping", help="Afficher l'état du service")
+    ping.set_defaults(handler=cmd_ping)
+    stop = subparsers.add_parser("stop", help="Arrêter le service")
+    stop.set_defaults(handler=cmd_stop)
+    return parser
+
+def main(argv=None):
+    """Point d'entrée du service et du client"""
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except (DaemonError, OSError, ValueError) as e:
+        print(f"ERREUR: {e}", file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,17 @@
-
 """
 Application de chiffrement/déchiffrement de fichiers
 Lanceur principal
 """
 
 import sys
-import os
 from pathlib import Path
-from PyQt5.QtWidgets import QApplication
-from ui import CryptoApp
 
 def main():
     """Point d'entrée principal de l'application"""
+    # Import différé : PyQt5 n'est chargé que pour l'interface graphique
+    from PyQt5.QtWidgets import QApplication
+    from ui import CryptoApp
+    
     app = QApplication(sys.argv)
     app.setApplicationName("Chiffreur de Fichiers")
     app.setApplicationVersion("1.0")
@@ -27,4 +27,4 @@ def main():
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,46 @@
+"""
+Tests du chiffrement incrémental (encrypt_file avec incremental=True)
+"""
+
+import os
+import tempfile
+import unittest
+
+from crypto_utils import decrypt_file, encrypt_file, generate_key
+
+
+class IncrementalTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+        self.key = generate_key()
+        self.source = os.path.join(self.directory, "disque.img")
+        self.output_dir = os.path.join(self.directory, "chiffrés")
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_two_passes_without_overwrite_replace_previous_version(self):
+        chunk_size = 4096
+        data = bytearray(os.urandom(16 * chunk_size))
+        with open(self.source, 'wb') as file:
+            file.write(data)
+        first = encrypt_file(self.source, self.key, chunk_size=chunk_size,
+                             output_dir=self.output_dir, incremental=True)
+
+        data[5 * chunk_size] ^= 0xFF
+        with open(self.source, 'wb') as file:
+            file.write(data)
+        second = encrypt_file(self.source, self.key, chunk_size=chunk_size,
+                              output_dir=self.output_dir, incremental=True)
+
+        self.assertEqual(first, second)
+        self.assertEqual(os.listdir(self.output_dir), [os.path.basename(first)])
+        decrypted = decrypt_file(second, self.key, output_dir=os.path.join(self.directory, "clair"))
+        with open(decrypted, 'rb') as file:
+            self.assertEqual(file.read(), bytes(data))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,17 +3,353 @@ Interface utilisateur PyQt5 pour l'application de chiffrement
 """
 
 import os
+import shutil
 import sys
+import tempfile
+import threading
+import time
+from collections import deque
 from pathlib import Path
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                             QLabel, QLineEdit, QPushButton, QTextEdit, 
-                             QFileDialog, QMessageBox, QFrame, QApplication)
-from PyQt5.QtCore import Qt, QMimeData, QUrl
-from PyQt5.QtGui import QFont, QClipboard, QDragEnterEvent, QDropEvent
+                             QLabel, QLineEdit, QPushButton, 
+                             QFileDialog, QMessageBox, QFrame, QApplication,
+                             QProgressBar, QTableWidget, QTableWidgetItem,
+                             QHeaderView, QSpinBox, QListView, QComboBox)
+from PyQt5.QtCore import (Qt, QMimeData, QUrl, QThread, QObject, pyqtSignal, QTimer,
+                          QAbstractListModel, QModelIndex, QSortFilterProxyModel)
+from PyQt5.QtGui import QFont, QClipboard, QDragEnterEvent, QDropEvent, QColor
 
-from crypto_utils import generate_key, encrypt_file, decrypt_file, validate_key, key_to_string
+from crypto_utils import (generate_key, encrypt_file, decrypt_file, validate_key, key_to_string,
+                          OperationCancelled, OperationStats)
 from cryptography.fernet import InvalidToken
 
+def expand_paths(paths):
+    """
+    Développe une liste de chemins en la liste des fichiers à traiter
+    
+    Les dossiers sont parcourus récursivement, dans l'ordre alphabétique.
+    
+    Yields:
+        str: Chemin de chaque fichier
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    yield os.path.join(root, name)
+        elif os.path.isfile(path):
+            yield path
+
+def format_rate(bytes_per_second):
+    """Formate un débit en octets par seconde"""
+    for unit in ("o/s", "Ko/s", "Mo/s"):
+        if bytes_per_second < 1024:
+            return f"{bytes_per_second:.1f} {unit}"
+        bytes_per_second /= 1024
+    return f"{bytes_per_second:.1f} Go/s"
+
+class CryptoWorker(QThread):
+    """Exécute un chiffrement ou un déchiffrement hors du thread principal"""
+    
+    # Octets traités, octets au total (None si inconnu), débit en octets/s
+    progress = pyqtSignal(object, object, float)
+    # Chemin du résultat et statistiques par phase (OperationStats)
+    succeeded = pyqtSignal(str, object)
+    failed = pyqtSignal(object)
+    cancelled = pyqtSignal()
+    
+    # Intervalle minimal entre deux signaux de progression, en secondes
+    PROGRESS_INTERVAL = 0.1
+    
+    def __init__(self, operation, file_path, key, parent=None):
+        super().__init__(parent)
+        self.operation = operation
+        self.file_path = file_path
+        self.key = key
+        self.cancel_event = threading.Event()
+        self._started_at = 0.0
+        self._last_emit = 0.0
+        
+    def run(self):
+        """Exécute l'opération et publie son résultat par signal"""
+        self._started_at = time.monotonic()
+        stats = OperationStats()
+        try:
+            result_path = self.operation(self.file_path, self.key,
+                                         progress=self._on_progress,
+                                         cancel_event=self.cancel_event,
+                                         stats=stats)
+        except OperationCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(e)
+        else:
+            self.succeeded.emit(result_path, stats)
+            
+    def cancel(self):
+        """Demande l'annulation de l'opération en cours"""
+        self.cancel_event.set()
+        
+    def _on_progress(self, done, total):
+        """Relaie la progression en limitant la fréquence des signaux"""
+        now = time.monotonic()
+        if now - self._last_emit < self.PROGRESS_INTERVAL and done != total:
+            return
+        self._last_emit = now
+        elapsed = max(now - self._started_at, 1e-6)
+        self.progress.emit(done, total, done / elapsed)
+
+class JobQueue(QObject):
+    """File de tâches exécutées avec un nombre borné de threads simultanés"""
+    
+    job_started = pyqtSignal(int)
+    job_progress = pyqtSignal(int, object, object, float)
+    job_succeeded = pyqtSignal(int, str, object)
+    job_failed = pyqtSignal(int, object)
+    job_cancelled = pyqtSignal(int)
+    # Durée totale de la série de tâches, en secondes
+    all_finished = pyqtSignal(float)
+    
+    def __init__(self, max_concurrent=2, parent=None):
+        super().__init__(parent)
+        self.max_concurrent = max_concurrent
+        self.pending = deque()
+        self.running = {}
+        self.next_job_id = 0
+        self.started_at = None
+        
+    def submit(self, operation, file_path, key):
+        """
+        Ajoute une tâche à la file
+        
+        La tâche démarre au prochain tour de la boucle d'événements :
+        l'appelant peut enregistrer son identifiant avant de recevoir
+        job_started.
+        
+        Returns:
+            int: Identifiant de la tâche
+        """
+        job_id = self.next_job_id
+        self.next_job_id += 1
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+        self.pending.append((job_id, operation, file_path, key))
+        QTimer.singleShot(0, self._start_next)
+        return job_id
+        
+    def set_max_concurrent(self, max_concurrent):
+        """Modifie le nombre maximal de tâches simultanées"""
+        self.max_concurrent = max_concurrent
+        self._start_next()
+        
+    def is_running(self):
+        """Indique si des tâches sont en attente ou en cours"""
+        return bool(self.pending or self.running)
+        
+    def cancel_all(self):
+        """Annule les tâches en attente et en cours"""
+        while self.pending:
+            job_id = self.pending.popleft()[0]
+            self.job_cancelled.emit(job_id)
+        for worker in self.running.values():
+            worker.cancel()
+        self._check_finished()
+            
+    def wait(self):
+        """Attend la fin des threads en cours"""
+        for worker in list(self.running.values()):
+            worker.wait()
+        
+    def _start_next(self):
+        """Démarre des tâches tant que la limite de concurrence le permet"""
+        while self.pending and len(self.running) < self.max_concurrent:
+            job_id, operation, file_path, key = self.pending.popleft()
+            worker = CryptoWorker(operation, file_path, key, self)
+            worker.progress.connect(
+                lambda done, total, rate, job_id=job_id: self.job_progress.emit(job_id, done, total, rate))
+            worker.succeeded.connect(
+                lambda path, stats, job_id=job_id: self.job_succeeded.emit(job_id, path, stats))
+            worker.failed.connect(lambda error, job_id=job_id: self.job_failed.emit(job_id, error))
+            worker.cancelled.connect(lambda job_id=job_id: self.job_cancelled.emit(job_id))
+            worker.finished.connect(lambda job_id=job_id: self._on_finished(job_id))
+            self.running[job_id] = worker
+            self.job_started.emit(job_id)
+            worker.start()
+            
+    def _on_finished(self, job_id):
+        """Libère le thread d'une tâche terminée et lance la suivante"""
+        self.running.pop(job_id).deleteLater()
+        self._start_next()
+        self._check_finished()
+        
+    def _check_finished(self):
+        """Signale la fin de la série de tâches"""
+        if not self.is_running() and self.started_at is not None:
+            elapsed = time.monotonic() - self.started_at
+            self.started_at = None
+            self.all_finished.emit(elapsed)
+
+class LogModel(QAbstractListModel):
+    """
+    Journal d'activité borné : tampon circulaire des derniers messages
+    
+    Les messages ajoutés sont mis en attente puis insérés par lots à
+    intervalle fixe : la vue n'est redessinée qu'une fois par lot, quel que
+    soit le nombre de messages. Au-delà de capacity messages, les plus
+    anciens quittent le modèle ; l'historique complet est écrit par lots
+    dans un fichier temporaire, qui sert à l'export. Les messages sensibles
+    (clés) y sont masqués.
+    """
+    
+    DEBUG, INFO, WARNING, ERROR = range(4)
+    LEVEL_LABELS = {DEBUG: "DÉTAIL", INFO: "INFO", WARNING: "ATTENTION", ERROR: "ERREUR"}
+    LEVEL_COLORS = {DEBUG: "#6c757d", INFO: "#000000", WARNING: "#b35900", ERROR: "#dc3545"}
+    # Rôle donnant le niveau d'un message (pour le filtrage)
+    LevelRole = Qt.UserRole
+    
+    # Nombre de messages conservés et intervalle de rafraîchissement en millisecondes
+    DEFAULT_CAPACITY = 5000
+    REFRESH_INTERVAL = 100
+    
+    def __init__(self, capacity=DEFAULT_CAPACITY, interval=REFRESH_INTERVAL, parent=None):
+        super().__init__(parent)
+        self.capacity = capacity
+        self.entries = deque(maxlen=capacity)
+        self.pending = []
+        self.total = 0
+        self.history = None
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.flush)
+        
+    def append(self, message, level=INFO, sensitive=False):
+        """Met un message en attente jusqu'au prochain rafraîchissement"""
+        self.pending.append((time.time(), level, message, sensitive))
+        if not self.timer.isActive():
+            self.timer.start()
+            
+    def flush(self):
+        """Insère les messages en attente dans le modèle, en un seul lot"""
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        self.total += len(batch)
+        self._write_history(batch)
+        
+        batch = batch[-self.capacity:]
+        overflow = len(self.entries) + len(batch) - self.capacity
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for _ in range(overflow):
+                self.entries.popleft()
+            self.endRemoveRows()
+        first = len(self.entries)
+        self.beginInsertRows(QModelIndex(), first, first + len(batch) - 1)
+        self.entries.extend(batch)
+        self.endInsertRows()
+        
+    def _write_history(self, batch):
+        """Ajoute un lot de messages à l'historique complet"""
+        if self.history is None:
+            self.history = tempfile.TemporaryFile('w+', encoding='utf-8')
+        self.history.writelines(self.format_entry(entry, redact=True) + "\n" for entry in batch)
+        
+    @classmethod
+    def format_entry(cls, entry, redact=False):
+        """Ligne d'export d'un message : date, niveau et texte"""
+        timestamp, level, message, sensitive = entry
+        if redact and sensitive:
+            message = "[masqué]"
+        date = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+        return f"{date} [{cls.LEVEL_LABELS[level]}] {message}"
+        
+    def export(self, path):
+        """
+        Écrit l'historique complet, sans filtre, dans un fichier texte
+        
+        Returns:
+            int: Nombre de messages exportés
+        """
+        self.flush()
+        with open(path, 'w', encoding='utf-8') as output:
+            if self.history is not None:
+                self.history.seek(0)
+                shutil.copyfileobj(self.history, output)
+                self.history.seek(0, os.SEEK_END)
+        return self.total
+        
+    def clear(self):
+        """Vide le journal et son historique"""
+        self.beginResetModel()
+        self.entries.clear()
+        self.pending.clear()
+        self.total = 0
+        if self.history is not None:
+            self.history.close()
+            self.history = None
+        self.endResetModel()
+        
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+        
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        timestamp, level, message, _ = self.entries[index.row()]
+        if role == Qt.DisplayRole:
+            prefix = f"{self.LEVEL_LABELS[level]}: " if level >= self.WARNING else ""
+            return f"{time.strftime('%H:%M:%S', time.localtime(timestamp))}  {prefix}{message}"
+        if role == Qt.ForegroundRole:
+            return QColor(self.LEVEL_COLORS[level])
+        if role == self.LevelRole:
+            return level
+        return None
+
+class LogFilterModel(QSortFilterProxyModel):
+    """Filtre le journal par niveau minimal et par texte"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.min_level = LogModel.DEBUG
+        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        
+    def set_min_level(self, level):
+        """Masque les messages de niveau inférieur"""
+        self.min_level = level
+        self.invalidateFilter()
+        
+    def filterAcceptsRow(self, source_row, source_parent):
+        index = self.sourceModel().index(source_row, 0, source_parent)
+        if self.sourceModel().data(index, LogModel.LevelRole) < self.min_level:
+            return False
+        return super().filterAcceptsRow(source_row, source_parent)
+
+class LogView(QListView):
+    """Vue du journal qui suit les nouveaux messages tant qu'elle est en bas"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Lignes de hauteur identique : la vue n'a pas à mesurer chaque message
+        self.setUniformItemSizes(True)
+        self.setEditTriggers(QListView.NoEditTriggers)
+        self.setSelectionMode(QListView.ExtendedSelection)
+        self.following = True
+        
+    def setModel(self, model):
+        super().setModel(model)
+        model.rowsAboutToBeInserted.connect(self._remember_position)
+        model.rowsInserted.connect(self._follow_new_rows)
+        
+    def _remember_position(self):
+        scroll_bar = self.verticalScrollBar()
+        self.following = scroll_bar.value() >= scroll_bar.maximum()
+        
+    def _follow_new_rows(self):
+        if self.following:
+            self.scrollToBottom()
+
 class DropZone(QLabel):
     """Zone de dépôt de fichiers avec drag & drop"""
     
@@ -36,7 +372,7 @@ class DropZone(QLabel):
             }
         """)
         self.setAlignment(Qt.AlignCenter)
-        self.setText("📁 Déposez votre fichier ici\nou cliquez pour sélectionner")
+        self.setText("📁 Déposez vos fichiers ou dossiers ici\nou cliquez pour sélectionner")
         self.setAcceptDrops(True)
         
     def dragEnterEvent(self, event: QDragEnterEvent):
@@ -72,10 +408,10 @@ class DropZone(QLabel):
         """)
     
     def dropEvent(self, event: QDropEvent):
-        """Événement lors du drop du fichier"""
-        files = [url.toLocalFile() for url in event.mimeData().urls()]
-        if files:
-            self.parent_window.set_file_path(files[0])
+        """Événement lors du drop des fichiers et dossiers"""
+        paths = [url.toLocalFile() for url in event.mimeData().urls()]
+        if paths:
+            self.parent_window.set_files(expand_paths(paths))
         self.dragLeaveEvent(event)
         
     def mousePressEvent(self, event):
@@ -88,14 +424,24 @@ class CryptoApp(QMainWindow):
     
     def __init__(self):
         super().__init__()
-        self.current_file_path = None
+        self.current_files = []
         self.current_key = None
+        self.jobs = {}
+        self.finished_jobs = 0
+        self.succeeded_jobs = 0
+        self.job_queue = JobQueue(max_concurrent=2, parent=self)
+        self.job_queue.job_started.connect(self.on_job_started)
+        self.job_queue.job_progress.connect(self.on_job_progress)
+        self.job_queue.job_succeeded.connect(self.on_job_succeeded)
+        self.job_queue.job_failed.connect(self.on_job_failed)
+        self.job_queue.job_cancelled.connect(self.on_job_cancelled)
+        self.job_queue.all_finished.connect(self.on_all_finished)
         self.init_ui()
         
     def init_ui(self):
         """Initialise l'interface utilisateur"""
         self.setWindowTitle("🔐 Chiffreur de Fichiers")
-        self.setGeometry(100, 100, 600, 700)
+        self.setGeometry(100, 100, 700, 850)
         
         # Widget central
         central_widget = QWidget()
@@ -203,12 +549,90 @@ class CryptoApp(QMainWindow):
         
         layout.addLayout(button_layout)
         
-        # Zone de messages
-        self.message_area = QTextEdit()
+        # Progression de l'opération en cours
+        progress_layout = QHBoxLayout()
+        
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setTextVisible(True)
+        self.progress_bar.setVisible(False)
+        progress_layout.addWidget(self.progress_bar)
+        
+        self.cancel_btn = QPushButton("⛔ Annuler")
+        self.cancel_btn.setVisible(False)
+        self.cancel_btn.clicked.connect(self.cancel_operation)
+        self.cancel_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #fd7e14;
+                color: white;
+                border: none;
+                border-radius: 5px;
+                font-size: 12px;
+                padding: 8px 16px;
+            }
+            QPushButton:hover:enabled {
+                background-color: #e8690b;
+            }
+            QPushButton:disabled {
+                background-color: #6c757d;
+            }
+        """)
+        progress_layout.addWidget(self.cancel_btn)
+        
+        concurrency_label = QLabel("Tâches simultanées:")
+        progress_layout.addWidget(concurrency_label)
+        
+        self.concurrency_input = QSpinBox()
+        self.concurrency_input.setRange(1, max(os.cpu_count() or 1, 2) * 2)
+        self.concurrency_input.setValue(self.job_queue.max_concurrent)
+        self.concurrency_input.valueChanged.connect(self.job_queue.set_max_concurrent)
+        progress_layout.addWidget(self.concurrency_input)
+        
+        layout.addLayout(progress_layout)
+        
+        # Tableau d'état des fichiers
+        self.job_table = QTableWidget(0, 5)
+        self.job_table.setHorizontalHeaderLabels(["Fichier", "Opération", "Statut", "Débit", "Durée"])
+        self.job_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.job_table.verticalHeader().setVisible(False)
+        self.job_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.job_table.setMinimumHeight(150)
+        layout.addWidget(self.job_table)
+        
+        # Journal d'activité et ses filtres
+        log_filter_layout = QHBoxLayout()
+        
+        self.log_level_input = QComboBox()
+        for label, level in (("Tous les messages", LogModel.DEBUG),
+                             ("Informations", LogModel.INFO),
+                             ("Avertissements", LogModel.WARNING),
+                             ("Erreurs", LogModel.ERROR)):
+            self.log_level_input.addItem(label, level)
+        log_filter_layout.addWidget(self.log_level_input)
+        
+        self.log_filter_input = QLineEdit()
+        self.log_filter_input.setPlaceholderText("Filtrer le journal...")
+        log_filter_layout.addWidget(self.log_filter_input)
+        
+        self.export_log_btn = QPushButton("💾 Exporter le journal")
+        self.export_log_btn.clicked.connect(self.export_log)
+        log_filter_layout.addWidget(self.export_log_btn)
+        
+        layout.addLayout(log_filter_layout)
+        
+        self.log_model = LogModel(parent=self)
+        self.log_filter = LogFilterModel(self)
+        self.log_filter.setSourceModel(self.log_model)
+        self.log_filter.set_min_level(self.log_level_input.currentData())
+        self.log_level_input.currentIndexChanged.connect(
+            lambda _: self.log_filter.set_min_level(self.log_level_input.currentData()))
+        self.log_filter_input.textChanged.connect(self.log_filter.setFilterFixedString)
+        
+        self.message_area = LogView()
+        self.message_area.setModel(self.log_filter)
         self.message_area.setMaximumHeight(200)
-        self.message_area.setReadOnly(True)
         self.message_area.setStyleSheet("""
-            QTextEdit {
+            QListView {
                 background-color: #f8f9fa;
                 border: 1px solid #dee2e6;
                 border-radius: 5px;
@@ -301,73 +725,187 @@ class CryptoApp(QMainWindow):
         
     def set_file_path(self, file_path):
         """Définit le chemin du fichier sélectionné"""
-        self.current_file_path = file_path
-        filename = os.path.basename(file_path)
-        self.file_label.setText(f"📄 Fichier sélectionné: {filename}")
-        self.file_label.setStyleSheet("color: #28a745; font-weight: bold; font-size: 12px; margin: 10px 0;")
-        self.add_message(f"Fichier sélectionné: {file_path}")
+        self.set_files([file_path])
+        
+    def set_files(self, file_paths):
+        """Définit la liste des fichiers sélectionnés"""
+        self.current_files = list(file_paths)
+        if not self.current_files:
+            self.add_message("Aucun fichier à traiter", True)
+        elif len(self.current_files) == 1:
+            file_path = self.current_files[0]
+            filename = os.path.basename(file_path)
+            self.file_label.setText(f"📄 Fichier sélectionné: {filename}")
+            self.add_message(f"Fichier sélectionné: {file_path}")
+        else:
+            count = len(self.current_files)
+            self.file_label.setText(f"📄 {count} fichiers sélectionnés")
+            self.add_message(f"{count} fichiers sélectionnés")
+        if self.current_files:
+            self.file_label.setStyleSheet("color: #28a745; font-weight: bold; font-size: 12px; margin: 10px 0;")
         self.update_buttons()
         
     def open_file_dialog(self):
-        """Ouvre la boîte de dialogue de sélection de fichier"""
-        file_path, _ = QFileDialog.getOpenFileName(
+        """Ouvre la boîte de dialogue de sélection de fichiers"""
+        file_paths, _ = QFileDialog.getOpenFileNames(
             self, 
-            "Sélectionner un fichier", 
+            "Sélectionner des fichiers", 
             "", 
             "Tous les fichiers (*.*)"
         )
-        if file_path:
-            self.set_file_path(file_path)
+        if file_paths:
+            self.set_files(file_paths)
             
     def update_buttons(self):
         """Met à jour l'état des boutons"""
-        has_file = self.current_file_path is not None
-        self.encrypt_btn.setEnabled(has_file)
-        self.decrypt_btn.setEnabled(has_file)
-        
-    def add_message(self, message, is_error=False):
-        """Ajoute un message à la zone de messages"""
-        if is_error:
-            formatted_message = f"ERREUR: {message}"
-        else:
-            formatted_message = f"{message}"
+        has_file = bool(self.current_files)
+        is_running = self.job_queue.is_running()
+        self.encrypt_btn.setEnabled(has_file and not is_running)
+        self.decrypt_btn.setEnabled(has_file and not is_running)
+        self.clear_btn.setEnabled(not is_running)
         
-        self.message_area.append(formatted_message)
-        self.message_area.verticalScrollBar().setValue(
-            self.message_area.verticalScrollBar().maximum()
-        )
+    def add_message(self, message, is_error=False, level=None, sensitive=False):
+        """
+        Ajoute un message au journal (affiché au prochain rafraîchissement)
         
-    def encrypt_file(self):
-        """Chiffre le fichier sélectionné"""
-        if not self.current_file_path:
-            self.add_message("Aucun fichier sélectionné", True)
+        Args:
+            level (int): Niveau du message (LogModel.INFO par défaut, ERROR si is_error)
+            sensitive (bool): Masque le message dans l'export du journal
+        """
+        if level is None:
+            level = LogModel.ERROR if is_error else LogModel.INFO
+        self.log_model.append(message, level, sensitive)
+        
+    def export_log(self):
+        """Exporte le journal complet dans un fichier texte"""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Exporter le journal",
+            "journal.txt",
+            "Fichiers texte (*.txt);;Tous les fichiers (*.*)"
+        )
+        if not file_path:
             return
-            
         try:
-            # Générer une nouvelle clé
-            key = generate_key()
-            self.current_key = key
+            count = self.log_model.export(file_path)
+        except OSError as e:
+            self.add_message(f"Impossible d'exporter le journal: {str(e)}", True)
+            return
+        self.add_message(f"Journal exporté ({count} messages): {file_path}")
+        
+    def set_job_cell(self, job_id, column, text):
+        """Met à jour une cellule du tableau d'état"""
+        self.job_table.setItem(self.jobs[job_id]['row'], column, QTableWidgetItem(text))
+        
+    def start_jobs(self, operation, operation_name, key):
+        """Ajoute une tâche par fichier sélectionné à la file"""
+        self.job_table.setRowCount(0)
+        self.jobs.clear()
+        self.finished_jobs = 0
+        self.succeeded_jobs = 0
+        
+        self.progress_bar.setRange(0, len(self.current_files))
+        self.progress_bar.setValue(0)
+        self.progress_bar.setFormat("%v/%m fichiers")
+        self.progress_bar.setVisible(True)
+        self.cancel_btn.setEnabled(True)
+        self.cancel_btn.setVisible(True)
+        
+        for file_path in self.current_files:
+            row = self.job_table.rowCount()
+            self.job_table.insertRow(row)
+            job_id = self.job_queue.submit(operation, file_path, key)
+            self.jobs[job_id] = {'row': row, 'file_path': file_path, 'operation': operation_name}
+            self.set_job_cell(job_id, 0, file_path)
+            self.set_job_cell(job_id, 1, operation_name)
+            self.set_job_cell(job_id, 2, "En attente")
+        self.update_buttons()
+        
+    def on_job_started(self, job_id):
+        """Une tâche démarre"""
+        if job_id in self.jobs:
+            self.jobs[job_id]['started_at'] = time.monotonic()
+            self.set_job_cell(job_id, 2, "En cours")
+        
+    def on_job_progress(self, job_id, done, total, rate):
+        """Progression d'une tâche"""
+        if total:
+            self.set_job_cell(job_id, 2, f"{done * 100 // total} %")
+        self.set_job_cell(job_id, 3, format_rate(rate))
+        
+    def finish_job(self, job_id, status):
+        """Enregistre la fin d'une tâche dans le tableau d'état"""
+        job = self.jobs[job_id]
+        self.set_job_cell(job_id, 2, status)
+        if 'started_at' in job:
+            self.set_job_cell(job_id, 4, f"{time.monotonic() - job['started_at']:.2f} s")
+        self.finished_jobs += 1
+        self.progress_bar.setValue(self.finished_jobs)
+        
+    def on_job_succeeded(self, job_id, result_path, stats):
+        """Tâche terminée avec succès"""
+        self.finish_job(job_id, "Terminé")
+        self.succeeded_jobs += 1
+        if self.jobs[job_id]['operation'] == "Chiffrement":
+            self.add_message(f"Fichier chiffré: {result_path}")
+        else:
+            self.add_message(f"Fichier déchiffré: {result_path}")
+        self.add_message(stats.summary(), level=LogModel.DEBUG)
             
-            # Chiffrer le fichier
-            self.add_message("Chiffrement en cours...")
-            encrypted_path = encrypt_file(self.current_file_path, key)
+    def on_job_failed(self, job_id, error):
+        """Échec d'une tâche"""
+        self.finish_job(job_id, "Erreur")
+        file_path = self.jobs[job_id]['file_path']
+        if self.jobs[job_id]['operation'] == "Chiffrement":
+            self.add_message(f"Erreur lors du chiffrement de {file_path}: {str(error)}", True)
+        elif isinstance(error, InvalidToken):
+            self.add_message(f"Clé incorrecte ou fichier corrompu: {file_path}", True)
+        elif isinstance(error, ValueError):
+            self.add_message(f"Clé invalide: {str(error)}", True)
+        else:
+            self.add_message(f"Erreur lors du déchiffrement de {file_path}: {str(error)}", True)
             
-            # Afficher le succès
-            key_str = key_to_string(key)
-            self.add_message(f"Chiffrement réussi!")
-            self.add_message(f"Fichier chiffré: {encrypted_path}")
-            self.add_message(f"CLÉ GÉNÉRÉE: {key_str}")
-            self.add_message("SAUVEGARDEZ CETTE CLÉ IMMÉDIATEMENT!")
+    def on_job_cancelled(self, job_id):
+        """Tâche annulée"""
+        self.finish_job(job_id, "Annulé")
+        
+    def on_all_finished(self, elapsed):
+        """Toutes les tâches sont terminées"""
+        self.progress_bar.setVisible(False)
+        self.cancel_btn.setVisible(False)
+        self.add_message(f"{self.succeeded_jobs}/{len(self.jobs)} fichier(s) traité(s) en {elapsed:.2f} s")
+        self.update_buttons()
+        
+    def cancel_operation(self):
+        """Annule les opérations en cours"""
+        if self.job_queue.is_running():
+            self.cancel_btn.setEnabled(False)
+            self.add_message("Annulation en cours...", level=LogModel.WARNING)
+            self.job_queue.cancel_all()
             
-            # Activer le bouton de copie
-            self.copy_key_btn.setEnabled(True)
+    def encrypt_file(self):
+        """Chiffre les fichiers sélectionnés"""
+        if not self.current_files:
+            self.add_message("Aucun fichier sélectionné", True)
+            return
             
-        except Exception as e:
-            self.add_message(f"Erreur lors du chiffrement: {str(e)}", True)
+        # Générer une nouvelle clé, commune à tous les fichiers
+        key = generate_key()
+        self.current_key = key
+        
+        # Afficher la clé avant de chiffrer
+        key_str = key_to_string(key)
+        self.add_message(f"CLÉ GÉNÉRÉE: {key_str}", sensitive=True)
+        self.add_message("SAUVEGARDEZ CETTE CLÉ IMMÉDIATEMENT!", level=LogModel.WARNING)
+        self.copy_key_btn.setEnabled(True)
+        
+        # Chiffrer les fichiers en arrière-plan
+        self.add_message("Chiffrement en cours...")
+        self.start_jobs(encrypt_file, "Chiffrement", key)
             
     def decrypt_file(self):
-        """Déchiffre le fichier sélectionné"""
-        if not self.current_file_path:
+        """Déchiffre les fichiers sélectionnés"""
+        if not self.current_files:
             self.add_message("Aucun fichier sélectionné", True)
             return
             
@@ -379,21 +917,13 @@ class CryptoApp(QMainWindow):
         try:
             # Valider la clé
             key = validate_key(key_str)
-            
-            # Déchiffrer le fichier
-            self.add_message("Déchiffrement en cours...")
-            decrypted_path = decrypt_file(self.current_file_path, key)
-            
-            # Afficher le succès
-            self.add_message(f"Déchiffrement réussi!")
-            self.add_message(f"Fichier déchiffré: {decrypted_path}")
-            
-        except InvalidToken:
-            self.add_message("Clé incorrecte ou fichier corrompu", True)
         except ValueError as e:
             self.add_message(f"Clé invalide: {str(e)}", True)
-        except Exception as e:
-            self.add_message(f"Erreur lors du déchiffrement: {str(e)}", True)
+            return
+            
+        # Déchiffrer les fichiers en arrière-plan
+        self.add_message("Déchiffrement en cours...")
+        self.start_jobs(decrypt_file, "Déchiffrement", key)
             
     def copy_key(self):
         """Copie la clé dans le presse-papiers"""
@@ -417,12 +947,21 @@ class CryptoApp(QMainWindow):
             
     def clear_all(self):
         """Efface tous les champs et réinitialise"""
-        self.current_file_path = None
+        self.current_files = []
         self.current_key = None
+        self.job_table.setRowCount(0)
+        self.jobs.clear()
         self.file_label.setText("Aucun fichier sélectionné")
         self.file_label.setStyleSheet("color: #666; font-size: 12px; margin: 10px 0;")
         self.key_input.clear()
-        self.message_area.clear()
+        self.log_model.clear()
         self.copy_key_btn.setEnabled(False)
         self.update_buttons()
-        self.add_message("Interface réinitialisée")
\ No newline at end of file
+        self.add_message("Interface réinitialisée")
+        
+    def closeEvent(self, event):
+        """Annule l'opération en cours avant de fermer la fenêtre"""
+        if self.job_queue.is_running():
+            self.job_queue.cancel_all()
+            self.job_queue.wait()
+        super().closeEvent(event)
\ No newline at end of file